@@ -4,3 +4,21 @@ from django.apps import AppConfig
 class AnalyzerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'analyzer'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from django.db.models.signals import pre_delete
+        from call_clarity_backend.database import tune_sqlite_connection
+        from .models import AudioJob
+        from .progress import publish_job_progress
+        from .rollups import update_rollups_for_finished_job, remove_rollups_for_deleted_job
+        from .signals import job_progress, job_finished
+        from .vector_index import index_finished_job
+        from .webhooks import queue_job_webhooks
+
+        job_progress.connect(publish_job_progress, dispatch_uid='analyzer.progress.publish')
+        job_finished.connect(queue_job_webhooks, dispatch_uid='analyzer.webhooks.queue')
+        job_finished.connect(index_finished_job, dispatch_uid='analyzer.vector_index.index')
+        job_finished.connect(update_rollups_for_finished_job, dispatch_uid='analyzer.rollups.update')
+        pre_delete.connect(remove_rollups_for_deleted_job, sender=AudioJob, dispatch_uid='analyzer.rollups.remove')
+        connection_created.connect(tune_sqlite_connection, dispatch_uid='analyzer.db.tune_sqlite')
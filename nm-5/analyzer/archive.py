@@ -0,0 +1,275 @@
+"""
+Cold-storage archival of old calls.
+
+``archive_job`` packs a job's ``Transcript``, ``Sentiment`` and
+``ContentSafety`` rows into one compressed ``JobArchive`` blob and deletes
+them from the hot tables. The job itself, its compliance report, analytics,
+summary columns and result document stay where they are, so the call list,
+stats and ``/result/`` are unaffected. ``AudioJobSerializer`` reads the
+archive in place of the deleted rows, so opening an archived job looks the
+same as before; ``restore_job`` moves the rows back into the hot tables.
+
+The archive is columnar JSON, compressed with zstd when the optional
+``zstandard`` package is installed and gzip otherwise::
+
+    {"version": 2,
+     "transcripts":    {"columns": [...], "rows": [[...], ...]},
+     "sentiments":     {"columns": ["transcript", ...], "rows": ...},
+     "content_safety": {"columns": ["transcript", ...], "rows": ...}}
+
+Analysis rows refer to their transcript by its index in ``transcripts``.
+Version 1 archives also carried an ``utterance`` column, with a null index
+when the text matched no transcript; ``load_archive`` upgrades them as it
+reads them.
+
+Archived utterances are no longer in the full-text search index or in
+transcript exports.
+"""
+
+import gzip
+import json
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from .models import AudioJob, Transcript, Sentiment, ContentSafety, JobArchive, JobResultDocument
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional; gzip is always available
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_VERSION = 2
+TRANSCRIPT_COLUMNS = ['id', 'speaker', 'start_time', 'text', 'flagged', 'flag_reason', 'created_at']
+SENTIMENT_COLUMNS = ['transcript', 'sentiment', 'confidence', 'created_at']
+CONTENT_SAFETY_COLUMNS = ['transcript', 'category', 'severity', 'created_at']
+ARCHIVABLE_STATUSES = ('complete', 'error')
+
+
+def _codec():
+    codec = settings.ARCHIVE_CODEC
+    if codec == 'auto':
+        return 'zstd' if zstandard is not None else 'gzip'
+    if codec == 'zstd' and zstandard is None:
+        raise ValueError('ARCHIVE_CODEC=zstd requires the zstandard package')
+    return codec
+
+
+def compress(raw, codec):
+    if codec == 'zstd':
+        return zstandard.ZstdCompressor(level=10).compress(raw)
+    return gzip.compress(raw, compresslevel=9, mtime=0)
+
+
+def decompress(body, codec):
+    if codec == 'zstd':
+        if zstandard is None:
+            raise ValueError('This archive is zstd-compressed; install the zstandard package to read it')
+        return zstandard.ZstdDecompressor().decompress(body)
+    return gzip.decompress(body)
+
+
+def _timestamp(value):
+    return value.isoformat() if value else None
+
+
+def build_archive_payload(job):
+    transcripts = list(job.transcripts.order_by('id').values_list(*TRANSCRIPT_COLUMNS))
+    position = {row[0]: index for index, row in enumerate(transcripts)}
+
+    def analysis_rows(queryset, fields):
+        return [
+            [position[transcript_id], *values, _timestamp(created_at)]
+            for transcript_id, *values, created_at
+            in queryset.order_by('id').values_list('transcript_id', *fields, 'created_at')
+        ]
+
+    return {
+        'version': ARCHIVE_VERSION,
+        'transcripts': {
+            'columns': TRANSCRIPT_COLUMNS,
+            'rows': [[*row[:-1], _timestamp(row[-1])] for row in transcripts],
+        },
+        'sentiments': {
+            'columns': SENTIMENT_COLUMNS,
+            'rows': analysis_rows(job.sentiments, ['sentiment', 'confidence']),
+        },
+        'content_safety': {
+            'columns': CONTENT_SAFETY_COLUMNS,
+            'rows': analysis_rows(job.content_safety, ['category', 'severity']),
+        },
+    }
+
+
+def archive_job(job_id):
+    """Move one job's transcript and analysis rows into a JobArchive
+
+    Returns the JobArchive, or None if the job is missing, already archived
+    or still being processed.
+    """
+    # Imported here: result_documents imports the serializers, which import this module
+    from .result_documents import materialize_result_document
+
+    with transaction.atomic():
+        job = AudioJob.objects.select_for_update().filter(id=job_id).first()
+        if job is None or job.archived_at is not None or job.status not in ARCHIVABLE_STATUSES:
+            return None
+        if job.status == 'complete' and not JobResultDocument.objects.filter(job=job).exists():
+            # Render /result/ from the hot rows while they still exist
+            materialize_result_document(job.id)
+
+        payload = build_archive_payload(job)
+        raw = json.dumps(payload, separators=(',', ':')).encode()
+        codec = _codec()
+        row_count = sum(len(payload[key]['rows']) for key in ('transcripts', 'sentiments', 'content_safety'))
+        archive = JobArchive.objects.create(
+            job=job, codec=codec, body=compress(raw, codec), raw_size=len(raw), row_count=row_count
+        )
+        Sentiment.objects.filter(job=job).delete()
+        ContentSafety.objects.filter(job=job).delete()
+        Transcript.objects.filter(job=job).delete()
+        AudioJob.objects.filter(id=job.id).update(archived_at=timezone.now())
+    return archive
+
+
+def upgrade_payload(payload):
+    """Bring an archive payload of any earlier version to ARCHIVE_VERSION"""
+    version = payload.get('version', 1)
+    if version > ARCHIVE_VERSION:
+        raise ValueError(f"Archive version {version} is newer than this code understands ({ARCHIVE_VERSION})")
+    if version == 1:
+        for key in ('sentiments', 'content_safety'):
+            section = payload[key]
+            utterance = section['columns'].index('utterance')
+            # Rows whose text matched no transcript have nothing to point at;
+            # migration 0015 dropped their hot-table equivalents the same way
+            section['rows'] = [
+                row[:utterance] + row[utterance + 1:]
+                for row in section['rows'] if row[0] is not None
+            ]
+            section['columns'] = [c for c in section['columns'] if c != 'utterance']
+        payload['version'] = 2
+    return payload
+
+
+def load_archive(job):
+    """The archived rows of a job, decoded once per instance"""
+    cached = getattr(job, '_archive_payload', None)
+    if cached is None:
+        archive = JobArchive.objects.get(job_id=job.id)
+        cached = upgrade_payload(json.loads(decompress(bytes(archive.body), archive.codec)))
+        job._archive_payload = cached
+    return cached
+
+
+def _records(section):
+    columns = section['columns']
+    return [dict(zip(columns, row)) for row in section['rows']]
+
+
+def archived_representation(job):
+    """transcripts / sentiments / content_safety as AudioJobSerializer renders them"""
+    payload = load_archive(job)
+    transcripts = _records(payload['transcripts'])
+
+    def transcript(record):
+        return transcripts[record['transcript']]
+
+    return {
+        'transcripts': [
+            {key: t[key] for key in ('id', 'speaker', 'text', 'start_time', 'flagged', 'flag_reason')}
+            for t in transcripts
+        ],
+        'sentiments': [
+            {
+                'transcript': transcript(s)['id'], 'utterance': transcript(s)['text'],
+                'sentiment': s['sentiment'], 'confidence': s['confidence'],
+            }
+            for s in _records(payload['sentiments'])
+        ],
+        'content_safety': [
+            {
+                'transcript': transcript(c)['id'], 'utterance': transcript(c)['text'],
+                'category': c['category'], 'severity': c['severity'],
+            }
+            for c in _records(payload['content_safety'])
+        ],
+    }
+
+
+def restore_job(job_id):
+    """Move an archived job's rows back into the hot tables"""
+    with transaction.atomic():
+        job = AudioJob.objects.select_for_update().filter(id=job_id).first()
+        if job is None or job.archived_at is None:
+            return False
+        payload = load_archive(job)
+        transcripts = _records(payload['transcripts'])
+        Transcript.objects.bulk_create([
+            Transcript(
+                id=t['id'], job=job, speaker=t['speaker'], start_time=t['start_time'], text=t['text'],
+                flagged=t['flagged'], flag_reason=t['flag_reason']
+            )
+            for t in transcripts
+        ])
+
+        def transcript_id(record):
+            return transcripts[record['transcript']]['id']
+
+        sentiments = [
+            Sentiment(job=job, transcript_id=transcript_id(s), sentiment=s['sentiment'], confidence=s['confidence'])
+            for s in _records(payload['sentiments'])
+        ]
+        safety = [
+            ContentSafety(job=job, transcript_id=transcript_id(c), category=c['category'], severity=c['severity'])
+            for c in _records(payload['content_safety'])
+        ]
+        Sentiment.objects.bulk_create(sentiments)
+        ContentSafety.objects.bulk_create(safety)
+        JobArchive.objects.filter(job=job).delete()
+        AudioJob.objects.filter(id=job.id).update(archived_at=None)
+    return True
+
+
+def discard_archive(job):
+    """Forget an archive whose rows are about to be regenerated (reprocessing)"""
+    if job.archived_at is not None:
+        JobArchive.objects.filter(job=job).delete()
+        job.archived_at = None
+        AudioJob.objects.filter(id=job.id).update(archived_at=None)
+
+
+def archive_old_jobs(older_than_days=None, limit=None):
+    """Archive every finished job created more than ``older_than_days`` ago"""
+    days = settings.ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    cutoff = timezone.now() - timedelta(days=days)
+    candidates = AudioJob.objects.filter(
+        created_at__lt=cutoff, archived_at__isnull=True, status__in=ARCHIVABLE_STATUSES
+    ).order_by('created_at')
+
+    stats = {'jobs': 0, 'rows': 0, 'raw_bytes': 0, 'stored_bytes': 0}
+    failed = set()
+    while limit is None or stats['jobs'] < limit:
+        # Archived jobs drop out of the candidate query, so always take the head
+        page = list(candidates.exclude(id__in=failed).values_list('id', flat=True)[:100])
+        if not page:
+            break
+        for job_id in page:
+            if limit is not None and stats['jobs'] >= limit:
+                break
+            try:
+                archive = archive_job(job_id)
+            except Exception as e:
+                logger.error(f"Error archiving job {job_id}: {str(e)}")
+                archive = None
+            if archive is None:
+                failed.add(job_id)
+                continue
+            stats['jobs'] += 1
+            stats['rows'] += archive.row_count
+            stats['raw_bytes'] += archive.raw_size
+            stats['stored_bytes'] += len(archive.body)
+    return stats
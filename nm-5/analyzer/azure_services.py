@@ -35,11 +35,14 @@ Example usage in Django shell:
 import os
 import json
 import requests
+import threading
 import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from datetime import datetime
 from django.conf import settings
 from .azure_storage import AzureStorageService
+from .resilience import get_limiter, get_breaker, get_hedge_budget, CircuitOpenError
 import logging
 from .models import AudioJob, Transcript
 from azure.core.credentials import AzureKeyCredential
@@ -48,11 +51,133 @@ from azure.ai.contentsafety import ContentSafetyClient
 
 logger = logging.getLogger(__name__)
 
+
+_hedge_executor = ThreadPoolExecutor(
+    max_workers=settings.AZURE_HEDGE_WORKERS,
+    thread_name_prefix='azure-hedge'
+)
+
+
+def _is_error_response(response):
+    return response.status_code == 429 or response.status_code >= 500
+
+
+def _send_request(endpoint_name, method, url, hedge=False, **kwargs):
+    """Send an HTTP request through the service's circuit breaker and the
+    endpoint's adaptive concurrency limiter
+
+    Timeouts, connection failures, 429s and 5xx responses count as errors:
+    they make the limiter back off and count towards tripping the breaker.
+    The response is returned unchanged so callers keep their own
+    raise_for_status handling. Raises CircuitOpenError without touching the
+    network while the service's breaker is open.
+
+    Pass hedge=True only for idempotent calls: when hedging is enabled the
+    request may be sent twice (see _send_hedged).
+    """
+    if hedge and settings.AZURE_HEDGING_ENABLED:
+        return _send_hedged(endpoint_name, method, url, **kwargs)
+    return _send_once(endpoint_name, method, url, **kwargs)
+
+
+def _send_hedged(endpoint_name, method, url, **kwargs):
+    """Send a request and, if it is slower than the endpoint's p95, race a
+    duplicate against it; the first good response wins
+
+    The hedge delay is timed from when the primary gets its limiter slot, so
+    time spent queueing on a saturated limiter never triggers a hedge. The
+    duplicate is only sent if a slot is free straight away.
+    """
+    limiter = get_limiter(endpoint_name)
+    budget = get_hedge_budget(endpoint_name)
+    budget.record_request()
+    if limiter.tracker.sample_count() < settings.AZURE_HEDGE_MIN_SAMPLES:
+        return _send_once(endpoint_name, method, url, **kwargs)
+
+    hedge_delay = limiter.tracker.percentile(95)
+    sent = threading.Event()
+    primary = _hedge_executor.submit(_send_once, endpoint_name, method, url, on_sent=sent.set, **kwargs)
+    primary.add_done_callback(lambda _: sent.set())
+    sent.wait()
+    done, _ = wait([primary], timeout=hedge_delay)
+    if done:
+        return primary.result()
+    if not limiter.try_acquire():
+        return primary.result()
+    if not budget.try_spend():
+        limiter.abandon()
+        return primary.result()
+
+    logger.debug(f"Hedging request to {endpoint_name} after {hedge_delay:.3f}s")
+    hedged = _hedge_executor.submit(_send_once, endpoint_name, method, url, slot_held=True, **kwargs)
+    pending = {primary, hedged}
+    fallback = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None and not _is_error_response(future.result()):
+                if future is hedged:
+                    budget.record_win()
+                for loser in ({primary, hedged} - {future}):
+                    loser.add_done_callback(_close_response)
+                return future.result()
+            if fallback is not None:
+                _close_response(fallback)
+            fallback = future
+    # Both attempts failed; surface the last outcome to the caller
+    return fallback.result()
+
+
+def _close_response(future):
+    """Release the connection held by a hedging attempt that lost the race"""
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+def _send_once(endpoint_name, method, url, slot_held=False, on_sent=None, **kwargs):
+    """One attempt through the breaker and limiter
+
+    ``slot_held`` means the caller already took a limiter slot for it;
+    ``on_sent`` is called once the slot is held, just before sending.
+    """
+    breaker = get_breaker(endpoint_name.split('.')[0])
+    limiter = get_limiter(endpoint_name)
+    try:
+        breaker.before_request()
+    except CircuitOpenError:
+        if slot_held:
+            limiter.abandon()
+        raise
+    kwargs.setdefault('timeout', settings.AZURE_REQUEST_TIMEOUT)
+    if not slot_held:
+        try:
+            limiter.acquire()
+        except Exception:
+            breaker.cancel_request()
+            raise
+    if on_sent:
+        on_sent()
+    start = time.monotonic()
+    error = True
+    try:
+        response = requests.request(method, url, **kwargs)
+        error = _is_error_response(response)
+        return response
+    finally:
+        limiter.release(time.monotonic() - start, error=error)
+        if error:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
+
 class AzureSpeechService:
     def __init__(self):
         self.key = settings.AZURE_SPEECH_KEY
         self.region = settings.AZURE_SPEECH_REGION
-        self.endpoint = f"https://{self.region}.api.cognitive.microsoft.com"
+        self.endpoint = (
+            settings.AZURE_SPEECH_ENDPOINT.rstrip('/') or f"https://{self.region}.api.cognitive.microsoft.com"
+        )
         self.transcription_path = "/speechtotext/v3.2/transcriptions"
         self.wait_seconds = 10
         self.storage = AzureStorageService()
@@ -168,7 +293,7 @@ class AzureSpeechService:
             logger.info(f"PII redaction: {pii_redaction}")
             logger.info(f"Sentiment analysis: {sentiment_analysis}")
 
-            response = requests.post(uri, json=content, headers=headers)
+            response = _send_request('speech.transcriptions', 'POST', uri, json=content, headers=headers)
             response.raise_for_status()
             
             # Get transcription ID from response
@@ -186,14 +311,15 @@ class AzureSpeechService:
             max_wait_time = 300  # 5 minutes timeout
             start_time = time.time()
             last_status = None
-            poll_interval = 5  # Start with 5 second intervals
+            poll_interval = settings.AZURE_SPEECH_POLL_INTERVAL
             
             while True:
                 if time.time() - start_time > max_wait_time:
                     raise Exception("Transcription timeout after 5 minutes")
                     
                 time.sleep(poll_interval)
-                status_response = requests.get(
+                status_response = _send_request(
+                    'speech.transcriptions', 'GET',
                     f"{self.endpoint}{self.transcription_path}/{transcription_id}",
                     headers={"Ocp-Apim-Subscription-Key": self.key}
                 )
@@ -208,9 +334,9 @@ class AzureSpeechService:
                     
                     # Adjust polling interval based on status
                     if status == "running":
-                        poll_interval = 10  # Increase interval during processing
+                        poll_interval = settings.AZURE_SPEECH_POLL_INTERVAL * 2  # Increase interval during processing
                     else:
-                        poll_interval = 5  # Keep shorter interval for other states
+                        poll_interval = settings.AZURE_SPEECH_POLL_INTERVAL  # Keep shorter interval for other states
                 
                 if status == "failed":
                     error_msg = status_data.get("properties", {}).get("error", {}).get("message", "Unknown error")
@@ -231,7 +357,8 @@ class AzureSpeechService:
 
             # Get transcription files with optimized request
             logger.info("Retrieving transcription files")
-            files_response = requests.get(
+            files_response = _send_request(
+                'speech.transcriptions', 'GET',
                 f"{self.endpoint}{self.transcription_path}/{transcription_id}/files",
                 headers={"Ocp-Apim-Subscription-Key": self.key}
             )
@@ -249,7 +376,7 @@ class AzureSpeechService:
             
             # Get transcription content with optimized request
             logger.info("Retrieving transcription content")
-            content_response = requests.get(content_url)
+            content_response = _send_request('speech.results', 'GET', content_url)
             content_response.raise_for_status()
             transcription = content_response.json()
             
@@ -346,7 +473,8 @@ class AzureSpeechService:
         """Delete a transcription job"""
         try:
             uri = f"{self.endpoint}{self.transcription_path}/{transcription_id}"
-            response = requests.delete(
+            response = _send_request(
+                'speech.transcriptions', 'DELETE',
                 uri,
                 headers={"Ocp-Apim-Subscription-Key": self.key}
             )
@@ -368,7 +496,7 @@ class AzureLanguageService:
             raise ValueError("AZURE_LANGUAGE_KEY is not set")
             
         # Ensure endpoint has correct format
-        if not self.endpoint.startswith("https://"):
+        if not self.endpoint.startswith(("https://", "http://")):
             self.endpoint = f"https://{self.endpoint}"
         if self.endpoint.endswith("/"):
             self.endpoint = self.endpoint[:-1]
@@ -383,15 +511,21 @@ class AzureLanguageService:
         self.logger = logging.getLogger(__name__)
         
         # Test connection
+        breaker = get_breaker('language')
         try:
+            breaker.before_request()
             # Simple test to verify connection
             test_response = self.client.extract_key_phrases(["Test connection"])
             # Convert to list and check first result
             results = list(test_response)
             if not results:
                 raise Exception("No results returned from API")
+            breaker.record_success()
             self.logger.info("Successfully connected to Azure Text Analytics API")
+        except CircuitOpenError as e:
+            self.logger.warning(f"Skipping Azure Text Analytics connection test: {str(e)}")
         except Exception as e:
+            breaker.record_failure()
             self.logger.error(f"Failed to connect to Azure Text Analytics API: {str(e)}")
             raise
 
@@ -415,6 +549,9 @@ class AzureLanguageService:
                             - text: The assessment text
                             - sentiment: The assessment sentiment
                             - confidence_scores: Dictionary of positive, neutral, negative scores
+
+        Raises:
+            Exception: on any failure, including CircuitOpenError while the breaker is open
         """
         try:
             if not text or not isinstance(text, str):
@@ -438,7 +575,7 @@ class AzureLanguageService:
             }
 
             # Make the API call
-            response = requests.post(url, headers=headers, json=body)
+            response = _send_request('language.sentiment', 'POST', url, headers=headers, json=body, hedge=True)
             response.raise_for_status()
             result = response.json()
 
@@ -490,26 +627,9 @@ class AzureLanguageService:
             return sentiment_result
             
         except Exception as e:
+            # Callers store their own neutral default and mark the job degraded
             self.logger.error(f"Error in analyze_sentiment: {str(e)}")
-            # Return a default neutral sentiment result
-            return {
-                'overall': 'neutral',
-                'confidence_scores': {
-                    'positive': 0.0,
-                    'neutral': 1.0,
-                    'negative': 0.0
-                },
-                'sentences': [{
-                    'text': text,
-                    'sentiment': 'neutral',
-                    'confidence_scores': {
-                        'positive': 0.0,
-                        'neutral': 1.0,
-                        'negative': 0.0
-                    },
-                    'opinions': []
-                }]
-            }
+            raise
 
     def extract_entities(self, text):
         """Extract named entities from text"""
@@ -637,7 +757,7 @@ class AzureContentSafetyService:
             raise ValueError("AZURE_CONTENT_SAFETY_KEY is not set")
             
         # Ensure endpoint has correct format
-        if not self.endpoint.startswith("https://"):
+        if not self.endpoint.startswith(("https://", "http://")):
             self.endpoint = f"https://{self.endpoint}"
         if self.endpoint.endswith("/"):
             self.endpoint = self.endpoint[:-1]
@@ -656,9 +776,11 @@ class AzureContentSafetyService:
                 "categories": ["Hate", "SelfHarm", "Sexual", "Violence"],
                 "outputType": "FourSeverityLevels"
             }
-            response = requests.post(self.analyze_url, headers=headers, json=body)
+            response = _send_request('content_safety.analyze', 'POST', self.analyze_url, headers=headers, json=body)
             response.raise_for_status()
             self.logger.info("Successfully connected to Azure Content Safety API")
+        except CircuitOpenError as e:
+            self.logger.warning(f"Skipping Azure Content Safety connection test: {str(e)}")
         except Exception as e:
             self.logger.error(f"Failed to connect to Azure Content Safety API: {str(e)}")
             raise
@@ -677,6 +799,9 @@ class AzureContentSafetyService:
                 - Violence: Violent content analysis
                 Each category contains:
                     - severity: Severity level (0-4)
+
+        Raises:
+            Exception: on any failure, including CircuitOpenError while the breaker is open
         """
         try:
             if not text or not isinstance(text, str):
@@ -692,7 +817,10 @@ class AzureContentSafetyService:
                 "outputType": "FourSeverityLevels"
             }
             
-            response = requests.post(self.analyze_url, headers=headers, json=body)
+            response = _send_request(
+                'content_safety.analyze', 'POST', self.analyze_url,
+                headers=headers, json=body, hedge=True
+            )
             response.raise_for_status()
             result = response.json()
             
@@ -706,14 +834,9 @@ class AzureContentSafetyService:
             return results
             
         except Exception as e:
+            # Callers store their own 'safe' default and mark the job degraded
             self.logger.error(f"Error in analyze_text: {str(e)}")
-            # Return default safe results
-            return {
-                'Hate': {'severity': 0},
-                'SelfHarm': {'severity': 0},
-                'Sexual': {'severity': 0},
-                'Violence': {'severity': 0}
-            }
+            raise
 
 class AzureOpenAIService:
     def __init__(self):
@@ -721,6 +844,7 @@ class AzureOpenAIService:
         self.key = settings.AZURE_OPENAI_KEY
         self.api_version = "2024-10-21"  # Latest stable version
         self.deployment = settings.AZURE_OPENAI_DEPLOYMENT
+        self.embedding_deployment = settings.AZURE_OPENAI_EMBEDDING_DEPLOYMENT
         self.logger = logging.getLogger(__name__)
         
         # Validate configuration
@@ -732,7 +856,7 @@ class AzureOpenAIService:
             raise ValueError("AZURE_OPENAI_DEPLOYMENT is not set")
             
         # Ensure endpoint has correct format
-        if not self.endpoint.startswith("https://"):
+        if not self.endpoint.startswith(("https://", "http://")):
             self.endpoint = f"https://{self.endpoint}"
         if self.endpoint.endswith("/"):
             self.endpoint = self.endpoint[:-1]
@@ -831,7 +955,7 @@ class AzureOpenAIService:
             self.logger.error(f"Error in compliance audit: {str(e)}")
             raise
 
-    def _make_request(self, endpoint, method="POST", headers=None, json_data=None):
+    def _make_request(self, endpoint, method="POST", headers=None, json_data=None, endpoint_name='openai'):
         """Helper method to make API requests with proper error handling"""
         try:
             headers = headers or {}
@@ -840,7 +964,8 @@ class AzureOpenAIService:
             'Content-Type': 'application/json'
             })
             
-            response = requests.request(
+            response = _send_request(
+                endpoint_name,
                 method,
                 endpoint,
                 headers=headers,
@@ -885,7 +1010,7 @@ class AzureOpenAIService:
         if tool_choice:
             body["tool_choice"] = tool_choice
             
-        return self._make_request(url, json_data=body)
+        return self._make_request(url, json_data=body, endpoint_name='openai.chat')
 
     def get_embeddings(self, input_text, encoding_format="float"):
         """Get embeddings for input text
@@ -897,14 +1022,33 @@ class AzureOpenAIService:
         Returns:
             dict: Embeddings response
         """
-        url = f"{self.endpoint}/openai/deployments/{self.deployment}/embeddings?api-version={self.api_version}"
+        url = f"{self.endpoint}/openai/deployments/{self.embedding_deployment}/embeddings?api-version={self.api_version}"
         
         body = {
             "input": input_text,
             "encoding_format": encoding_format
         }
         
-        return self._make_request(url, json_data=body)
+        return self._make_request(url, json_data=body, endpoint_name='openai.embeddings')
+
+    def embed_texts(self, texts, batch_size=None):
+        """Embed a list of texts, sending them in batched requests
+
+        Args:
+            texts (list): Texts to embed
+            batch_size (int): Inputs per request (defaults to EMBEDDING_BATCH_SIZE)
+
+        Returns:
+            list: One embedding (list of floats) per input text, in order
+        """
+        batch_size = batch_size or settings.EMBEDDING_BATCH_SIZE
+        embeddings = []
+        for start in range(0, len(texts), batch_size):
+            batch = [text or ' ' for text in texts[start:start + batch_size]]
+            response = self.get_embeddings(batch)
+            data = sorted(response['data'], key=lambda item: item['index'])
+            embeddings.extend(item['embedding'] for item in data)
+        return embeddings
 
     def analyze_compliance(self, text):
         """Analyze text for compliance using chat completion
@@ -972,7 +1116,7 @@ class AzureOpenAIService:
             "response_format": "url"
         }
         
-        return self._make_request(url, json_data=body)
+        return self._make_request(url, json_data=body, endpoint_name='openai.images')
 
     def transcribe_audio(self, audio_file, language=None, response_format="json"):
         """Transcribe audio to text
@@ -1002,7 +1146,7 @@ class AzureOpenAIService:
         if language:
             data['language'] = language
             
-        response = requests.post(url, headers=headers, files=files, data=data)
+        response = _send_request('openai.audio', 'POST', url, headers=headers, files=files, data=data)
         response.raise_for_status()
         return response.json()
 
@@ -1030,6 +1174,6 @@ class AzureOpenAIService:
             'response_format': response_format
         }
             
-        response = requests.post(url, headers=headers, files=files, data=data)
+        response = _send_request('openai.audio', 'POST', url, headers=headers, files=files, data=data)
         response.raise_for_status()
         return response.json()
\ No newline at end of file
@@ -14,7 +14,7 @@ class AzureStorageService:
         
         # Initialize the BlobServiceClient
         self.service_client = BlobServiceClient(
-            account_url=f"https://{self.account_name}.blob.core.windows.net",
+            account_url=settings.AZURE_STORAGE_ACCOUNT_URL or f"https://{self.account_name}.blob.core.windows.net",
             credential=self.storage_key
         )
         
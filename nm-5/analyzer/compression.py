@@ -0,0 +1,127 @@
+"""
+Negotiated response compression.
+
+``CompressionMiddleware`` compresses responses for clients that send a
+matching ``Accept-Encoding``, preferring brotli (when the optional
+``brotli`` package is installed) over gzip and honouring ``q`` values.
+Bodies smaller than ``COMPRESSION_MIN_SIZE`` bytes go out as they are, since
+the headers and CPU time would outweigh the saving. Only textual content
+types are touched (Parquet exports are already compressed), and responses
+that already carry a ``Content-Encoding``, such as a stored result document
+or a ``gzip=1`` export, pass straight through. Streaming responses are
+compressed chunk by chunk, except server-sent events.
+"""
+
+import gzip
+import zlib
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5  # Levels above ~6 cost far more CPU than they save in bytes for JSON
+
+COMPRESSIBLE_TYPES = (
+    'application/json', 'application/x-ndjson', 'application/javascript', 'application/xml',
+    'text/',
+)
+# Server-sent events must reach the client as they happen, not when a compressor flushes
+UNCOMPRESSED_TYPES = ('text/event-stream',)
+
+
+def available_encodings():
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negotiate_encoding(accept_encoding):
+    """Best encoding the client accepts, by q value then server preference, or None"""
+    weights = {}
+    for coding in accept_encoding.split(','):
+        name, _, params = coding.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key.strip() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[name] = q
+
+    best, best_q = None, 0.0
+    for encoding in available_encodings():
+        q = weights.get(encoding, weights.get('*', 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def compress_stream(chunks, encoding):
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        for chunk in chunks:
+            data = compressor.process(chunk)
+            if data:
+                yield data
+        yield compressor.finish()
+        return
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def _is_compressible(response):
+    content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+    return content_type.startswith(COMPRESSIBLE_TYPES) and content_type not in UNCOMPRESSED_TYPES
+
+
+class CompressionMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        # Vary whenever the body could have been encoded differently
+        if not response.has_header('Content-Encoding') and _is_compressible(response):
+            patch_vary_headers(response, ('Accept-Encoding',))
+            encoding = negotiate_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+            if encoding is not None:
+                self._compress(response, encoding)
+        return response
+
+    def _compress(self, response, encoding):
+        if response.streaming:
+            if response.is_async:
+                return  # Async iterators are passed through uncompressed
+            response.streaming_content = compress_stream(response.streaming_content, encoding)
+            del response['Content-Length']
+        else:
+            if len(response.content) < settings.COMPRESSION_MIN_SIZE:
+                return
+            compressed = compress(response.content, encoding)
+            if len(compressed) >= len(response.content):
+                return
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+
+        # The encoded body is a different representation; only a weak ETag still holds
+        etag = response.get('ETag')
+        if etag and not etag.startswith('W/'):
+            response['ETag'] = f'W/{etag}'
+        response['Content-Encoding'] = encoding
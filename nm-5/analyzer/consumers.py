@@ -0,0 +1,184 @@
+import asyncio
+import json
+import logging
+from asgiref.sync import sync_to_async
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer, AsyncWebsocketConsumer
+from django.conf import settings
+from .live import LiveCallSession, live_group_name
+from .models import AudioJob
+from .progress import build_progress_event, job_group_name, TERMINAL_STATUSES
+
+logger = logging.getLogger(__name__)
+
+
+class JobProgressConsumer(AsyncJsonWebsocketConsumer):
+    """Streams progress events for one job until it completes or fails"""
+
+    async def connect(self):
+        self.job_id = str(self.scope['url_route']['kwargs']['job_id'])
+        self.group_name = job_group_name(self.job_id)
+
+        event = await self._current_event()
+        if event is None:
+            await self.close(code=4404)
+            return
+
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+        # Send the current state first so late subscribers do not have to
+        # wait for the next pipeline step
+        await self.send_json(event)
+        if event['status'] in TERMINAL_STATUSES:
+            await self.close()
+
+    async def disconnect(self, code):
+        if hasattr(self, 'group_name'):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def job_progress(self, message):
+        event = message['event']
+        await self.send_json(event)
+        if event['status'] in TERMINAL_STATUSES:
+            await self.close()
+
+    @database_sync_to_async
+    def _current_event(self):
+        try:
+            return build_progress_event(AudioJob.objects.get(id=self.job_id))
+        except AudioJob.DoesNotExist:
+            return None
+
+
+class LiveCallIngestConsumer(AsyncWebsocketConsumer):
+    """Receives one live call's audio and streams incremental analysis back
+
+    See ``analyzer.live`` for the protocol. Recognition runs as audio
+    arrives; final utterances are analyzed in order by a separate task, so
+    slow analysis calls never hold up the audio stream.
+    """
+
+    async def connect(self):
+        self.session = None
+        self.open = True
+        self.finals = asyncio.Queue()
+        self.analyzer = None
+        self.ending = None
+        await self.accept()
+
+    async def receive(self, text_data=None, bytes_data=None):
+        if bytes_data is not None:
+            await self._audio(bytes_data)
+            return
+        try:
+            message = json.loads(text_data)
+            kind = message.get('type')
+        except (ValueError, AttributeError):
+            await self._fail('Messages must be JSON objects')
+            return
+        if kind == 'start':
+            await self._start(message)
+        elif kind == 'stop':
+            await self._end()
+        else:
+            await self._fail(f"Unknown message type: {kind}")
+
+    async def disconnect(self, code):
+        self.open = False
+        if self.session is not None:
+            # A dropped connection still ends the call with what was heard
+            await self._end()
+
+    async def _start(self, message):
+        if self.session is not None:
+            await self._fail('Call already started')
+            return
+        try:
+            self.session = await database_sync_to_async(LiveCallSession.start)(
+                message.get('agent'), message.get('customer'), int(message.get('sample_rate', 16000))
+            )
+        except (ValueError, TypeError) as e:
+            # Only the start message itself (sample_rate) is validated here
+            await self._fail(str(e))
+            return
+        except Exception as e:
+            # LiveCallUnavailable (missing SDK or recognizer, unset Azure
+            # settings) or a failure creating the job: details stay in the log
+            logger.error(f"Could not start live call: {str(e)}")
+            await self._fail('Live transcription is not available on this server')
+            return
+        self.analyzer = asyncio.ensure_future(self._analyze_finals())
+        await self._send({'type': 'started', 'job_id': str(self.session.job.id)})
+
+    async def _audio(self, pcm):
+        if self.session is None or self.ending is not None:
+            await self._fail('Send a start message before audio')
+            return
+        if len(pcm) > settings.LIVE_MAX_CHUNK_BYTES:
+            await self._fail(f"Audio frames may be at most {settings.LIVE_MAX_CHUNK_BYTES} bytes")
+            return
+        # Recognition does not touch the database; keep it off the ORM thread
+        events = await sync_to_async(self.session.recognize, thread_sensitive=False)(pcm)
+        await self._dispatch(events)
+
+    async def _dispatch(self, events):
+        for event in events:
+            if event['type'] == 'final':
+                await self.finals.put(event)
+            else:
+                await self._publish(dict(event, job_id=str(self.session.job.id)))
+
+    async def _analyze_finals(self):
+        while True:
+            event = await self.finals.get()
+            if event is None:
+                return
+            try:
+                message = await database_sync_to_async(self.session.analyze)(event)
+            except Exception as e:
+                logger.error(f"Error analyzing live utterance for job {self.session.job.id}: {str(e)}")
+                continue
+            await self._publish(message)
+
+    async def _end(self):
+        if self.ending is None:
+            self.ending = asyncio.ensure_future(self._complete())
+        await self.ending
+
+    async def _complete(self):
+        await self._dispatch(await sync_to_async(self.session.finish_recognition, thread_sensitive=False)())
+        await self.finals.put(None)
+        await self.analyzer
+        await self._publish(await database_sync_to_async(self.session.finish)())
+        if self.open:
+            await self.close()
+
+    async def _publish(self, message):
+        """Send an event to the caller and to supervisors of this call and of all calls"""
+        await self._send(message)
+        for group in (live_group_name(self.session.job.id), live_group_name()):
+            await self.channel_layer.group_send(group, {'type': 'live.event', 'event': message})
+
+    async def _send(self, message):
+        if self.open:
+            await self.send(text_data=json.dumps(message))
+
+    async def _fail(self, error):
+        await self._send({'type': 'error', 'error': error})
+        if self.session is None:
+            await self.close(code=4400)
+
+
+class LiveCallMonitorConsumer(AsyncJsonWebsocketConsumer):
+    """Pushes live call events to supervisors: one call's, or every live call's"""
+
+    async def connect(self):
+        self.group_name = live_group_name(self.scope['url_route']['kwargs'].get('job_id'))
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, code):
+        await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def live_event(self, message):
+        await self.send_json(message['event'])
@@ -0,0 +1,212 @@
+"""
+Streaming exports of jobs and transcripts for BI tools.
+
+Rows are read with ``QuerySet.values_list(...).iterator(chunk_size=...)``
+and encoded one chunk at a time as NDJSON, CSV or Parquet (one row group
+per chunk), optionally gzip-compressed on the fly, so exporting a year of
+calls uses the same memory as exporting a day. The same generators back
+``GET /api/export/`` (via ``StreamingHttpResponse``) and the
+``export_calls`` management command.
+
+Parquet needs the optional ``pyarrow`` package.
+"""
+
+import csv
+import json
+import zlib
+from datetime import datetime
+from django.db.models import F
+from .filters import AudioJobFilter
+from .models import AudioJob, Transcript
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # Parquet export is optional
+    pyarrow = None
+
+DEFAULT_CHUNK_SIZE = 5000
+
+DATASETS = {
+    'jobs': (
+        'id', 'created_at', 'agent', 'customer', 'duration', 'status', 'score',
+        'compliance_status', 'flagged_count', 'max_safety_severity',
+        'dominant_sentiment', 'violation_count',
+    ),
+    'transcripts': (
+        'id', 'job_id', 'job_created_at', 'agent', 'speaker', 'start_time', 'text', 'flagged',
+    ),
+}
+
+FORMATS = {
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'csv': ('text/csv', 'csv'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+
+
+class ExportError(ValueError):
+    pass
+
+
+def export_queryset(dataset, filters=None):
+    """values_list() queryset for a dataset, restricted by AudioJobFilter params"""
+    if dataset not in DATASETS:
+        raise ExportError(f"Unknown dataset '{dataset}' (choose from {', '.join(DATASETS)})")
+    filterset = AudioJobFilter(filters or {}, queryset=AudioJob.objects.all())
+    if not filterset.is_valid():
+        raise ExportError(json.dumps(filterset.errors))
+    jobs = filterset.qs
+
+    if dataset == 'jobs':
+        # (created_at, id) is indexed, so the ordered scan needs no sort
+        return jobs.order_by('created_at', 'id').values_list(*DATASETS['jobs'])
+    return (
+        Transcript.objects.filter(job__in=jobs.values('id'))
+        .annotate(job_created_at=F('job__created_at'), agent=F('job__agent'))
+        .order_by('id')
+        .values_list(*DATASETS['transcripts'])
+    )
+
+
+def _chunks(queryset, chunk_size):
+    chunk = []
+    for row in queryset.iterator(chunk_size=chunk_size):
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _plain(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)  # UUIDs
+
+
+def encode_ndjson(columns, chunks):
+    for chunk in chunks:
+        yield ''.join(
+            json.dumps(dict(zip(columns, map(_plain, row)))) + '\n' for row in chunk
+        ).encode()
+
+
+class _Buffer:
+    """Minimal writable file that hands back whatever was written to it"""
+
+    def __init__(self):
+        self.parts = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = data if isinstance(data, bytes) else data.encode()
+        self.parts.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self.parts)
+        self.parts = []
+        return data
+
+
+class _TextAdapter:
+    def __init__(self, buffer):
+        self.buffer = buffer
+
+    def write(self, text):
+        return self.buffer.write(text.encode())
+
+
+def encode_csv(columns, chunks):
+    buffer = _Buffer()
+    writer = csv.writer(_TextAdapter(buffer))
+    writer.writerow(columns)
+    for chunk in chunks:
+        writer.writerows([[_plain(value) for value in row] for row in chunk])
+        yield buffer.drain()
+    yield buffer.drain()
+
+
+PARQUET_COLUMN_TYPES = {
+    'created_at': 'timestamp', 'job_created_at': 'timestamp',
+    'score': 'int', 'flagged_count': 'int', 'max_safety_severity': 'int',
+    'violation_count': 'int', 'flagged': 'bool',
+}
+
+
+def _parquet_schema(dataset, columns):
+    types = {
+        'timestamp': pyarrow.timestamp('us', tz='UTC'),
+        'int': pyarrow.int64(),
+        'bool': pyarrow.bool_(),
+        'str': pyarrow.string(),
+    }
+    # Job ids are UUIDs, transcript ids are integers
+    kinds = dict(PARQUET_COLUMN_TYPES, id='str' if dataset == 'jobs' else 'int')
+    return pyarrow.schema([pyarrow.field(column, types[kinds.get(column, 'str')]) for column in columns])
+
+
+def encode_parquet(dataset, columns, chunks):
+    if pyarrow is None:
+        raise ExportError('Parquet export requires the pyarrow package')
+    schema = _parquet_schema(dataset, columns)
+    buffer = _Buffer()
+    writer = pyarrow.parquet.ParquetWriter(buffer, schema, compression='snappy')
+    for chunk in chunks:
+        arrays = []
+        for index, field in enumerate(schema):
+            values = [row[index] for row in chunk]
+            if field.type == pyarrow.string():
+                values = [None if value is None else str(value) for value in values]
+            arrays.append(pyarrow.array(values, type=field.type))
+        writer.write_table(pyarrow.Table.from_arrays(arrays, schema=schema))
+        yield buffer.drain()
+    writer.close()
+    yield buffer.drain()
+
+
+def gzip_stream(chunks, level=6):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_stream(dataset, fmt, filters=None, compress=False, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Byte chunks of the encoded export; raises ExportError for bad arguments"""
+    if fmt not in FORMATS:
+        raise ExportError(f"Unknown format '{fmt}' (choose from {', '.join(FORMATS)})")
+    if fmt == 'parquet' and pyarrow is None:
+        raise ExportError('Parquet export requires the pyarrow package')
+    queryset = export_queryset(dataset, filters)
+    columns = DATASETS[dataset]
+    chunks = _chunks(queryset, chunk_size)
+    if fmt == 'ndjson':
+        stream = encode_ndjson(columns, chunks)
+    elif fmt == 'csv':
+        stream = encode_csv(columns, chunks)
+    else:
+        stream = encode_parquet(dataset, columns, chunks)
+    return gzip_stream(stream) if compress else stream
+
+
+def export_filename(dataset, fmt, compress=False):
+    name = f"{dataset}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{FORMATS[fmt][1]}"
+    return f"{name}.gz" if compress else name
@@ -0,0 +1,715 @@
+"""
+Local stand-in for the Azure services the pipeline calls.
+
+``FakeAzureServer`` answers the subset of the Azure REST APIs that
+``azure_services`` and ``azure_storage`` use, so the whole processing
+pipeline can run against it for load and latency tests without Azure
+credentials, cost or quotas:
+
+    ============================  =============================================================
+    route                         request
+    ============================  =============================================================
+    ``storage.blob``              ``PUT /<account>/<container>/<blob>`` (single put and blocks)
+    ``speech.transcriptions``     ``POST|GET|DELETE /speechtotext/v3.2/transcriptions[/<id>[/files]]``
+    ``speech.results``            ``GET /speech-results/<id>.json``
+    ``language.sentiment``        ``POST /text/analytics/v3.1/sentiment``
+    ``language.analyze``          ``POST /language/:analyze-text`` (SDK key phrases, entities, PII)
+    ``content_safety.analyze``    ``POST /contentsafety/text:analyze``
+    ``openai.chat``               ``POST /openai/deployments/<name>/chat/completions``
+    ``openai.embeddings``         ``POST /openai/deployments/<name>/embeddings``
+    ============================  =============================================================
+
+Route names match the endpoint names used by ``analyzer.resilience``.
+Responses are deterministic for a given input (keyword sentiment, hashed
+embeddings, a compliance audit scored from the transcript's checksum).
+Transcripts have one phrase per ``seconds_per_phrase`` of uploaded WAV
+audio (``phrases`` for other formats); set ``combined_phrases`` to false to
+leave out ``combinedRecognizedPhrases`` so the pipeline analyzes every
+phrase separately. Uploaded blobs are measured and then dropped.
+
+Each route has a latency distribution, an error rate (500/503) and a
+throttle rate (429 with ``Retry-After``), drawn from a seeded RNG. Latency
+specs are ``fixed:S``, ``uniform:LOW,HIGH``, ``normal:MEAN,STDDEV`` or
+``lognormal:MEDIAN,SIGMA`` in seconds. A profile is a dict (or JSON file)::
+
+    {"default": {"latency": "lognormal:0.08,0.5", "error_rate": 0.01, "throttle_rate": 0.02},
+     "routes": {"openai.chat": {"latency": "lognormal:1.5,0.4"}},
+     "transcription_seconds": 2.0, "phrases": 12, "seed": 7}
+
+``GET /_fake/stats`` returns per-route request, error and throttle counts.
+
+Run it with ``python manage.py run_fake_azure`` and point the services at
+it through settings (``FakeAzureServer.settings_overrides()`` lists them).
+``FakeAzureProcess`` runs the server in a child process, for benchmarks
+that should not share their GIL and memory with it.
+"""
+
+import base64
+import io
+import json
+import math
+import multiprocessing
+import random
+import re
+import threading
+import time
+import urllib.request
+import uuid
+import wave
+import zlib
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+FAKE_STORAGE_ACCOUNT = 'fakestorage'
+# Blob shared-key signing needs a base64 key; the fake never checks it
+FAKE_STORAGE_KEY = base64.b64encode(b'fake-azure-storage-key').decode()
+FAKE_KEY = 'fake-azure-key'
+
+SAFETY_CATEGORIES = ('Hate', 'SelfHarm', 'Sexual', 'Violence')
+
+POSITIVE_WORDS = ('thank', 'great', 'happy', 'appreciate', 'perfect', 'glad', 'excellent', 'wonderful')
+NEGATIVE_WORDS = ('problem', 'frustrat', 'angry', 'cancel', 'terrible', 'unacceptable', 'wrong', 'upset')
+SAFETY_WORDS = {
+    'Hate': ('hate', 'idiot', 'stupid'),
+    'SelfHarm': ('hurt myself', 'end it all'),
+    'Sexual': ('explicit',),
+    'Violence': ('kill', 'hit you', 'attack'),
+}
+
+SCRIPT = (
+    (1, "Thank you for calling, my name is Alex. This call may be recorded for quality and training purposes."),
+    (2, "Hi, I have a problem with my last bill, I was charged twice."),
+    (1, "I'm sorry to hear that. Can you confirm your date of birth so I can verify your identity?"),
+    (2, "Sure, it's the fourth of March nineteen eighty five."),
+    (1, "Thank you. I can see the duplicate charge on your account."),
+    (2, "That's frustrating, this is the second time it has happened."),
+    (1, "I understand. I have refunded the duplicate payment, it will arrive in three to five days."),
+    (2, "Great, I appreciate that."),
+    (1, "Is there anything else I can help you with today?"),
+    (2, "No, that's everything. Thanks for your help."),
+    (1, "You're welcome. Have a wonderful day."),
+    (2, "You too, goodbye."),
+)
+
+DEFAULT_PROFILE = {
+    'default': {'latency': 'fixed:0', 'error_rate': 0.0, 'throttle_rate': 0.0},
+    'routes': {},
+    'retry_after': 1,
+    'transcription_seconds': 2.0,
+    'phrases': len(SCRIPT),
+    'seconds_per_phrase': 6.0,
+    'combined_phrases': True,
+    'embedding_dimensions': 256,
+    'seed': None,
+}
+
+ROUTE_NAMES = (
+    'storage.blob', 'speech.transcriptions', 'speech.results', 'language.sentiment', 'language.analyze',
+    'content_safety.analyze', 'openai.chat', 'openai.embeddings',
+)
+
+
+class LatencyModel:
+    """A latency distribution parsed from ``kind:param[,param]``"""
+
+    KINDS = {'fixed': 1, 'uniform': 2, 'normal': 2, 'lognormal': 2}
+
+    def __init__(self, spec):
+        self.spec = spec
+        kind, _, params = str(spec).partition(':')
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown latency distribution '{kind}' (choose from {', '.join(self.KINDS)})")
+        try:
+            values = [float(value) for value in params.split(',')] if params else []
+        except ValueError:
+            raise ValueError(f"Invalid latency parameters in '{spec}'")
+        if len(values) != self.KINDS[kind] or any(value < 0 for value in values):
+            raise ValueError(f"'{kind}' latency takes {self.KINDS[kind]} non-negative parameter(s): '{spec}'")
+        self.kind = kind
+        self.params = values
+
+    def sample(self, rng):
+        if self.kind == 'fixed':
+            return self.params[0]
+        if self.kind == 'uniform':
+            return rng.uniform(*self.params)
+        if self.kind == 'normal':
+            return max(0.0, rng.gauss(*self.params))
+        median, sigma = self.params
+        return median * math.exp(rng.gauss(0, sigma)) if median else 0.0
+
+    def __repr__(self):
+        return f"LatencyModel('{self.spec}')"
+
+
+class RouteBehaviour:
+    def __init__(self, latency='fixed:0', error_rate=0.0, throttle_rate=0.0):
+        self.latency = latency if isinstance(latency, LatencyModel) else LatencyModel(latency)
+        self.error_rate = float(error_rate)
+        self.throttle_rate = float(throttle_rate)
+        if not (0 <= self.error_rate <= 1 and 0 <= self.throttle_rate <= 1):
+            raise ValueError('error_rate and throttle_rate must be between 0 and 1')
+
+
+class FakeAzureProfile:
+    """Latency, error and throttling behaviour for every route"""
+
+    def __init__(self, config=None):
+        config = dict(DEFAULT_PROFILE, **(config or {}))
+        unknown = set(config['routes']) - set(ROUTE_NAMES)
+        if unknown:
+            raise ValueError(f"Unknown fake Azure routes: {', '.join(sorted(unknown))}")
+        default = dict(DEFAULT_PROFILE['default'], **config['default'])
+        self.default = RouteBehaviour(**default)
+        self.routes = {
+            name: RouteBehaviour(**dict(default, **overrides)) for name, overrides in config['routes'].items()
+        }
+        self.retry_after = config['retry_after']
+        self.transcription_seconds = float(config['transcription_seconds'])
+        self.phrases = int(config['phrases'])
+        self.seconds_per_phrase = float(config['seconds_per_phrase'])
+        self.combined_phrases = bool(config['combined_phrases'])
+        self.embedding_dimensions = int(config['embedding_dimensions'])
+        self.seed = config['seed']
+
+    def behaviour(self, route):
+        return self.routes.get(route, self.default)
+
+
+class FakeAzureError(Exception):
+    def __init__(self, status, code, message):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+
+
+def service_settings(url, poll_interval=0.1):
+    """Django settings that point every Azure service at a fake server"""
+    return {
+        'AZURE_SPEECH_ENDPOINT': url,
+        'AZURE_SPEECH_KEY': FAKE_KEY,
+        'AZURE_SPEECH_POLL_INTERVAL': poll_interval,
+        'AZURE_STORAGE_ACCOUNT': FAKE_STORAGE_ACCOUNT,
+        'AZURE_STORAGE_ACCOUNT_URL': f"{url}/{FAKE_STORAGE_ACCOUNT}",
+        'AZURE_STORAGE_KEY': FAKE_STORAGE_KEY,
+        'AZURE_LANGUAGE_ENDPOINT': url,
+        'AZURE_LANGUAGE_KEY': FAKE_KEY,
+        'AZURE_CONTENT_SAFETY_ENDPOINT': url,
+        'AZURE_CONTENT_SAFETY_KEY': FAKE_KEY,
+        'AZURE_OPENAI_ENDPOINT': url,
+        'AZURE_OPENAI_KEY': FAKE_KEY,
+    }
+
+
+def _now():
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _checksum(text):
+    return zlib.crc32(text.encode())
+
+
+def sentiment_of(text):
+    """(label, confidence scores) from a keyword count"""
+    lowered = text.lower()
+    positive = sum(lowered.count(word) for word in POSITIVE_WORDS)
+    negative = sum(lowered.count(word) for word in NEGATIVE_WORDS)
+    if positive > negative:
+        return 'positive', {'positive': 0.9, 'neutral': 0.08, 'negative': 0.02}
+    if negative > positive:
+        return 'negative', {'positive': 0.03, 'neutral': 0.12, 'negative': 0.85}
+    if positive:
+        return 'mixed', {'positive': 0.45, 'neutral': 0.1, 'negative': 0.45}
+    return 'neutral', {'positive': 0.05, 'neutral': 0.9, 'negative': 0.05}
+
+
+def _audio_seconds(data):
+    """Duration of a WAV upload, or None for anything else"""
+    try:
+        with wave.open(io.BytesIO(data)) as w:
+            return w.getnframes() / w.getframerate()
+    except (wave.Error, EOFError):
+        return None
+
+
+def embed(text, dimensions):
+    """Unit vector of hashed tokens, so similar texts get similar vectors"""
+    vector = [0.0] * dimensions
+    for token in re.findall(r'\w+', text.lower()):
+        h = _checksum(token)
+        vector[h % dimensions] += 1.0 if h & 0x80000000 else -1.0
+    norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+    return [value / norm for value in vector]
+
+
+class FakeAzureServer:
+    """Threaded HTTP server answering the fake Azure routes
+
+    Use ``start()`` to serve from a background thread (tests, benchmarks)
+    or ``serve_forever()`` to block (the management command).
+    """
+
+    def __init__(self, profile=None, host='127.0.0.1', port=0):
+        self.profile = profile if isinstance(profile, FakeAzureProfile) else FakeAzureProfile(profile)
+        self.rng = random.Random(self.profile.seed)
+        self.lock = threading.Lock()
+        self.transcriptions = {}
+        self.blobs = {}  # path -> seconds of audio (None if not a WAV file)
+        self.blocks = {}  # path -> staged blocks of an upload in progress
+        self.counters = {}
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.fake = self
+        self.thread = None
+        self.routes = [
+            ('POST', r'/speechtotext/v3\.2/transcriptions', 'speech.transcriptions', self.create_transcription),
+            ('GET', r'/speechtotext/v3\.2/transcriptions/(?P<id>[0-9a-f-]+)', 'speech.transcriptions',
+             self.get_transcription),
+            ('GET', r'/speechtotext/v3\.2/transcriptions/(?P<id>[0-9a-f-]+)/files', 'speech.transcriptions',
+             self.transcription_files),
+            ('DELETE', r'/speechtotext/v3\.2/transcriptions/(?P<id>[0-9a-f-]+)', 'speech.transcriptions',
+             self.delete_transcription),
+            ('GET', r'/speech-results/(?P<id>[0-9a-f-]+)\.json', 'speech.results', self.transcription_content),
+            ('POST', r'/text/analytics/v3\.1/sentiment', 'language.sentiment', self.sentiment),
+            ('POST', r'/language/:analyze-text', 'language.analyze', self.analyze_text),
+            ('POST', r'/contentsafety/text:analyze', 'content_safety.analyze', self.content_safety),
+            ('POST', r'/openai/deployments/[^/]+/chat/completions', 'openai.chat', self.chat_completion),
+            ('POST', r'/openai/deployments/[^/]+/embeddings', 'openai.embeddings', self.embeddings),
+            ('PUT', r'/[^/]+/[^/]+/.+', 'storage.blob', self.put_blob),
+        ]
+        self.routes = [(method, re.compile(pattern + '$'), name, fn) for method, pattern, name, fn in self.routes]
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def settings_overrides(self, poll_interval=0.1):
+        return service_settings(self.url, poll_interval)
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name='fake-azure', daemon=True)
+        self.thread.start()
+        return self
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self.thread is not None:
+            self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def stats(self):
+        with self.lock:
+            return {name: dict(counts) for name, counts in self.counters.items()}
+
+    def _count(self, route, outcome):
+        with self.lock:
+            counts = self.counters.setdefault(route, {'requests': 0, 'errors': 0, 'throttled': 0})
+            counts['requests'] += 1
+            if outcome:
+                counts[outcome] += 1
+
+    def _draw(self, behaviour):
+        """(outcome, delay) for one request"""
+        with self.lock:
+            roll = self.rng.random()
+            delay = behaviour.latency.sample(self.rng)
+        if roll < behaviour.throttle_rate:
+            return 'throttled', 0.0
+        if roll < behaviour.throttle_rate + behaviour.error_rate:
+            return 'errors', delay
+        return None, delay
+
+    def handle(self, handler, method):
+        """Route one request; returns (status, headers, body bytes)"""
+        path = urlsplit(handler.path).path
+        length = int(handler.headers.get('Content-Length') or 0)
+        body = handler.rfile.read(length) if length else b''
+        if method == 'GET' and path == '/_fake/stats':
+            return 200, {}, json.dumps(self.stats()).encode()
+
+        for route_method, pattern, name, fn in self.routes:
+            match = pattern.match(path)
+            if route_method == method and match:
+                break
+        else:
+            return self._error(404, 'NotFound', f"No fake Azure route for {method} {path}")
+
+        # Result content URLs carry their own SAS token instead of a key
+        authenticated = name == 'speech.results' or any(
+            handler.headers.get(h) for h in ('Ocp-Apim-Subscription-Key', 'api-key', 'Authorization')
+        )
+        if not authenticated:
+            self._count(name, 'errors')
+            return self._error(401, 'Unauthorized', 'Missing subscription key')
+
+        outcome, delay = self._draw(self.profile.behaviour(name))
+        self._count(name, outcome)
+        if delay:
+            time.sleep(delay)
+        if outcome == 'throttled':
+            status, headers, payload = self._error(429, 'TooManyRequests', 'Rate limit is exceeded')
+            headers['Retry-After'] = str(self.profile.retry_after)
+            return status, headers, payload
+        if outcome == 'errors':
+            status = self.rng.choice((500, 503))
+            return self._error(status, 'InternalServerError', 'Injected fake Azure failure')
+
+        try:
+            request_json = json.loads(body) if body and method != 'PUT' else None
+            return fn(handler, request_json or body, **match.groupdict())
+        except FakeAzureError as e:
+            return self._error(e.status, e.code, str(e))
+        except (ValueError, KeyError, TypeError) as e:
+            return self._error(400, 'InvalidRequest', str(e))
+
+    def _error(self, status, code, message):
+        return status, {}, json.dumps({'error': {'code': code, 'message': message}}).encode()
+
+    def _json(self, payload, status=200, headers=None):
+        return status, headers or {}, json.dumps(payload).encode()
+
+    # Storage
+
+    def put_blob(self, handler, body):
+        path = urlsplit(handler.path).path
+        query = urlsplit(handler.path).query
+        with self.lock:
+            if 'comp=blocklist' in query:
+                # Commit staged blocks in the order the list names them
+                ids = re.findall(r'<(?:Latest|Uncommitted|Committed)>([^<]+)<', body.decode())
+                blocks = self.blocks.pop(path, {})
+                self.blobs[path] = _audio_seconds(b''.join(blocks[block_id] for block_id in ids))
+            elif 'comp=block' in query:
+                block_id = re.search(r'blockid=([^&]+)', query).group(1)
+                self.blocks.setdefault(path, {})[unquote(block_id)] = body
+            else:
+                self.blobs[path] = _audio_seconds(body)
+        headers = {
+            'ETag': f'"0x{_checksum(path):X}"',
+            'Last-Modified': datetime.now(timezone.utc).strftime('%a, %d %b %Y %H:%M:%S GMT'),
+            'x-ms-request-server-encrypted': 'true',
+        }
+        return 201, headers, b''
+
+    # Speech batch transcription
+
+    def _transcription(self, transcription_id):
+        with self.lock:
+            record = self.transcriptions.get(transcription_id)
+        if record is None:
+            raise FakeAzureError(404, 'NotFound', f"Transcription {transcription_id} not found")
+        return record
+
+    def _transcription_status(self, record):
+        elapsed = time.monotonic() - record['started']
+        if elapsed >= self.profile.transcription_seconds:
+            return 'Succeeded'
+        return 'Running' if elapsed >= self.profile.transcription_seconds / 4 else 'NotStarted'
+
+    def _transcription_view(self, record):
+        return {
+            'self': f"{self.url}/speechtotext/v3.2/transcriptions/{record['id']}",
+            'displayName': record['displayName'],
+            'locale': record['locale'],
+            'createdDateTime': record['created'],
+            'lastActionDateTime': _now(),
+            'status': self._transcription_status(record),
+            'links': {'files': f"{self.url}/speechtotext/v3.2/transcriptions/{record['id']}/files"},
+        }
+
+    def create_transcription(self, handler, request):
+        if not request.get('contentUrls'):
+            raise FakeAzureError(400, 'InvalidPayload', 'contentUrls is required')
+        transcription_id = str(uuid.uuid4())
+        source = request['contentUrls'][0]
+        with self.lock:
+            seconds = self.blobs.get(urlsplit(source).path)
+        if seconds:
+            phrases = max(1, round(seconds / self.profile.seconds_per_phrase))
+        else:
+            phrases = self.profile.phrases
+        record = {
+            'id': transcription_id,
+            'displayName': request.get('displayName', ''),
+            'locale': request.get('locale', 'en-US'),
+            'source': source,
+            'phrases': phrases,
+            'created': _now(),
+            'started': time.monotonic(),
+        }
+        with self.lock:
+            self.transcriptions[transcription_id] = record
+        return self._json(self._transcription_view(record), status=201)
+
+    def get_transcription(self, handler, request, id):
+        return self._json(self._transcription_view(self._transcription(id)))
+
+    def transcription_files(self, handler, request, id):
+        record = self._transcription(id)
+        if self._transcription_status(record) != 'Succeeded':
+            return self._json({'values': []})
+        return self._json({'values': [{
+            'kind': 'Transcription',
+            'name': 'contenturl_0.json',
+            'links': {'contentUrl': f"{self.url}/speech-results/{id}.json?sv=fake&sig=fake"},
+        }]})
+
+    def transcription_content(self, handler, request, id):
+        record = self._transcription(id)
+        if self._transcription_status(record) != 'Succeeded':
+            raise FakeAzureError(404, 'NotFound', 'Transcription result is not ready')
+        phrases = []
+        offset = 0.0
+        for index in range(record['phrases']):
+            speaker, text = SCRIPT[index % len(SCRIPT)]
+            duration = 1.0 + len(text.split()) * 0.35
+            phrases.append({
+                'recognitionStatus': 'Success',
+                'channel': 0,
+                'speaker': speaker,
+                'offset': f"PT{offset:.2f}S",
+                'duration': f"PT{duration:.2f}S",
+                'offsetInTicks': int(offset * 10_000_000),
+                'durationInTicks': int(duration * 10_000_000),
+                'nBest': [{
+                    'confidence': 0.93,
+                    'lexical': text.lower(),
+                    'itn': text.lower(),
+                    'maskedITN': text.lower(),
+                    'display': text,
+                }],
+            })
+            offset += duration + 0.4
+        result = {
+            'source': record['source'],
+            'timestamp': record['created'],
+            'durationInTicks': int(offset * 10_000_000),
+            'duration': f"PT{offset:.2f}S",
+            'combinedRecognizedPhrases': [],
+            'recognizedPhrases': phrases,
+        }
+        if self.profile.combined_phrases:
+            display = ' '.join(phrase['nBest'][0]['display'] for phrase in phrases)
+            result['combinedRecognizedPhrases'].append({
+                'channel': 0, 'lexical': display.lower(), 'itn': display.lower(),
+                'maskedITN': display.lower(), 'display': display,
+            })
+        return self._json(result)
+
+    def delete_transcription(self, handler, request, id):
+        with self.lock:
+            self.transcriptions.pop(id, None)
+        return 204, {}, b''
+
+    # Language
+
+    def sentiment(self, handler, request):
+        documents = []
+        for document in request['documents']:
+            label, scores = sentiment_of(document['text'])
+            sentences = []
+            for sentence in re.findall(r'[^.!?]+[.!?]?', document['text']):
+                sentence = sentence.strip()
+                if sentence:
+                    sentence_label, sentence_scores = sentiment_of(sentence)
+                    sentences.append({
+                        'text': sentence, 'sentiment': sentence_label, 'confidenceScores': sentence_scores,
+                        'offset': document['text'].find(sentence), 'length': len(sentence), 'opinions': [],
+                    })
+            documents.append({
+                'id': document['id'], 'sentiment': label, 'confidenceScores': scores,
+                'sentences': sentences, 'warnings': [],
+            })
+        return self._json({'documents': documents, 'errors': [], 'modelVersion': '2022-11-01'})
+
+    def analyze_text(self, handler, request):
+        """The Language API route the TextAnalyticsClient SDK uses"""
+        kind = request['kind']
+        documents = []
+        for document in request['analysisInput']['documents']:
+            result = {'id': document['id'], 'warnings': []}
+            if kind == 'KeyPhraseExtraction':
+                words = re.findall(r'[A-Za-z]{5,}', document['text'])
+                result['keyPhrases'] = list(dict.fromkeys(word.lower() for word in words))[:10]
+            elif kind == 'PiiEntityRecognition':
+                result.update(entities=[], redactedText=document['text'])
+            else:
+                result['entities'] = []
+            documents.append(result)
+        results = {'documents': documents, 'errors': [], 'modelVersion': '2022-11-01'}
+        return self._json({'kind': f"{kind}Results", 'results': results})
+
+    # Content Safety
+
+    def content_safety(self, handler, request):
+        lowered = request['text'].lower()
+        categories = request.get('categories') or SAFETY_CATEGORIES
+        return self._json({
+            'blocklistsMatch': [],
+            'categoriesAnalysis': [
+                {
+                    'category': category,
+                    'severity': 2 if any(word in lowered for word in SAFETY_WORDS.get(category, ())) else 0,
+                }
+                for category in categories
+            ],
+        })
+
+    # OpenAI
+
+    def chat_completion(self, handler, request):
+        prompt = request['messages'][-1]['content']
+        if (request.get('response_format') or {}).get('type') == 'json_object':
+            content = json.dumps(self.compliance_audit(prompt))
+        else:
+            content = 'This is a simulated response from the local fake Azure OpenAI service.'
+        prompt_tokens = sum(len(message['content'].split()) for message in request['messages'])
+        completion_tokens = len(content.split())
+        return self._json({
+            'id': f"chatcmpl-{uuid.uuid4().hex}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': 'gpt-4',
+            'choices': [{
+                'index': 0, 'finish_reason': 'stop',
+                'message': {'role': 'assistant', 'content': content},
+            }],
+            'usage': {
+                'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens,
+            },
+        })
+
+    def compliance_audit(self, prompt):
+        """A plausible audit whose score is fixed by the transcript text"""
+        transcript = prompt.split('TRANSCRIPT:', 1)[-1]
+        score = 60 + _checksum(transcript) % 40
+        lowered = transcript.lower()
+        disclosed = 'recorded' in lowered
+        verified = 'verify' in lowered or 'date of birth' in lowered
+        violations = []
+        if not disclosed:
+            violations.append({'type': 'GDPR', 'example': 'No recording disclosure', 'severity': 'high'})
+        if 'card number' in lowered:
+            violations.append({'type': 'PCI-DSS', 'example': 'Card number read aloud', 'severity': 'high'})
+        label, _ = sentiment_of(transcript)
+        return {
+            'checklist': [
+                {'rule': 'GDPR Compliance', 'passed': disclosed, 'details': 'Recording disclosure checked'},
+                {'rule': 'HIPAA Compliance', 'passed': True, 'details': 'No health information discussed'},
+                {'rule': 'PCI-DSS Compliance', 'passed': 'card number' not in lowered,
+                 'details': 'Payment details checked'},
+                {'rule': 'Professional Conduct', 'passed': verified, 'details': 'Identity verification checked'},
+            ],
+            'risk_level': 'Low' if score >= 85 else 'Medium' if score >= 70 else 'High',
+            'score': score,
+            'violations': violations,
+            'improvements': ['Confirm the resolution before closing the call'],
+            'sentiment': {'positive': 'Positive', 'negative': 'Negative'}.get(label, 'Neutral'),
+            'summary': 'Simulated audit from the local fake Azure OpenAI service.',
+        }
+
+    def embeddings(self, handler, request):
+        inputs = request['input']
+        inputs = [inputs] if isinstance(inputs, str) else inputs
+        dimensions = int(request.get('dimensions') or self.profile.embedding_dimensions)
+        return self._json({
+            'object': 'list',
+            'model': 'text-embedding-3-small',
+            'data': [
+                {'object': 'embedding', 'index': index, 'embedding': embed(text, dimensions)}
+                for index, text in enumerate(inputs)
+            ],
+            'usage': {'prompt_tokens': sum(len(text.split()) for text in inputs),
+                      'total_tokens': sum(len(text.split()) for text in inputs)},
+        })
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def _respond(self, method):
+        status, headers, body = self.server.fake.handle(self, method)
+        self.send_response(status)
+        if body and 'Content-Type' not in headers:
+            headers['Content-Type'] = 'application/json; charset=utf-8'
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if method != 'HEAD':
+            self.wfile.write(body)
+
+    def do_GET(self):
+        self._respond('GET')
+
+    def do_POST(self):
+        self._respond('POST')
+
+    def do_PUT(self):
+        self._respond('PUT')
+
+    def do_DELETE(self):
+        self._respond('DELETE')
+
+    def log_message(self, format, *args):
+        # Request logging would swamp load tests
+        pass
+
+
+def _serve_in_process(profile, host, port, ready):
+    server = FakeAzureServer(profile, host=host, port=port)
+    ready.put(server.url)
+    server.serve_forever()
+
+
+class FakeAzureProcess:
+    """FakeAzureServer in a child process, so benchmarks do not share their
+    GIL and memory with it"""
+
+    def __init__(self, profile=None, host='127.0.0.1', port=0):
+        # Validate here rather than in the child
+        self.profile = profile if isinstance(profile, FakeAzureProfile) else FakeAzureProfile(profile)
+        self.host = host
+        self.port = port
+        self.process = None
+        self.url = None
+
+    def start(self, timeout=10):
+        ready = multiprocessing.Queue()
+        self.process = multiprocessing.Process(
+            target=_serve_in_process, args=(self.profile, self.host, self.port, ready),
+            name='fake-azure', daemon=True
+        )
+        self.process.start()
+        self.url = ready.get(timeout=timeout)
+        return self
+
+    def settings_overrides(self, poll_interval=0.1):
+        return service_settings(self.url, poll_interval)
+
+    def stats(self):
+        with urllib.request.urlopen(f"{self.url}/_fake/stats") as response:
+            return json.load(response)
+
+    def stop(self):
+        if self.process is not None:
+            self.process.terminate()
+            self.process.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,40 @@
+from datetime import datetime, time, timedelta
+import django_filters
+from django.utils import timezone
+from .models import AudioJob
+
+
+class AudioJobFilter(django_filters.FilterSet):
+    """Server-side filters for the call history list
+
+    Date bounds are turned into half-open ``created_at`` ranges rather than
+    ``created_at__date`` lookups so the filters stay index scans.
+    """
+    agent = django_filters.CharFilter(field_name='agent')
+    compliance_status = django_filters.ChoiceFilter(
+        field_name='compliance_status',
+        choices=AudioJob._meta.get_field('compliance_status').choices
+    )
+    status = django_filters.ChoiceFilter(
+        field_name='status',
+        choices=AudioJob._meta.get_field('status').choices
+    )
+    date_from = django_filters.DateFilter(method='filter_date_from')
+    date_to = django_filters.DateFilter(method='filter_date_to')
+    score_min = django_filters.NumberFilter(field_name='score', lookup_expr='gte')
+    score_max = django_filters.NumberFilter(field_name='score', lookup_expr='lte')
+
+    class Meta:
+        model = AudioJob
+        fields = ['agent', 'compliance_status', 'status']
+
+    def filter_date_from(self, queryset, name, value):
+        return queryset.filter(created_at__gte=_start_of_day(value))
+
+    def filter_date_to(self, queryset, name, value):
+        # Inclusive of the whole end day
+        return queryset.filter(created_at__lt=_start_of_day(value + timedelta(days=1)))
+
+
+def _start_of_day(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
@@ -0,0 +1,275 @@
+"""
+Streaming bulk import of historical calls.
+
+Input is either NDJSON (one call per line; ``.ndjson``/``.jsonl``) or JSON
+holding an array of calls, at the top level or as the first array in a
+wrapping object such as the frontend's ``{"callHistory": [...]}``. Both are
+parsed incrementally, so memory use does not grow with the file; ``.gz``
+files are decompressed on the fly.
+
+Each call uses the frontend mock-data shape::
+
+    {"id": "call-123", "date": "May 3, 2025", "time": "14:30",   # or "created_at": ISO 8601
+     "agent": "...", "customer": "...", "duration": "05:42",
+     "status": "compliant", "score": 92,
+     "transcript": [{"speaker": "agent", "text": "...", "time": "00:00", "flagged": false}],
+     "complianceItems": [...], "analytics": {...}}
+
+Calls are written in batches, each batch one transaction of ``bulk_create``
+calls. Job ids are derived from the source ``id`` (uuid5), so a batch that
+is replayed after a crash skips jobs that already exist, and a checkpoint
+file records how many calls have been committed so ``--resume`` can skip
+straight past them.
+"""
+
+import gzip
+import json
+import os
+import time
+import uuid
+from datetime import datetime
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .models import AudioJob, Transcript, ComplianceReport, CallAnalytics
+
+# Namespace for deterministic job ids derived from source call ids
+IMPORT_NAMESPACE = uuid.UUID('6f1c1f4e-6a3e-4f55-9d0e-2b8f6f0f4c11')
+READ_CHUNK_SIZE = 1024 * 1024
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+def open_source(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+
+def is_ndjson(path):
+    return path.removesuffix('.gz').endswith(('.ndjson', '.jsonl'))
+
+
+def iter_ndjson(f):
+    for line_number, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ImportFormatError(f"Invalid JSON on line {line_number}: {e}")
+
+
+def iter_json_array(f, chunk_size=READ_CHUNK_SIZE):
+    """Yield the elements of the first JSON array in a stream, one at a time"""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    # Skip to the opening bracket of the array of calls
+    while '[' not in buffer:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            raise ImportFormatError('No JSON array of calls found')
+        buffer = chunk if not buffer else buffer + chunk
+    buffer = buffer[buffer.index('[') + 1:]
+    pos = 0
+    eof = False
+    while True:
+        while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+            pos += 1
+        if pos < len(buffer) and buffer[pos] == ']':
+            return
+        try:
+            if pos >= len(buffer):
+                raise json.JSONDecodeError('Need more data', buffer, pos)
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise ImportFormatError('Truncated or invalid JSON array')
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            # Drop what has been consumed so the buffer stays about one record long
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            continue
+        yield item
+        pos = end
+
+
+def iter_calls(path):
+    with open_source(path) as f:
+        yield from (iter_ndjson(f) if is_ndjson(path) else iter_json_array(f))
+
+
+def job_id_for(record):
+    source_id = record.get('id')
+    if source_id is None:
+        return uuid.uuid4()
+    return uuid.uuid5(IMPORT_NAMESPACE, str(source_id))
+
+
+def parse_created_at(record):
+    if record.get('created_at'):
+        value = parse_datetime(record['created_at'])
+        if value is None:
+            raise ImportFormatError(f"Invalid created_at: {record['created_at']}")
+    elif record.get('date'):
+        value = datetime.strptime(f"{record['date']} {record.get('time', '00:00')}", "%B %d, %Y %H:%M")
+    else:
+        return timezone.now()
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+def build_call(record):
+    """Unsaved model instances for one call: (job, transcripts, report, analytics)"""
+    job_id = job_id_for(record)
+    segments = record.get('transcript') or []
+    items = record.get('complianceItems') or []
+    violations = record.get('violations')
+    if violations is None:
+        violations = [
+            {'type': item.get('category', ''), 'example': item.get('details', ''), 'severity': 'high'}
+            for item in items if item.get('status') == 'violation'
+        ]
+    score = int(record.get('score') or 0)
+    sentiment = record.get('sentiment', 'neutral')
+
+    job = AudioJob(
+        id=job_id,
+        created_at=parse_created_at(record),
+        agent=record.get('agent') or 'Unknown Agent',
+        customer=record.get('customer') or 'Unknown Customer',
+        duration=record.get('duration') or '00:00',
+        status='complete',
+        progress=100,
+        current_step='Complete',
+        status_message='Imported',
+        score=score,
+        compliance_status=record.get('status') or 'compliant',
+        flagged_count=sum(1 for segment in segments if segment.get('flagged')),
+        dominant_sentiment=sentiment,
+        violation_count=len(violations),
+    )
+    transcripts = [
+        Transcript(
+            job_id=job_id,
+            speaker=segment.get('speaker', 'unknown'),
+            start_time=segment.get('time') or segment.get('start_time') or '00:00',
+            text=segment.get('text', ''),
+            flagged=bool(segment.get('flagged')),
+            flag_reason=segment.get('flagReason') or segment.get('flag_reason'),
+        )
+        for segment in segments
+    ]
+    report = ComplianceReport(
+        job_id=job_id,
+        checklist=items,
+        risk_level=record.get('riskLevel', record.get('status', 'unknown')),
+        summary=record.get('summary', ''),
+        score=score,
+        recommendations=record.get('recommendations', []),
+        violations=violations,
+        improvements=record.get('improvements', []),
+        sentiment=sentiment,
+    )
+    analytics_data = record.get('analytics') or {}
+    analytics = CallAnalytics(
+        job_id=job_id,
+        agent_talk_time=analytics_data.get('agentTalkTime', 0),
+        customer_talk_time=analytics_data.get('customerTalkTime', 0),
+        agent_tone=analytics_data.get('agentTone', 0.0),
+        customer_sentiment=analytics_data.get('customerSentiment', 0.0),
+        silence_periods=analytics_data.get('silencePeriods', 0),
+        interruption_count=analytics_data.get('interruptionCount', 0),
+        key_phrases=analytics_data.get('keyPhrases', []),
+    )
+    return job, transcripts, report, analytics
+
+
+def write_batch(calls):
+    """Insert a batch of built calls in one transaction; returns rows written"""
+    with transaction.atomic():
+        # Replayed batches (after a crash or without --resume) skip known jobs
+        ids = [job.id for job, _, _, _ in calls]
+        existing = set()
+        for start in range(0, len(ids), 500):
+            existing.update(AudioJob.objects.filter(id__in=ids[start:start + 500]).values_list('id', flat=True))
+        calls = [call for call in calls if call[0].id not in existing]
+        if not calls:
+            return 0
+        jobs = [job for job, _, _, _ in calls]
+        transcripts = [t for _, segments, _, _ in calls for t in segments]
+        reports = [report for _, _, report, _ in calls]
+        analytics = [row for _, _, _, row in calls]
+        AudioJob.objects.bulk_create(jobs, batch_size=500)
+        Transcript.objects.bulk_create(transcripts, batch_size=500)
+        ComplianceReport.objects.bulk_create(reports, batch_size=500)
+        CallAnalytics.objects.bulk_create(analytics, batch_size=500)
+    return len(jobs) + len(transcripts) + len(reports) + len(analytics)
+
+
+class Checkpoint:
+    """How many source calls have been committed, stored next to the input"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f).get('calls_done', 0)
+        except FileNotFoundError:
+            return 0
+
+    def save(self, calls_done):
+        tmp = f"{self.path}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump({'calls_done': calls_done}, f)
+        os.replace(tmp, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def import_calls(path, batch_size=1000, resume=False, checkpoint_path=None, progress=None):
+    """Stream calls from ``path`` into the database
+
+    ``progress`` is called after each batch with a stats dict.
+    Returns the final stats dict.
+    """
+    checkpoint = Checkpoint(checkpoint_path or f"{path}.import-checkpoint")
+    skip = checkpoint.load() if resume else 0
+    stats = {'calls_read': 0, 'calls_skipped': skip, 'rows_written': 0, 'elapsed': 0.0, 'rows_per_second': 0.0}
+    started = time.monotonic()
+    batch = []
+
+    def flush():
+        if batch:
+            stats['rows_written'] += write_batch(batch)
+            batch.clear()
+        checkpoint.save(stats['calls_read'])
+        stats['elapsed'] = time.monotonic() - started
+        stats['rows_per_second'] = stats['rows_written'] / stats['elapsed'] if stats['elapsed'] else 0.0
+        if progress:
+            progress(dict(stats))
+
+    for record in iter_calls(path):
+        stats['calls_read'] += 1
+        if stats['calls_read'] <= skip:
+            continue
+        if not isinstance(record, dict):
+            raise ImportFormatError(f"Call #{stats['calls_read']} is not a JSON object")
+        try:
+            batch.append(build_call(record))
+        except (ImportFormatError, ValueError, TypeError) as e:
+            raise ImportFormatError(f"Call #{stats['calls_read']} ({record.get('id', 'no id')}): {e}")
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+    checkpoint.clear()
+    return stats
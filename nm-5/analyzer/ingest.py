@@ -0,0 +1,187 @@
+"""
+Bulk ingestion of many recordings in one request.
+
+``POST /api/jobs/bulk/`` accepts several ``files`` or one ``archive``
+(.zip, .tar, .tar.gz, .tgz). Archives are extracted member by member with
+fixed-size chunk copies straight to ``MEDIA_ROOT/uploads/batches/<batch>/``
+(tar in streaming ``r|*`` mode, zip through its central directory), so an
+upload of any size is never held in memory. All jobs of the batch are
+created with a single ``bulk_create`` and handed to a bounded worker pool,
+``BULK_PROCESSING_WORKERS`` wide; the per-endpoint Azure limiters in
+``analyzer.resilience`` still govern the actual request rate.
+"""
+
+import logging
+import os
+import shutil
+import tarfile
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db.models import Avg, Count
+from django.utils.text import get_valid_filename
+from .models import AudioJob
+
+logger = logging.getLogger(__name__)
+
+AUDIO_EXTENSIONS = ('.wav', '.mp3')
+ARCHIVE_EXTENSIONS = ('.zip', '.tar', '.tar.gz', '.tgz')
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class BulkUploadError(ValueError):
+    pass
+
+
+def is_audio_name(name):
+    return name.lower().endswith(AUDIO_EXTENSIONS)
+
+
+def batch_directory(batch_id):
+    return os.path.join('uploads', 'batches', str(batch_id))
+
+
+class _BatchWriter:
+    """Writes extracted recordings under one batch directory with unique, safe names"""
+
+    def __init__(self, batch_id):
+        self.relative_dir = batch_directory(batch_id)
+        self.directory = os.path.join(settings.MEDIA_ROOT, self.relative_dir)
+        self.files = []  # (original name, storage name, absolute path)
+        self.total_bytes = 0
+        self._used = set()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def write(self, name, source):
+        if len(self.files) >= settings.BULK_UPLOAD_MAX_FILES:
+            raise BulkUploadError(f"A batch may contain at most {settings.BULK_UPLOAD_MAX_FILES} recordings")
+        # Archive member names are untrusted: keep only a sanitised basename
+        base = get_valid_filename(os.path.basename(name)) or 'recording'
+        stem, ext = os.path.splitext(base)
+        candidate, n = base, 1
+        while candidate in self._used:
+            candidate = f"{stem}_{n}{ext}"
+            n += 1
+        self._used.add(candidate)
+        path = os.path.join(self.directory, candidate)
+        with open(path, 'wb') as destination:
+            self._copy(source, destination)
+        self.files.append((os.path.basename(name), f"{self.relative_dir}/{candidate}", path))
+
+    def _copy(self, source, destination):
+        """Chunked copy that stops once the batch exceeds BULK_UPLOAD_MAX_BYTES
+
+        Counts the bytes actually read, so archive headers that understate a
+        member's size (zip bombs) do not get past the limit.
+        """
+        while True:
+            chunk = source.read(COPY_CHUNK_SIZE)
+            if not chunk:
+                return
+            self.total_bytes += len(chunk)
+            if self.total_bytes > settings.BULK_UPLOAD_MAX_BYTES:
+                raise BulkUploadError(
+                    f"A batch may contain at most {settings.BULK_UPLOAD_MAX_BYTES} bytes of recordings"
+                )
+            destination.write(chunk)
+
+    def discard(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def extract_uploads(batch_id, files=None, archive=None):
+    """Write uploaded files or archive members to disk
+
+    Returns a list of (original name, storage name, absolute path).
+    Non-audio archive members are skipped; a non-audio loose file is an error.
+    """
+    writer = _BatchWriter(batch_id)
+    try:
+        if archive is not None:
+            _extract_archive(archive, writer)
+        for upload in files or []:
+            if not is_audio_name(upload.name):
+                raise BulkUploadError(f"Unsupported file type: {upload.name}")
+            upload.seek(0)
+            writer.write(upload.name, upload)
+        if not writer.files:
+            raise BulkUploadError('No .wav or .mp3 recordings found in upload')
+    except (BulkUploadError, tarfile.TarError, zipfile.BadZipFile, OSError):
+        writer.discard()
+        raise
+    return writer.files
+
+
+def _extract_archive(archive, writer):
+    name = archive.name.lower()
+    archive.seek(0)
+    if name.endswith('.zip'):
+        with zipfile.ZipFile(archive) as zf:
+            for info in zf.infolist():
+                if info.is_dir() or not is_audio_name(info.filename):
+                    continue
+                with zf.open(info) as source:
+                    writer.write(info.filename, source)
+    elif name.endswith(('.tar', '.tar.gz', '.tgz')):
+        # Stream mode reads the upload front to back exactly once
+        with tarfile.open(fileobj=archive, mode='r|*') as tf:
+            for member in tf:
+                if not member.isfile() or not is_audio_name(member.name):
+                    continue
+                source = tf.extractfile(member)
+                writer.write(member.name, source)
+    else:
+        raise BulkUploadError(f"Unsupported archive type: {archive.name}")
+
+
+def create_batch_jobs(batch, files, agent, customer):
+    """Create every job of a batch in one bulk_create"""
+    jobs = AudioJob.objects.bulk_create([
+        AudioJob(
+            batch=batch,
+            audio_file=storage_name,
+            agent=agent,
+            customer=customer,
+            status='pending',
+            progress=0,
+            current_step='Queued',
+            status_message=f"Queued for processing ({original_name})"
+        )
+        for original_name, storage_name, _ in files
+    ])
+    return list(zip(jobs, [path for _, _, path in files]))
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def processing_executor():
+    """Shared bounded pool that runs queued batch jobs"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.BULK_PROCESSING_WORKERS,
+                thread_name_prefix='bulk-ingest'
+            )
+        return _executor
+
+
+def batch_progress(batch):
+    """Aggregate status of every job in a batch, in two queries"""
+    by_status = dict(batch.jobs.values_list('status').annotate(n=Count('id')).order_by())
+    average = batch.jobs.aggregate(progress=Avg('progress'))['progress'] or 0
+    finished = by_status.get('complete', 0) + by_status.get('error', 0)
+    return {
+        'batch_id': str(batch.id),
+        'created_at': batch.created_at,
+        'total': batch.total_jobs,
+        'pending': by_status.get('pending', 0),
+        'processing': by_status.get('processing', 0),
+        'complete': by_status.get('complete', 0),
+        'error': by_status.get('error', 0),
+        'progress': round(average, 1),
+        'finished': finished >= batch.total_jobs,
+    }
@@ -0,0 +1,330 @@
+"""
+HTTP load generator for the jobs API.
+
+Drives a running server (``runserver``, gunicorn on the WSGI entry point or
+daphne on the ASGI one) with a weighted mix of dashboard and upload traffic:
+
+    ``jobs.list``    ``GET /api/jobs/?page_size=50`` (also refreshes the known job ids)
+    ``jobs.status``  ``GET /api/jobs/<id>/status/``, mostly for this run's own uploads
+    ``jobs.result``  ``GET /api/jobs/<id>/result/`` with ``If-None-Match`` once an ETag is known
+    ``stats``        ``GET /api/stats/``
+    ``jobs.upload``  ``POST /api/jobs/`` with a synthetic WAV recording
+
+A status or result request drawn before any job id is known is sent as a
+list request instead, and recorded under ``jobs.list``.
+
+Two arrival models:
+
+- closed loop (``users``): each virtual user sends a request, waits for it,
+  thinks for ``think_time`` seconds and repeats, like dashboard tabs
+- open loop (``rate``): requests arrive as a Poisson process whatever the
+  server's speed, through at most ``concurrency`` connections. Latency
+  is measured from the scheduled arrival time, so time spent queued in
+  the client counts (no coordinated omission)
+
+Each endpoint reports request and error counts (transport errors and HTTP
+status >= 400), status codes, p50/p95/p99 and a latency histogram with
+fixed millisecond buckets, so runs with different worker and connection
+settings can be compared side by side. The ``load_test`` command wraps
+this, can start the server itself, and sweeps several concurrency levels.
+"""
+
+import io
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import requests
+from .pipeline_benchmark import git_commit, percentile, write_synthetic_call
+
+RESULTS_VERSION = 1
+DEFAULT_MIX = {'jobs.list': 30, 'jobs.status': 35, 'jobs.result': 25, 'stats': 5, 'jobs.upload': 5}
+HISTOGRAM_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+# Poll this run's uploads until they finish; other jobs are polled at random
+RECENT_UPLOADS = 50
+
+
+def parse_mix(spec):
+    """``jobs.list=30,jobs.upload=5`` -> weights dict, checking endpoint names"""
+    mix = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        name, sep, weight = item.partition('=')
+        if not sep or name not in DEFAULT_MIX:
+            raise ValueError(f"Invalid mix entry '{item}' (use NAME=WEIGHT with NAME in {', '.join(DEFAULT_MIX)})")
+        try:
+            mix[name] = float(weight)
+        except ValueError:
+            raise ValueError(f"Invalid weight in '{item}'")
+    if not mix or sum(mix.values()) <= 0 or min(mix.values()) < 0:
+        raise ValueError('The mix needs at least one positive weight')
+    return mix
+
+
+def synthetic_recording(seconds=30):
+    """WAV bytes for uploads"""
+    buffer = io.BytesIO()
+    write_synthetic_call(buffer, seconds)
+    return buffer.getvalue()
+
+
+class EndpointStats:
+    def __init__(self, name):
+        self.name = name
+        self.latencies = []
+        self.errors = 0
+        self.status_codes = Counter()
+        self.lock = threading.Lock()
+
+    def record(self, latency, status=None, error=None):
+        with self.lock:
+            self.latencies.append(latency)
+            self.status_codes[str(status) if status is not None else type(error).__name__] += 1
+            if error is not None or status >= 400:
+                self.errors += 1
+
+    def summary(self, elapsed):
+        requests_made = len(self.latencies)
+        latencies_ms = [latency * 1000 for latency in self.latencies]
+        counts = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+        for value in latencies_ms:
+            index = next((i for i, bound in enumerate(HISTOGRAM_BUCKETS_MS) if value <= bound), -1)
+            counts[index] += 1
+        labels = [f"<={bound}" for bound in HISTOGRAM_BUCKETS_MS] + [f">{HISTOGRAM_BUCKETS_MS[-1]}"]
+        return {
+            'requests': requests_made,
+            'errors': self.errors,
+            'error_rate': round(self.errors / requests_made, 4) if requests_made else 0.0,
+            'requests_per_second': round(requests_made / elapsed, 2) if elapsed else None,
+            'p50_ms': round(percentile(latencies_ms, 50), 2) if latencies_ms else None,
+            'p95_ms': round(percentile(latencies_ms, 95), 2) if latencies_ms else None,
+            'p99_ms': round(percentile(latencies_ms, 99), 2) if latencies_ms else None,
+            'max_ms': round(max(latencies_ms), 2) if latencies_ms else None,
+            'status_codes': dict(self.status_codes),
+            'histogram_ms': dict(zip(labels, counts)),
+        }
+
+
+class LoadScenario:
+    """The request mix, plus the job ids it has learned about so far"""
+
+    def __init__(self, base_url, mix=None, recording=None, timeout=30, seed=None):
+        self.base_url = base_url.rstrip('/')
+        self.mix = mix or DEFAULT_MIX
+        self.recording = recording
+        self.timeout = timeout
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {name: EndpointStats(name) for name in self.mix}
+        self.known_jobs = []
+        self.uploads = []  # this run's unfinished uploads, newest last
+        self.etags = {}
+
+    def choose(self):
+        with self.lock:
+            names = list(self.mix)
+            return self.rng.choices(names, weights=[self.mix[name] for name in names])[0]
+
+    def _pick(self, jobs):
+        with self.lock:
+            return self.rng.choice(jobs) if jobs else None
+
+    def _remember(self, job_ids):
+        with self.lock:
+            known = set(self.known_jobs)
+            self.known_jobs.extend(job_id for job_id in job_ids if job_id not in known)
+
+    def perform(self, session, name, scheduled=None):
+        """Send one request of kind ``name`` and record it
+
+        ``scheduled`` is the intended start (perf_counter) for open-loop
+        arrivals; latency is measured from it.
+        """
+        started = scheduled if scheduled is not None else time.perf_counter()
+        name, method, path, kwargs, job_id = self._request(name)
+        try:
+            response = session.request(method, f"{self.base_url}{path}", timeout=self.timeout, **kwargs)
+        except requests.RequestException as e:
+            self._stats(name).record(time.perf_counter() - started, error=e)
+            return None
+        self._stats(name).record(time.perf_counter() - started, status=response.status_code)
+        self._learn(name, response, job_id)
+        return response
+
+    def _stats(self, name):
+        # jobs.list may be sent as a fallback even when the mix leaves it out
+        with self.lock:
+            return self.stats.setdefault(name, EndpointStats(name))
+
+    def _request(self, name):
+        """(kind actually sent, method, path, request kwargs, job id) for one request of kind ``name``"""
+        if name == 'jobs.upload':
+            # Unique names: the upload view stages files under their original name
+            files = {'file': (f"load-test-{uuid.uuid4().hex}.wav", self.recording or b'', 'audio/wav')}
+            data = {'agent': 'Load Test Agent', 'customer': 'Load Test Customer'}
+            return name, 'POST', '/api/jobs/', {'files': files, 'data': data}, None
+        if name == 'stats':
+            return name, 'GET', '/api/stats/', {}, None
+        if name in ('jobs.status', 'jobs.result'):
+            # Status polls follow this run's uploads, like a user watching progress
+            with self.lock:
+                recent = self.uploads[-RECENT_UPLOADS:] if name == 'jobs.status' else []
+            job_id = self._pick(recent) or self._pick(self.known_jobs)
+            if job_id is not None:
+                if name == 'jobs.status':
+                    return name, 'GET', f"/api/jobs/{job_id}/status/", {}, job_id
+                etag = self.etags.get(job_id)
+                headers = {'If-None-Match': etag} if etag else {}
+                return name, 'GET', f"/api/jobs/{job_id}/result/", {'headers': headers}, job_id
+        # No job to look at yet: list jobs instead, so status/result latencies
+        # only ever describe status/result requests
+        return 'jobs.list', 'GET', '/api/jobs/?page_size=50', {}, None
+
+    def _learn(self, name, response, job_id):
+        if response.status_code >= 400:
+            return
+        if name == 'jobs.upload' and response.status_code == 201:
+            new_id = response.json()['job_id']
+            self._remember([new_id])
+            with self.lock:
+                self.uploads.append(new_id)
+        elif name == 'jobs.list':
+            self._remember(job['id'] for job in response.json().get('results', []))
+        elif name == 'jobs.status' and response.json().get('status') in ('complete', 'error'):
+            with self.lock:
+                if job_id in self.uploads:
+                    self.uploads.remove(job_id)
+        elif name == 'jobs.result' and response.headers.get('ETag'):
+            with self.lock:
+                self.etags[job_id] = response.headers['ETag']
+
+    def warm_up(self, session):
+        """Learn existing job ids before measuring"""
+        response = session.get(f"{self.base_url}/api/jobs/?page_size=200", timeout=self.timeout)
+        response.raise_for_status()
+        self._remember(job['id'] for job in response.json().get('results', []))
+
+    def report(self, elapsed):
+        return {name: stats.summary(elapsed) for name, stats in self.stats.items() if stats.latencies}
+
+
+def _session_factory():
+    local = threading.local()
+
+    def session():
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+        return local.session
+    return session
+
+
+def run_closed_loop(scenario, users, duration, think_time=1.0, ramp_up=0.0):
+    """``users`` virtual users, each looping request -> think -> request"""
+    deadline = time.perf_counter() + duration
+
+    def user(index):
+        time.sleep(ramp_up * index / users)
+        rng = random.Random(index)
+        with requests.Session() as session:
+            while time.perf_counter() < deadline:
+                scenario.perform(session, scenario.choose())
+                if think_time:
+                    # Exponential think times keep users from marching in lockstep
+                    time.sleep(min(rng.expovariate(1 / think_time), max(0.0, deadline - time.perf_counter())))
+
+    threads = [threading.Thread(target=user, args=(i,), daemon=True) for i in range(users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def run_open_loop(scenario, rate, duration, concurrency):
+    """Poisson arrivals at ``rate`` per second through ``concurrency`` connections
+
+    Returns how many arrivals started more than 100 ms late, a sign the
+    client (or the connection cap) rather than the server was the limit.
+    """
+    session = _session_factory()
+    late = 0
+    late_lock = threading.Lock()
+    rng = random.Random()
+
+    def arrival(scheduled, name):
+        nonlocal late
+        if time.perf_counter() - scheduled > 0.1:
+            with late_lock:
+                late += 1
+        scenario.perform(session(), name, scheduled=scheduled)
+
+    start = time.perf_counter()
+    next_arrival = start
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='load') as pool:
+        while True:
+            next_arrival += rng.expovariate(rate)
+            if next_arrival - start >= duration:
+                break
+            delay = next_arrival - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(arrival, next_arrival, scenario.choose())
+    return late
+
+
+def run_load_test(base_url, duration=60, users=None, rate=None, concurrency=16, think_time=1.0, ramp_up=0.0,
+                  mix=None, recording=None, timeout=30, seed=None):
+    """One load test step; pass ``users`` for a closed loop or ``rate`` for an open one
+
+    Returns the step's results dict.
+    """
+    if (users is None) == (rate is None):
+        raise ValueError('Pass exactly one of users (closed loop) or rate (open loop)')
+    mix = mix or DEFAULT_MIX
+    if recording is None and mix.get('jobs.upload'):
+        recording = synthetic_recording()
+    scenario = LoadScenario(base_url, mix=mix, recording=recording, timeout=timeout, seed=seed)
+    with requests.Session() as session:
+        scenario.warm_up(session)
+
+    started = time.perf_counter()
+    late = None
+    if users is not None:
+        run_closed_loop(scenario, users, duration, think_time=think_time, ramp_up=ramp_up)
+    else:
+        late = run_open_loop(scenario, rate, duration, concurrency)
+    elapsed = time.perf_counter() - started
+
+    endpoints = scenario.report(elapsed)
+    total_requests = sum(e['requests'] for e in endpoints.values())
+    total_errors = sum(e['errors'] for e in endpoints.values())
+    all_ms = [latency * 1000 for stats in scenario.stats.values() for latency in stats.latencies]
+    return {
+        'mode': 'closed' if users is not None else 'open',
+        'users': users,
+        'rate': rate,
+        'concurrency': users if users is not None else concurrency,
+        'elapsed_seconds': round(elapsed, 3),
+        'late_arrivals': late,
+        'total': {
+            'requests': total_requests,
+            'errors': total_errors,
+            'error_rate': round(total_errors / total_requests, 4) if total_requests else 0.0,
+            'requests_per_second': round(total_requests / elapsed, 2) if elapsed else None,
+            'p95_ms': round(percentile(all_ms, 95), 2) if all_ms else None,
+        },
+        'endpoints': endpoints,
+    }
+
+
+def results_document(target, steps, options):
+    return {
+        'benchmark': 'load',
+        'version': RESULTS_VERSION,
+        'commit': git_commit(),
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'target': target,
+        'options': options,
+        'steps': steps,
+    }
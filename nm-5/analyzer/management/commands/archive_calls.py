@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from analyzer.archive import archive_old_jobs, restore_job
+
+
+class Command(BaseCommand):
+    help = 'Move transcript and analysis rows of old calls into compressed per-job archives'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int, default=None,
+                            help=f'Archive calls older than this (default ARCHIVE_AFTER_DAYS={settings.ARCHIVE_AFTER_DAYS})')
+        parser.add_argument('--limit', type=int, default=None, help='Archive at most this many calls')
+        parser.add_argument('--restore', metavar='JOB_ID', help='Move one archived call back into the hot tables')
+
+    def handle(self, *args, **options):
+        if options['restore']:
+            if not restore_job(options['restore']):
+                raise CommandError(f"Job {options['restore']} does not exist or is not archived")
+            self.stdout.write(self.style.SUCCESS(f"Restored job {options['restore']}"))
+            return
+
+        stats = archive_old_jobs(options['older_than_days'], limit=options['limit'])
+        ratio = stats['raw_bytes'] / stats['stored_bytes'] if stats['stored_bytes'] else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {stats['jobs']} calls ({stats['rows']} rows, "
+            f"{stats['raw_bytes']} bytes -> {stats['stored_bytes']} bytes, {ratio:.1f}x)"
+        ))
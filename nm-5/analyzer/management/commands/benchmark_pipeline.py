@@ -0,0 +1,120 @@
+import json
+import logging
+import os
+import tempfile
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from analyzer.fake_azure import FakeAzureProcess
+from analyzer.pipeline_benchmark import (
+    STAGES, compare_results, load_results, run_pipeline_benchmark, save_results
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Run synthetic calls through the full processing pipeline against the fake Azure services '
+        'and report throughput, per-stage latency, DB work and peak RSS (uses a throwaway test database)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lengths', default='60,300,900',
+            help='Comma-separated call lengths in seconds (default: 60,300,900)'
+        )
+        parser.add_argument('--calls', type=int, default=5, help='Calls per length (default: 5)')
+        parser.add_argument('--concurrency', type=int, default=1, help='Jobs processed at once (default: 1)')
+        parser.add_argument('--profile', help='Fake Azure profile JSON (latency, errors, 429s; default: no delay)')
+        parser.add_argument(
+            '--combined-phrases', action='store_true',
+            help="Return Azure's combined phrase per channel, so each call is analyzed as one segment "
+                 '(default: every phrase is analyzed separately)'
+        )
+        parser.add_argument('--output', help='Results file (default: benchmark-results/pipeline-<commit>-<time>.json)')
+        parser.add_argument('--compare', help='Earlier results file to compare against')
+        parser.add_argument(
+            '--log-level', default='WARNING',
+            help="Level for the 'analyzer' logger while benchmarking (default: WARNING)"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            lengths = [float(value) for value in options['lengths'].split(',') if value.strip()]
+        except ValueError:
+            raise CommandError('--lengths must be comma-separated numbers of seconds')
+        lengths = [int(value) if value.is_integer() else value for value in lengths]
+        if not lengths or min(lengths) <= 0 or options['calls'] < 1 or options['concurrency'] < 1:
+            raise CommandError('--lengths, --calls and --concurrency must be positive')
+        baseline = None
+        try:
+            if options['compare']:
+                baseline = load_results(options['compare'])
+            profile = {}
+            if options['profile']:
+                with open(options['profile']) as f:
+                    profile = json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+        profile = dict(profile, combined_phrases=options['combined_phrases'], transcription_seconds=0)
+
+        with tempfile.TemporaryDirectory(prefix='pipeline-benchmark-db-') as directory:
+            if connection.vendor == 'sqlite':
+                # Django's default in-memory test database takes table locks
+                # across threads; a file behaves like the real deployment
+                connection.settings_dict['TEST']['NAME'] = os.path.join(directory, 'benchmark.sqlite3')
+            results = self.run_benchmark(lengths, profile, options)
+        results['options'].update(combined_phrases=options['combined_phrases'], fake_profile=profile)
+
+        output = options['output'] or os.path.join(
+            'benchmark-results',
+            f"pipeline-{results['commit'] or 'nogit'}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+        )
+        self.stdout.write(f"\nPeak RSS {results['peak_rss_mb']} MB over the whole run")
+        save_results(results, output)
+        self.stdout.write(self.style.SUCCESS(f"Results written to {output}"))
+        if baseline is not None:
+            self.report_comparison(baseline, results)
+
+    def run_benchmark(self, lengths, profile, options):
+        logger = logging.getLogger('analyzer')
+        previous_level = logger.level
+        logger.setLevel(options['log_level'].upper())
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with FakeAzureProcess(profile) as fake:
+                self.stdout.write(f"Fake Azure services at {fake.url}; {connection.vendor} test database")
+                results = run_pipeline_benchmark(
+                    fake, call_seconds=lengths, calls=options['calls'],
+                    concurrency=options['concurrency'], progress=self.report
+                )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            logger.setLevel(previous_level)
+        return results
+
+    def report(self, summary):
+        self.stdout.write(
+            f"\n{summary['call_seconds']} s calls: {summary['jobs']} jobs, {summary['errors']} errors, "
+            f"{summary['jobs_per_minute']} jobs/min, {summary['transcripts_per_job']} segments/job"
+        )
+        self.stdout.write(f"  {'stage':<14}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        for stage in STAGES:
+            timing = summary['stages'].get(stage)
+            if timing:
+                self.stdout.write(
+                    f"  {stage:<14}{timing['p50_ms']:>10.1f}{timing['p95_ms']:>10.1f}{timing['p99_ms']:>10.1f}"
+                )
+        self.stdout.write(
+            f"  {summary['queries_per_job']} queries/job ({summary['writes_per_job']} writes), "
+            f"{summary['azure_requests_per_job']} Azure requests/job"
+        )
+
+    def report_comparison(self, baseline, results):
+        self.stdout.write(f"\nCompared with {baseline.get('commit') or 'baseline'} ({baseline.get('created_at')}):")
+        for seconds, label, old, new, change, improved in compare_results(baseline, results):
+            scope = 'whole run' if seconds == 'all' else f"{seconds} s"
+            line = f"  {scope:>9}  {label:<22}{old:>12}{new:>12}"
+            if change is not None:
+                line += f"  {change:+7.1f}%"
+            style = {True: self.style.SUCCESS, False: self.style.WARNING}.get(improved)
+            self.stdout.write(style(line) if style else line)
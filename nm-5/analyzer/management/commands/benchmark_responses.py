@@ -0,0 +1,72 @@
+import time
+from django.db import transaction
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+from analyzer.compression import available_encodings, compress
+from analyzer.models import (
+    AudioJob, Transcript, Sentiment, ContentSafety, ComplianceReport, CallAnalytics
+)
+from analyzer.renderers import FastJSONRenderer, orjson
+from analyzer.serializers import AudioJobSerializer, job_detail_prefetches
+
+SAFETY_CATEGORIES = ('Hate', 'SelfHarm', 'Sexual', 'Violence')
+
+
+class Command(BaseCommand):
+    help = 'Measure JSON rendering time and compressed size of a large job result (nothing is kept)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--utterances', type=int, default=500)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            data = self.build_result(options['utterances'])
+            transaction.set_rollback(True)
+
+        if orjson is None:
+            self.stdout.write(self.style.WARNING('orjson is not installed; FastJSONRenderer uses the stdlib'))
+        timings = {}
+        for name, renderer in (('stdlib', JSONRenderer()), ('orjson', FastJSONRenderer())):
+            body, timings[name] = self.cpu_time(lambda: renderer.render(data), options['repeat'])
+            self.stdout.write(f"{name:>8}: {timings[name] * 1000:8.2f} ms CPU per render, {len(body)} bytes")
+        self.stdout.write(f"render speedup: {timings['stdlib'] / timings['orjson']:.1f}x")
+
+        for encoding in available_encodings():
+            compressed, seconds = self.cpu_time(lambda: compress(body, encoding), options['repeat'])
+            self.stdout.write(
+                f"{encoding:>8}: {len(compressed)} bytes ({100 * len(compressed) / len(body):.1f}% of raw), "
+                f"{seconds * 1000:.2f} ms CPU"
+            )
+
+    def cpu_time(self, fn, repeat):
+        started = time.process_time()
+        for _ in range(repeat):
+            result = fn()
+        return result, (time.process_time() - started) / repeat
+
+    def build_result(self, utterances):
+        """Serialized result of a synthetic job with a safety row per category per utterance"""
+        job = AudioJob.objects.create(status='complete', agent='Benchmark Agent', customer='Benchmark Customer')
+        transcripts = Transcript.objects.bulk_create([
+            Transcript(
+                job=job, speaker='agent' if i % 2 else 'customer', start_time=f"{i // 60:02d}:{i % 60:02d}",
+                text=f"Utterance {i}: thanks for calling, let me pull up the account details for you now."
+            )
+            for i in range(utterances)
+        ])
+        Sentiment.objects.bulk_create([
+            Sentiment(job=job, transcript=t, sentiment='neutral', confidence=0.5) for t in transcripts
+        ])
+        ContentSafety.objects.bulk_create([
+            ContentSafety(job=job, transcript=t, category=category, severity=0)
+            for t in transcripts for category in SAFETY_CATEGORIES
+        ])
+        ComplianceReport.objects.create(
+            job=job, checklist=[], risk_level='Low', summary='Benchmark call', score=90, recommendations=[]
+        )
+        CallAnalytics.objects.create(job=job)
+        job = AudioJob.objects.select_related('compliance_report', 'analytics').prefetch_related(
+            *job_detail_prefetches()
+        ).get(id=job.id)
+        return AudioJobSerializer(job).data
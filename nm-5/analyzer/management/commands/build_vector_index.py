@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from analyzer.azure_services import AzureOpenAIService
+from analyzer.models import AudioJob
+from analyzer.vector_index import get_vector_index, index_job
+
+
+class Command(BaseCommand):
+    help = 'Embed completed jobs into the semantic vector index'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true',
+                            help='Drop the index (and reclaim tombstoned rows) before indexing every job')
+        parser.add_argument('--ivf-lists', type=int, default=None,
+                            help='Train this many IVF partitions after indexing (0 = sqrt of row count)')
+
+    def handle(self, *args, **options):
+        index = get_vector_index()
+        if options['rebuild']:
+            index.reset()
+            self.stdout.write('Cleared vector index')
+
+        openai_service = AzureOpenAIService()
+        jobs = AudioJob.objects.filter(status='complete').order_by('created_at')
+        indexed_jobs = set() if options['rebuild'] else index.indexed_job_ids()
+
+        total = 0
+        for job in jobs.iterator(chunk_size=200):
+            if job.id in indexed_jobs:
+                continue
+            try:
+                total += index_job(job, openai_service=openai_service, index=index)
+            except Exception as e:
+                self.stderr.write(f"Error indexing job {job.id}: {str(e)}")
+        self.stdout.write(self.style.SUCCESS(f"Indexed {total} vectors"))
+
+        if options['ivf_lists'] is not None:
+            lists = index.train_ivf(n_lists=options['ivf_lists'] or None)
+            self.stdout.write(self.style.SUCCESS(f"Trained {lists} IVF partitions"))
+        self.stdout.write(str(index.snapshot()))
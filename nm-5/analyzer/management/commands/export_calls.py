@@ -0,0 +1,42 @@
+import sys
+from django.core.management.base import BaseCommand, CommandError
+from analyzer.exports import DATASETS, FORMATS, DEFAULT_CHUNK_SIZE, ExportError, export_stream
+
+
+class Command(BaseCommand):
+    help = 'Stream jobs or transcripts to NDJSON, CSV or Parquet with constant memory'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dataset', choices=list(DATASETS), default='jobs')
+        parser.add_argument('--format', dest='fmt', choices=list(FORMATS), default='ndjson')
+        parser.add_argument('--output', '-o', default='-', help='Output file ("-" for stdout)')
+        parser.add_argument('--gzip', action='store_true', help='gzip-compress the output')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        # Same filters as GET /api/jobs/
+        for name in ('agent', 'compliance_status', 'status', 'date_from', 'date_to', 'score_min', 'score_max'):
+            parser.add_argument(f"--{name.replace('_', '-')}", dest=name)
+
+    def handle(self, *args, **options):
+        filters = {
+            name: options[name]
+            for name in ('agent', 'compliance_status', 'status', 'date_from', 'date_to', 'score_min', 'score_max')
+            if options[name] is not None
+        }
+        try:
+            stream = export_stream(
+                options['dataset'], options['fmt'], filters=filters,
+                compress=options['gzip'], chunk_size=options['chunk_size']
+            )
+            output = sys.stdout.buffer if options['output'] == '-' else open(options['output'], 'wb')
+            written = 0
+            try:
+                for chunk in stream:
+                    output.write(chunk)
+                    written += len(chunk)
+            finally:
+                if output is not sys.stdout.buffer:
+                    output.close()
+        except ExportError as e:
+            raise CommandError(str(e))
+        if options['output'] != '-':
+            self.stdout.write(self.style.SUCCESS(f"Wrote {written} bytes to {options['output']}"))
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+from analyzer.importer import import_calls, ImportFormatError
+from analyzer.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Stream-import historical calls from a JSON or NDJSON file (optionally .gz)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='JSON array / {"callHistory": [...]} file, or .ndjson/.jsonl')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Calls per transaction')
+        parser.add_argument('--resume', action='store_true',
+                            help='Skip calls committed by a previous, interrupted run')
+        parser.add_argument('--checkpoint', default=None,
+                            help='Checkpoint file (defaults to <path>.import-checkpoint)')
+        parser.add_argument('--skip-rollups', action='store_true',
+                            help='Do not rebuild the stats rollups after importing')
+
+    def handle(self, *args, **options):
+        def report(stats):
+            self.stdout.write(
+                f"{stats['calls_read']} calls read, {stats['rows_written']} rows written "
+                f"({stats['rows_per_second']:.0f} rows/s)"
+            )
+
+        try:
+            stats = import_calls(
+                options['path'],
+                batch_size=options['batch_size'],
+                resume=options['resume'],
+                checkpoint_path=options['checkpoint'],
+                progress=report
+            )
+        except FileNotFoundError:
+            raise CommandError(f"File not found: {options['path']}")
+        except ImportFormatError as e:
+            raise CommandError(f"{e} (rerun with --resume to continue after the last committed batch)")
+
+        if not options['skip_rollups']:
+            rebuild_rollups()
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {stats['calls_read'] - stats['calls_skipped']} calls, {stats['rows_written']} rows "
+            f"in {stats['elapsed']:.1f}s ({stats['rows_per_second']:.0f} rows/s)"
+        ))
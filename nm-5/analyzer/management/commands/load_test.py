@@ -0,0 +1,217 @@
+import importlib.util
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import ExitStack
+from datetime import datetime
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from analyzer.fake_azure import FakeAzureProcess
+from analyzer.loadtest import DEFAULT_MIX, parse_mix, results_document, run_load_test
+from analyzer.pipeline_benchmark import save_results
+
+SERVER_START_TIMEOUT = 60
+
+
+class Command(BaseCommand):
+    help = (
+        'Drive the jobs API with a scripted mix of upload, list, status and result traffic and report '
+        'latency histograms and error rates per endpoint'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', default='http://127.0.0.1:8000', help='Base URL of a running server')
+        parser.add_argument(
+            '--serve', choices=['wsgi', 'asgi'],
+            help='Start the app on a free port first: gunicorn on the WSGI entry point or daphne on the ASGI one'
+        )
+        parser.add_argument('--port', type=int, default=8001, help='Port for --serve (default: 8001)')
+        parser.add_argument('--workers', type=int, default=4, help='gunicorn workers for --serve wsgi (default: 4)')
+        parser.add_argument('--threads', type=int, default=1, help='gunicorn threads per worker (default: 1)')
+        parser.add_argument(
+            '--fake-azure', action='store_true',
+            help='Point the served app at the local fake Azure services so uploads are processed'
+        )
+        parser.add_argument(
+            '--scratch-db', action='store_true',
+            help='Serve from a freshly migrated SQLite database and media directory that are removed afterwards'
+        )
+        parser.add_argument(
+            '--users', help='Closed loop: comma-separated virtual user counts, one step each (e.g. 1,8,32)'
+        )
+        parser.add_argument(
+            '--rate', help='Open loop: comma-separated arrival rates in requests/second, one step each'
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=64,
+            help='Open loop: most requests in flight at once (default: 64)'
+        )
+        parser.add_argument('--duration', type=float, default=30, help='Seconds per step (default: 30)')
+        parser.add_argument('--think-time', type=float, default=1.0, help='Closed loop: mean think time (default: 1)')
+        parser.add_argument('--ramp-up', type=float, default=0.0, help='Closed loop: seconds to start all users')
+        parser.add_argument(
+            '--mix', default=','.join(f"{name}={weight}" for name, weight in DEFAULT_MIX.items()),
+            help='Request weights (default: %(default)s)'
+        )
+        parser.add_argument('--timeout', type=float, default=30, help='Per-request timeout in seconds')
+        parser.add_argument('--output', help='Results file (default: benchmark-results/load-<commit>-<time>.json)')
+
+    def handle(self, *args, **options):
+        if bool(options['users']) == bool(options['rate']):
+            raise CommandError('Pass one of --users (closed loop) or --rate (open loop)')
+        try:
+            mix = parse_mix(options['mix'])
+            steps = [
+                float(value) for value in (options['users'] or options['rate']).split(',') if value.strip()
+            ]
+        except ValueError as e:
+            raise CommandError(str(e))
+        if not steps or min(steps) <= 0 or options['duration'] <= 0:
+            raise CommandError('Steps and --duration must be positive')
+        if (options['fake_azure'] or options['scratch_db']) and not options['serve']:
+            raise CommandError('--fake-azure and --scratch-db apply to a server started with --serve')
+
+        with ExitStack() as stack:
+            target = options['target']
+            server = None
+            if options['serve']:
+                server = self.serve(stack, options)
+                target = f"http://127.0.0.1:{options['port']}"
+            results = self.run_steps(target, steps, mix, options)
+        results['options'].update(server=server)
+
+        output = options['output'] or os.path.join(
+            'benchmark-results',
+            f"load-{results['commit'] or 'nogit'}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+        )
+        save_results(results, output)
+        self.stdout.write(self.style.SUCCESS(f"\nResults written to {output}"))
+
+    def run_steps(self, target, steps, mix, options):
+        closed = bool(options['users'])
+        results = []
+        for step in steps:
+            label = f"{int(step)} users" if closed else f"{step:g} req/s"
+            self.stdout.write(f"\n== {label} for {options['duration']:g} s against {target}")
+            try:
+                result = run_load_test(
+                    target, duration=options['duration'],
+                    users=int(step) if closed else None, rate=None if closed else step,
+                    concurrency=options['concurrency'], think_time=options['think_time'],
+                    ramp_up=options['ramp_up'], mix=mix, timeout=options['timeout']
+                )
+            except requests.RequestException as e:
+                raise CommandError(f"Cannot reach {target}: {e}")
+            self.report(result)
+            results.append(result)
+        if len(results) > 1:
+            self.report_sweep(results, closed)
+        return results_document(target, results, {
+            'mix': mix, 'duration': options['duration'], 'think_time': options['think_time'],
+            'concurrency': options['concurrency'], 'timeout': options['timeout'],
+        })
+
+    def serve(self, stack, options):
+        """Start gunicorn or daphne for the duration of the run; returns its description"""
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE='call_clarity_backend.settings')
+        if options['scratch_db']:
+            if connection.vendor != 'sqlite':
+                raise CommandError('--scratch-db supports the SQLite backend only')
+            directory = stack.enter_context(tempfile.TemporaryDirectory(prefix='load-test-'))
+            env.update(SQLITE_PATH=os.path.join(directory, 'load.sqlite3'), MEDIA_ROOT=os.path.join(directory, 'media'))
+            self.stdout.write('Migrating scratch database...')
+            subprocess.run(
+                [sys.executable, 'manage.py', 'migrate', '--noinput', '-v', '0'],
+                cwd=settings.BASE_DIR, env=env, check=True
+            )
+        if options['fake_azure']:
+            fake = stack.enter_context(FakeAzureProcess({'transcription_seconds': 0.5}))
+            env.update({name: str(value) for name, value in fake.settings_overrides(poll_interval=0.2).items()})
+            self.stdout.write(f"Fake Azure services at {fake.url}")
+
+        port = str(options['port'])
+        if options['serve'] == 'wsgi':
+            if importlib.util.find_spec('gunicorn') is None:
+                raise CommandError('--serve wsgi needs gunicorn (pip install gunicorn)')
+            command = [
+                sys.executable, '-m', 'gunicorn', 'call_clarity_backend.wsgi:application',
+                '--bind', f"127.0.0.1:{port}", '--workers', str(options['workers']),
+                '--threads', str(options['threads']), '--log-level', 'warning',
+            ]
+            description = f"gunicorn (WSGI), {options['workers']} workers x {options['threads']} threads"
+        else:
+            command = [sys.executable, '-m', 'daphne', '-v', '0', '-b', '127.0.0.1', '-p', port,
+                       'call_clarity_backend.asgi:application']
+            description = 'daphne (ASGI), 1 process'
+            if options['workers'] != 4:
+                self.stdout.write(self.style.WARNING('daphne serves from a single process; --workers is ignored'))
+
+        process = subprocess.Popen(command, cwd=settings.BASE_DIR, env=env)
+        stack.callback(self.stop_server, process)
+        self.wait_until_ready(process, f"http://127.0.0.1:{port}/api/stats/")
+        self.stdout.write(f"Serving with {description} on port {port}")
+        return {
+            'entry_point': options['serve'], 'description': description,
+            'workers': options['workers'] if options['serve'] == 'wsgi' else 1,
+            'threads': options['threads'] if options['serve'] == 'wsgi' else None,
+            'db_vendor': connection.vendor, 'db_conn_max_age': connection.settings_dict.get('CONN_MAX_AGE'),
+            'fake_azure': options['fake_azure'], 'scratch_db': options['scratch_db'],
+        }
+
+    def wait_until_ready(self, process, url):
+        deadline = time.monotonic() + SERVER_START_TIMEOUT
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError(f"The server exited with status {process.returncode}")
+            try:
+                requests.get(url, timeout=2)
+                return
+            except requests.RequestException:
+                time.sleep(0.25)
+        raise CommandError(f"The server did not answer {url} within {SERVER_START_TIMEOUT} s")
+
+    def stop_server(self, process):
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+    def report(self, result):
+        total = result['total']
+        self.stdout.write(
+            f"{total['requests']} requests, {total['requests_per_second']} req/s, "
+            f"{100 * total['error_rate']:.2f}% errors, p95 {total['p95_ms']} ms"
+        )
+        if result['late_arrivals']:
+            self.stdout.write(self.style.WARNING(
+                f"{result['late_arrivals']} arrivals started >100 ms late: raise --concurrency "
+                'or the client is saturated'
+            ))
+        self.stdout.write(
+            f"  {'endpoint':<14}{'requests':>9}{'errors':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+        )
+        for name, stats in result['endpoints'].items():
+            self.stdout.write(
+                f"  {name:<14}{stats['requests']:>9}{stats['errors']:>8}{stats['requests_per_second']:>9}"
+                f"{stats['p50_ms']:>9.1f}{stats['p95_ms']:>9.1f}{stats['p99_ms']:>9.1f}"
+            )
+            buckets = ' '.join(f"{label}:{count}" for label, count in stats['histogram_ms'].items() if count)
+            self.stdout.write(f"  {'':<14}ms {buckets}")
+            failures = {code: n for code, n in stats['status_codes'].items() if not code.isdigit() or int(code) >= 400}
+            if failures:
+                self.stdout.write(self.style.WARNING(f"  {'':<14}failures {failures}"))
+
+    def report_sweep(self, results, closed):
+        self.stdout.write(f"\n  {'users' if closed else 'req/s':>8}{'req/s':>10}{'p95 ms':>10}{'errors':>9}")
+        for result in results:
+            step = result['users'] if closed else result['rate']
+            total = result['total']
+            self.stdout.write(
+                f"  {step:>8g}{total['requests_per_second']:>10}{total['p95_ms']:>10}"
+                f"{100 * total['error_rate']:>8.2f}%"
+            )
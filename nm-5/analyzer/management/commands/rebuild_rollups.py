@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from analyzer.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Regenerate the per-agent and per-day stats rollup tables from scratch'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        calls = rebuild_rollups(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt stats rollups from {calls} completed calls"))
@@ -0,0 +1,66 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from analyzer.fake_azure import FakeAzureProfile, FakeAzureServer, ROUTE_NAMES
+
+
+class Command(BaseCommand):
+    help = 'Serve a local stand-in for the Azure services, with configurable latency, errors and 429s'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--config', help='JSON profile file (see analyzer.fake_azure)')
+        parser.add_argument('--latency', help='Default latency, e.g. fixed:0.05 or lognormal:0.08,0.5')
+        parser.add_argument('--error-rate', type=float, help='Default share of requests answered with 500/503')
+        parser.add_argument('--throttle-rate', type=float, help='Default share of requests answered with 429')
+        parser.add_argument(
+            '--route-latency', action='append', default=[], metavar='ROUTE=SPEC',
+            help=f"Latency for one route, repeatable (routes: {', '.join(ROUTE_NAMES)})"
+        )
+        parser.add_argument('--transcription-seconds', type=float, help='Time until a transcription succeeds')
+        parser.add_argument('--seed', type=int)
+
+    def handle(self, *args, **options):
+        try:
+            profile = self.build_profile(options)
+            server = FakeAzureServer(profile, host=options['host'], port=options['port'])
+        except (OSError, ValueError, TypeError) as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(f"Fake Azure services listening on {server.url}"))
+        self.stdout.write('Point the app at it with:')
+        for name, value in server.settings_overrides(poll_interval=0.5).items():
+            self.stdout.write(f"  {name}={value}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.httpd.server_close()
+            for route, counts in sorted(server.stats().items()):
+                self.stdout.write(
+                    f"{route:>24}: {counts['requests']} requests, {counts['errors']} errors, "
+                    f"{counts['throttled']} throttled"
+                )
+
+    def build_profile(self, options):
+        config = {}
+        if options['config']:
+            with open(options['config']) as f:
+                config = json.load(f)
+        default = dict(config.get('default', {}))
+        for key in ('latency', 'error_rate', 'throttle_rate'):
+            if options[key] is not None:
+                default[key] = options[key]
+        routes = dict(config.get('routes', {}))
+        for item in options['route_latency']:
+            route, sep, spec = item.partition('=')
+            if not sep:
+                raise ValueError(f"--route-latency expects ROUTE=SPEC, got '{item}'")
+            routes[route] = dict(routes.get(route, {}), latency=spec)
+        config.update(default=default, routes=routes)
+        if options['transcription_seconds'] is not None:
+            config['transcription_seconds'] = options['transcription_seconds']
+        if options['seed'] is not None:
+            config['seed'] = options['seed']
+        return FakeAzureProfile(config)
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.2 on 2026-10-18 23:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0003_audiojob_current_step_audiojob_progress_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='audiojob',
+            name='degraded_stages',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
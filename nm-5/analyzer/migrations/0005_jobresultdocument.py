@@ -0,0 +1,25 @@
+# Generated by Django 5.0.2 on 2026-10-18 23:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0004_audiojob_degraded_stages'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobResultDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('body', models.BinaryField()),
+                ('etag', models.CharField(max_length=80)),
+                ('raw_size', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='result_document', to='analyzer.audiojob')),
+            ],
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.2 on 2026-10-18 23:16
+
+import analyzer.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0005_jobresultdocument'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WebhookSubscription',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=500)),
+                ('secret', models.CharField(max_length=128)),
+                ('events', models.JSONField(default=analyzer.models.default_webhook_events)),
+                ('active', models.BooleanField(default=True)),
+                ('batch_size', models.IntegerField(default=1)),
+                ('batch_interval_ms', models.IntegerField(default=0)),
+                ('last_delivery_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
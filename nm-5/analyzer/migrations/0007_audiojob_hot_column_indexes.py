@@ -0,0 +1,38 @@
+# Generated by Django 5.0.2 on 2026-10-18 23:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0006_webhooksubscription'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='audiojob',
+            name='agent',
+            field=models.CharField(db_index=True, default='Unknown Agent', max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='audiojob',
+            name='compliance_status',
+            field=models.CharField(choices=[('compliant', 'Compliant'), ('warning', 'Warning'), ('violation', 'Violation')], db_index=True, default='compliant', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='audiojob',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='audiojob',
+            name='score',
+            field=models.IntegerField(db_index=True, default=0),
+        ),
+        migrations.AlterField(
+            model_name='audiojob',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('complete', 'Complete'), ('error', 'Error')], db_index=True, default='pending', max_length=20),
+        ),
+    ]
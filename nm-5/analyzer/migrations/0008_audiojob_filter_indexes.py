@@ -0,0 +1,33 @@
+# Generated by Django 5.0.2 on 2026-10-18 23:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0007_audiojob_hot_column_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='audiojob',
+            index=models.Index(fields=['-created_at', '-id'], name='job_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='audiojob',
+            index=models.Index(fields=['agent', '-created_at', '-id'], name='job_agent_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='audiojob',
+            index=models.Index(fields=['compliance_status', '-created_at', '-id'], name='job_compliance_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='audiojob',
+            index=models.Index(fields=['agent', 'compliance_status', '-created_at', '-id'], name='job_agent_compl_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='audiojob',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='job_status_created_idx'),
+        ),
+    ]
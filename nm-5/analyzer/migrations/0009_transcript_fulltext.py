@@ -0,0 +1,23 @@
+from django.db import migrations
+
+
+def install(apps, schema_editor):
+    from analyzer.search import install_fulltext
+    install_fulltext(schema_editor)
+
+
+def uninstall(apps, schema_editor):
+    from analyzer.search import uninstall_fulltext
+    uninstall_fulltext(schema_editor)
+
+
+class Migration(migrations.Migration):
+    """FTS5 table + triggers on SQLite, tsvector GIN index on PostgreSQL"""
+
+    dependencies = [
+        ('analyzer', '0008_audiojob_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 5.0.2 on 2026-10-18 23:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0009_transcript_fulltext'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('calls', models.IntegerField(default=0)),
+                ('score_total', models.BigIntegerField(default=0)),
+                ('compliant_calls', models.IntegerField(default=0)),
+                ('warning_calls', models.IntegerField(default=0)),
+                ('violation_calls', models.IntegerField(default=0)),
+                ('violation_count', models.IntegerField(default=0)),
+                ('positive_calls', models.IntegerField(default=0)),
+                ('neutral_calls', models.IntegerField(default=0)),
+                ('negative_calls', models.IntegerField(default=0)),
+                ('customer_sentiment_total', models.FloatField(default=0.0)),
+                ('agent_talk_time', models.BigIntegerField(default=0)),
+                ('customer_talk_time', models.BigIntegerField(default=0)),
+                ('day', models.DateField(unique=True)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='JobRollupContribution',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('calls', models.IntegerField(default=0)),
+                ('score_total', models.BigIntegerField(default=0)),
+                ('compliant_calls', models.IntegerField(default=0)),
+                ('warning_calls', models.IntegerField(default=0)),
+                ('violation_calls', models.IntegerField(default=0)),
+                ('violation_count', models.IntegerField(default=0)),
+                ('positive_calls', models.IntegerField(default=0)),
+                ('neutral_calls', models.IntegerField(default=0)),
+                ('negative_calls', models.IntegerField(default=0)),
+                ('customer_sentiment_total', models.FloatField(default=0.0)),
+                ('agent_talk_time', models.BigIntegerField(default=0)),
+                ('customer_talk_time', models.BigIntegerField(default=0)),
+                ('job_id', models.UUIDField(unique=True)),
+                ('agent', models.CharField(max_length=100)),
+                ('day', models.DateField()),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='AgentDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('calls', models.IntegerField(default=0)),
+                ('score_total', models.BigIntegerField(default=0)),
+                ('compliant_calls', models.IntegerField(default=0)),
+                ('warning_calls', models.IntegerField(default=0)),
+                ('violation_calls', models.IntegerField(default=0)),
+                ('violation_count', models.IntegerField(default=0)),
+                ('positive_calls', models.IntegerField(default=0)),
+                ('neutral_calls', models.IntegerField(default=0)),
+                ('negative_calls', models.IntegerField(default=0)),
+                ('customer_sentiment_total', models.FloatField(default=0.0)),
+                ('agent_talk_time', models.BigIntegerField(default=0)),
+                ('customer_talk_time', models.BigIntegerField(default=0)),
+                ('agent', models.CharField(max_length=100)),
+                ('day', models.DateField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day', 'agent'], name='agent_daily_stats_day_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='agentdailystats',
+            constraint=models.UniqueConstraint(fields=('agent', 'day'), name='agent_daily_stats_unique'),
+        ),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 5.0.2 on 2026-10-18 23:26
+
+from collections import defaultdict
+from django.db import migrations, models
+from django.db.models import Count, Exists, Max, OuterRef, Q
+
+SUMMARY_FIELDS = ['flagged_count', 'max_safety_severity', 'dominant_sentiment', 'violation_count']
+
+
+def backfill_summaries(apps, schema_editor):
+    """Aggregate every job's summary in a handful of grouped queries"""
+    from analyzer.summaries import dominant_sentiment
+
+    AudioJob = apps.get_model('analyzer', 'AudioJob')
+    Transcript = apps.get_model('analyzer', 'Transcript')
+    Sentiment = apps.get_model('analyzer', 'Sentiment')
+    ContentSafety = apps.get_model('analyzer', 'ContentSafety')
+    ComplianceReport = apps.get_model('analyzer', 'ComplianceReport')
+
+    # Batch-processed calls record safety hits only as ContentSafety rows,
+    # which at this point name their utterance by text
+    safety_hit = ContentSafety.objects.filter(
+        job_id=OuterRef('job_id'), utterance=OuterRef('text'), severity__gt=0
+    )
+    flagged = dict(
+        Transcript.objects.filter(Q(flagged=True) | Exists(safety_hit))
+        .values_list('job_id').annotate(n=Count('id')).order_by()
+    )
+    severity = dict(
+        ContentSafety.objects.values_list('job_id').annotate(m=Max('severity')).order_by()
+    )
+    sentiments = defaultdict(dict)
+    for job_id, label, n in (
+        Sentiment.objects.values_list('job_id', 'sentiment').annotate(n=Count('id')).order_by()
+    ):
+        sentiments[job_id][label] = n
+    violations = {
+        job_id: len(items or [])
+        for job_id, items in ComplianceReport.objects.values_list('job_id', 'violations').iterator()
+    }
+
+    batch = []
+    for job in AudioJob.objects.only('id').iterator(chunk_size=2000):
+        job.flagged_count = flagged.get(job.id, 0)
+        job.max_safety_severity = severity.get(job.id) or 0
+        job.dominant_sentiment = dominant_sentiment(sentiments.get(job.id))
+        job.violation_count = violations.get(job.id, 0)
+        batch.append(job)
+        if len(batch) >= 2000:
+            AudioJob.objects.bulk_update(batch, SUMMARY_FIELDS)
+            batch = []
+    AudioJob.objects.bulk_update(batch, SUMMARY_FIELDS)
+
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0010_stats_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='audiojob',
+            name='dominant_sentiment',
+            field=models.CharField(default='neutral', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='audiojob',
+            name='flagged_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='audiojob',
+            name='max_safety_severity',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='audiojob',
+            name='violation_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.2 on 2026-10-18 23:29
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0012_uploadbatch'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='audiojob',
+            name='created_at',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.0.2 on 2026-10-18 23:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0013_audiojob_created_at_default'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='audiojob',
+            name='archived_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='JobArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('codec', models.CharField(default='gzip', max_length=10)),
+                ('body', models.BinaryField()),
+                ('raw_size', models.IntegerField(default=0)),
+                ('row_count', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='archive', to='analyzer.audiojob')),
+            ],
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.0.2 on 2026-10-18 23:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def link_transcripts(apps, schema_editor):
+    """Point every analysis row at the transcript row holding its utterance"""
+    Transcript = apps.get_model('analyzer', 'Transcript')
+    for name in ('Sentiment', 'ContentSafety'):
+        model = apps.get_model('analyzer', name)
+        match = Transcript.objects.filter(
+            job_id=OuterRef('job_id'), text=OuterRef('utterance')
+        ).order_by('id').values('id')[:1]
+        model.objects.filter(transcript__isnull=True).update(transcript=Subquery(match))
+        # process_audio always stores the transcript first, so rows without a
+        # match can only come from hand-edited data and have nothing to point at
+        model.objects.filter(transcript__isnull=True).delete()
+
+
+def copy_utterances(apps, schema_editor):
+    Transcript = apps.get_model('analyzer', 'Transcript')
+    for name in ('Sentiment', 'ContentSafety'):
+        model = apps.get_model('analyzer', name)
+        text = Transcript.objects.filter(id=OuterRef('transcript_id')).values('text')[:1]
+        model.objects.update(utterance=Subquery(text))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0014_jobarchive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sentiment',
+            name='transcript',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='sentiments', to='analyzer.transcript'),
+        ),
+        migrations.AddField(
+            model_name='contentsafety',
+            name='transcript',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='content_safety', to='analyzer.transcript'),
+        ),
+        migrations.RunPython(link_transcripts, copy_utterances),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.0.2 on 2026-10-18 23:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0015_analysis_transcript_link'),
+    ]
+
+    operations = [
+        # A default lets the column be re-added to existing rows when migrating
+        # backwards; 0015 then copies the text back from the transcripts
+        migrations.AlterField(
+            model_name='sentiment',
+            name='utterance',
+            field=models.TextField(default=''),
+        ),
+        migrations.AlterField(
+            model_name='contentsafety',
+            name='utterance',
+            field=models.TextField(default=''),
+        ),
+        migrations.RemoveField(
+            model_name='sentiment',
+            name='utterance',
+        ),
+        migrations.RemoveField(
+            model_name='contentsafety',
+            name='utterance',
+        ),
+        migrations.AlterField(
+            model_name='sentiment',
+            name='transcript',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sentiments', to='analyzer.transcript'),
+        ),
+        migrations.AlterField(
+            model_name='contentsafety',
+            name='transcript',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='content_safety', to='analyzer.transcript'),
+        ),
+    ]
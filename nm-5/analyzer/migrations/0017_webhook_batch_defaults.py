@@ -0,0 +1,23 @@
+# Generated by Django 5.0.2 on 2026-10-19 00:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0016_remove_analysis_utterance'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='webhooksubscription',
+            name='batch_interval_ms',
+            field=models.IntegerField(default=1000),
+        ),
+        migrations.AlterField(
+            model_name='webhooksubscription',
+            name='batch_size',
+            field=models.IntegerField(default=50),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.0.2 on 2026-10-19 00:12
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0017_webhook_batch_defaults'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='audiojob',
+            name='agent',
+            field=models.CharField(default='Unknown Agent', max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='audiojob',
+            name='compliance_status',
+            field=models.CharField(choices=[('compliant', 'Compliant'), ('warning', 'Warning'), ('violation', 'Violation')], default='compliant', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='audiojob',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AlterField(
+            model_name='audiojob',
+            name='score',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='audiojob',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('complete', 'Complete'), ('error', 'Error')], default='pending', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='audiojob',
+            index=models.Index(fields=['score', '-created_at', '-id'], name='job_score_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='audiojob',
+            index=models.Index(fields=['-score', '-created_at', '-id'], name='job_score_desc_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='audiojob',
+            index=models.Index(fields=['-agent', '-created_at', '-id'], name='job_agent_desc_created_idx'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.0.2 on 2026-10-19 00:18
+
+from collections import defaultdict
+from django.db import migrations
+from django.db.models import Count
+
+
+def flag_content_safety_hits(apps, schema_editor):
+    """Flag utterances with content-safety hits and recount flagged_count
+
+    process_audio used to store safety hits only as ContentSafety rows, so
+    batch-processed calls always showed zero flagged utterances.
+    """
+    AudioJob = apps.get_model('analyzer', 'AudioJob')
+    Transcript = apps.get_model('analyzer', 'Transcript')
+    ContentSafety = apps.get_model('analyzer', 'ContentSafety')
+
+    hits = defaultdict(list)
+    for transcript_id, category, severity in (
+        ContentSafety.objects.filter(severity__gt=0, transcript__flagged=False)
+        .order_by('transcript_id', 'id')
+        .values_list('transcript_id', 'category', 'severity')
+        .iterator(chunk_size=2000)
+    ):
+        hits[transcript_id].append(f"{category} (severity {severity})")
+
+    batch = []
+    for transcript in Transcript.objects.filter(id__in=list(hits)).only('id').iterator(chunk_size=2000):
+        transcript.flagged = True
+        transcript.flag_reason = f"Content safety: {', '.join(hits[transcript.id])}"
+        batch.append(transcript)
+        if len(batch) >= 2000:
+            Transcript.objects.bulk_update(batch, ['flagged', 'flag_reason'])
+            batch = []
+    Transcript.objects.bulk_update(batch, ['flagged', 'flag_reason'])
+
+    flagged = dict(
+        Transcript.objects.filter(flagged=True).values_list('job_id').annotate(n=Count('id')).order_by()
+    )
+    batch = []
+    # Archived jobs no longer have transcript rows; their stored counts stand
+    for job in AudioJob.objects.filter(archived_at__isnull=True).only('id').iterator(chunk_size=2000):
+        job.flagged_count = flagged.get(job.id, 0)
+        batch.append(job)
+        if len(batch) >= 2000:
+            AudioJob.objects.bulk_update(batch, ['flagged_count'])
+            batch = []
+    AudioJob.objects.bulk_update(batch, ['flagged_count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0018_audiojob_ordering_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(flag_content_safety_hits, migrations.RunPython.noop),
+    ]
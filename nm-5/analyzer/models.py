@@ -1,10 +1,12 @@
 import uuid
 from django.db import models
+from django.utils import timezone
 
 class AudioJob(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     audio_file = models.FileField(upload_to='uploads/')
-    created_at = models.DateTimeField(auto_now_add=True)
+    # default rather than auto_now_add so imports can keep a call's original time
+    created_at = models.DateTimeField(default=timezone.now)
     agent = models.CharField(max_length=100, default="Unknown Agent")
     customer = models.CharField(max_length=100, default="Unknown Customer")
     duration = models.CharField(max_length=20, default="00:00")
@@ -22,6 +24,7 @@ class AudioJob(models.Model):
     current_step = models.CharField(max_length=50, default='')
     status_message = models.TextField(null=True, blank=True)
     error_message = models.TextField(null=True, blank=True)
+    degraded_stages = models.JSONField(default=list, blank=True)
     score = models.IntegerField(default=0)
     compliance_status = models.CharField(
         max_length=20,
@@ -32,6 +35,39 @@ class AudioJob(models.Model):
         ],
         default='compliant'
     )
+    # Denormalized per-call summaries for the call history list, written once
+    # when processing completes (see analyzer.summaries)
+    flagged_count = models.IntegerField(default=0)
+    max_safety_severity = models.IntegerField(default=0)
+    dominant_sentiment = models.CharField(max_length=20, default='neutral')
+    violation_count = models.IntegerField(default=0)
+    batch = models.ForeignKey(
+        'UploadBatch', null=True, blank=True, on_delete=models.SET_NULL, related_name='jobs'
+    )
+    # Set once the job's transcript and analysis rows live in a JobArchive
+    archived_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        # Match the call history filters (see filters.AudioJobFilter), which
+        # narrow by agent and/or compliance status and then page by
+        # (created_at, id), so a filtered page is read straight off the index.
+        # Their leading columns also serve lookups on agent, compliance_status,
+        # status, score or created_at alone, so those have no separate index.
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='job_created_id_idx'),
+            models.Index(fields=['agent', '-created_at', '-id'], name='job_agent_created_idx'),
+            models.Index(fields=['compliance_status', '-created_at', '-id'], name='job_compliance_created_idx'),
+            models.Index(
+                fields=['agent', 'compliance_status', '-created_at', '-id'],
+                name='job_agent_compl_created_idx'
+            ),
+            models.Index(fields=['status', '-created_at', '-id'], name='job_status_created_idx'),
+            # ?ordering=score/-score/-agent with the pagination tiebreaker
+            # (agent ascending reads job_agent_created_idx)
+            models.Index(fields=['score', '-created_at', '-id'], name='job_score_created_idx'),
+            models.Index(fields=['-score', '-created_at', '-id'], name='job_score_desc_created_idx'),
+            models.Index(fields=['-agent', '-created_at', '-id'], name='job_agent_desc_created_idx'),
+        ]
 
     def __str__(self):
         return f"Job {self.id} - {self.status}"
@@ -59,7 +95,7 @@ class Transcript(models.Model):
 
 class Sentiment(models.Model):
     job = models.ForeignKey(AudioJob, on_delete=models.CASCADE, related_name='sentiments')
-    utterance = models.TextField()
+    transcript = models.ForeignKey(Transcript, on_delete=models.CASCADE, related_name='sentiments')
     sentiment = models.CharField(max_length=20)
     confidence = models.FloatField(default=0.0)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -69,7 +105,7 @@ class Sentiment(models.Model):
 
 class ContentSafety(models.Model):
     job = models.ForeignKey(AudioJob, on_delete=models.CASCADE, related_name='content_safety')
-    utterance = models.TextField()
+    transcript = models.ForeignKey(Transcript, on_delete=models.CASCADE, related_name='content_safety')
     category = models.CharField(max_length=50)
     severity = models.IntegerField()
     created_at = models.DateTimeField(auto_now_add=True)
@@ -105,3 +141,105 @@ class CallAnalytics(models.Model):
 
     def __str__(self):
         return f"Analytics for Job {self.job.id}"
+
+class JobResultDocument(models.Model):
+    """Pre-rendered, gzip-compressed result payload for a completed job"""
+    job = models.OneToOneField(AudioJob, on_delete=models.CASCADE, related_name='result_document')
+    body = models.BinaryField()  # gzip-compressed JSON
+    etag = models.CharField(max_length=80)
+    raw_size = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Result document for Job {self.job_id}"
+
+def default_webhook_events():
+    return ['complete', 'error']
+
+class WebhookSubscription(models.Model):
+    """Downstream system notified when jobs finish"""
+    url = models.URLField(max_length=500)
+    secret = models.CharField(max_length=128)  # HMAC-SHA256 signing key
+    events = models.JSONField(default=default_webhook_events)  # job statuses to deliver
+    active = models.BooleanField(default=True)
+    batch_size = models.IntegerField(default=50)  # max events per POST
+    batch_interval_ms = models.IntegerField(default=1000)  # max time an event waits for a batch
+    last_delivery_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Webhook {self.id} -> {self.url}"
+
+class RollupCounters(models.Model):
+    """Additive per-call counters shared by the stats rollup tables"""
+    calls = models.IntegerField(default=0)
+    score_total = models.BigIntegerField(default=0)
+    compliant_calls = models.IntegerField(default=0)
+    warning_calls = models.IntegerField(default=0)
+    violation_calls = models.IntegerField(default=0)
+    violation_count = models.IntegerField(default=0)  # individual violations found
+    positive_calls = models.IntegerField(default=0)
+    neutral_calls = models.IntegerField(default=0)
+    negative_calls = models.IntegerField(default=0)
+    customer_sentiment_total = models.FloatField(default=0.0)
+    agent_talk_time = models.BigIntegerField(default=0)  # in seconds
+    customer_talk_time = models.BigIntegerField(default=0)  # in seconds
+
+    class Meta:
+        abstract = True
+
+class AgentDailyStats(RollupCounters):
+    """Per-agent, per-day totals over completed calls"""
+    agent = models.CharField(max_length=100)
+    day = models.DateField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['agent', 'day'], name='agent_daily_stats_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['day', 'agent'], name='agent_daily_stats_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.agent} on {self.day}"
+
+class DailyStats(RollupCounters):
+    """Per-day totals over completed calls"""
+    day = models.DateField(unique=True)
+
+    def __str__(self):
+        return f"Stats for {self.day}"
+
+class JobRollupContribution(RollupCounters):
+    """What one job currently adds to the rollups, so it can be subtracted
+    again when the job is reprocessed or deleted"""
+    job_id = models.UUIDField(unique=True)  # Not a FK: must outlive the job's cascade delete
+    agent = models.CharField(max_length=100)
+    day = models.DateField()
+
+    def __str__(self):
+        return f"Rollup contribution of Job {self.job_id}"
+
+class UploadBatch(models.Model):
+    """A group of recordings ingested through one bulk upload"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    source = models.CharField(max_length=255, blank=True, default='')  # archive name, if any
+    total_jobs = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Batch {self.id} ({self.total_jobs} jobs)"
+
+class JobArchive(models.Model):
+    """Compressed cold-storage copy of a job's transcript and analysis rows"""
+    job = models.OneToOneField(AudioJob, on_delete=models.CASCADE, related_name='archive')
+    codec = models.CharField(max_length=10, default='gzip')  # gzip or zstd
+    body = models.BinaryField()  # compressed columnar JSON, see analyzer.archive
+    raw_size = models.IntegerField(default=0)
+    row_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Archive of Job {self.job_id}"
@@ -0,0 +1,42 @@
+from rest_framework.pagination import CursorPagination
+
+
+class JobCursorPagination(CursorPagination):
+    """Keyset pagination over (created_at, id), newest first
+
+    Unlike offset pagination the cost of a page does not grow with how far
+    back in the call history the client has scrolled.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    ordering = ('-created_at', '-id')
+
+    def get_ordering(self, request, queryset, view):
+        """The ``?ordering=`` choice with (created_at, id) appended as a tiebreaker
+
+        The cursor only records the first ordering field and counts rows
+        that tie on it, so those rows must come back in the same order on
+        every page. Otherwise sorting by score or agent skips or repeats
+        rows at page boundaries.
+        """
+        ordering = tuple(super().get_ordering(request, queryset, view))
+        if ordering[0].lstrip('-') == 'created_at':
+            # Keep id in the same direction so (created_at, id) reads one index both ways
+            return (ordering[0], '-id' if ordering[0].startswith('-') else 'id')
+        return (ordering[0], '-created_at', '-id')
+
+
+class JobRowCursorPagination(CursorPagination):
+    """Keyset pagination over one job's transcript or analysis rows, in call order
+
+    Rows are written as the call is processed, so id order is call order.
+    """
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    ordering = ('id',)
+
+    def get_ordering(self, request, queryset, view):
+        # The job list's ?ordering= does not apply to a job's rows
+        return self.ordering
@@ -0,0 +1,326 @@
+"""
+End-to-end benchmark of the processing pipeline.
+
+``run_pipeline_benchmark`` pushes synthetic calls of several lengths
+through ``AudioJobViewSet.process_audio`` with every Azure service pointed
+at a fake (``analyzer.fake_azure``), and reports per call length:
+
+- jobs per minute (wall clock, at the requested concurrency)
+- p50/p95/p99 of each pipeline stage, timed from the ``job_progress``
+  signals the pipeline already sends:
+
+  ``setup``          service clients and their connection tests
+  ``transcription``  upload, batch transcription and polling
+  ``analysis``       per-phrase transcript, sentiment and safety rows
+  ``compliance``     audit, report, analytics and the result document
+  ``total``          the whole ``process_audio`` call
+
+- database queries and writes per job (``connection.execute_wrapper``)
+- Azure requests per job (from the fake's own counters)
+
+and, once for the whole run, the peak RSS of the benchmark process. The
+kernel only tracks a lifetime high-water mark, so a per-length figure would
+just repeat the largest one measured so far.
+
+Results are plain JSON with the commit they were measured on, so runs can
+be compared with ``compare_results``. The ``benchmark_pipeline`` command
+wraps all of this and runs it against a throwaway test database.
+"""
+
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import threading
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import django
+from django.conf import settings
+from django.db import connection, connections
+from django.test import override_settings
+from .models import AudioJob
+from .signals import job_progress
+
+try:
+    import resource
+except ImportError:  # peak RSS is only reported on Unix
+    resource = None
+
+RESULTS_VERSION = 2
+STAGES = ('setup', 'transcription', 'analysis', 'compliance', 'total')
+# current_step values that open each stage, in pipeline order
+STAGE_STEPS = (('Transcription', 'transcription'), ('Analysis', 'analysis'), ('Compliance', 'compliance'))
+WRITE_PREFIXES = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+SAMPLE_RATE = 16000
+
+
+def write_synthetic_call(target, seconds, sample_rate=SAMPLE_RATE):
+    """A mono 16-bit WAV of ``seconds`` of low-level noise, written a second at a time
+
+    ``target`` is a path or a writable binary file.
+    """
+    second = bytes((i * 7919) % 251 for i in range(sample_rate * 2))
+    with wave.open(target, 'wb') as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        whole, rest = divmod(int(seconds * sample_rate), sample_rate)
+        for _ in range(whole):
+            w.writeframes(second)
+        w.writeframes(second[:rest * 2])
+    return target
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))  # ceil without floats
+    return ordered[int(rank) - 1]
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return round(peak / (1024 * 1024 if platform.system() == 'Darwin' else 1024), 1)
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=settings.BASE_DIR
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class _StageClock:
+    """job_progress receiver that timestamps each job's step changes"""
+
+    def __init__(self):
+        self.marks = {}
+        self.lock = threading.Lock()
+
+    def __call__(self, sender, job, **kwargs):
+        with self.lock:
+            self.marks.setdefault(job.id, []).append((job.current_step, time.perf_counter()))
+
+    def stages(self, job_id, started, finished):
+        """Stage durations in seconds; stages the job never reached are left out"""
+        with self.lock:
+            marks = self.marks.pop(job_id, [])
+        first = {}
+        for step, at in marks:
+            first.setdefault(step, at)
+        boundaries = [('setup', started)]
+        for step, stage in STAGE_STEPS:
+            if step in first:
+                boundaries.append((stage, first[step]))
+        boundaries.append((None, first.get('Complete', finished)))
+        durations = {
+            stage: end - start
+            for (stage, start), (_, end) in zip(boundaries, boundaries[1:])
+        }
+        durations['total'] = finished - started
+        return durations
+
+
+class _QueryCounter:
+    """execute_wrapper that counts statements and writes on one connection"""
+
+    def __init__(self):
+        self.queries = 0
+        self.writes = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries += 1
+        if sql.lstrip().upper().startswith(WRITE_PREFIXES):
+            self.writes += 1
+        return execute(sql, params, many, context)
+
+
+def _run_job(clock, path, seconds):
+    # Imported here: views pulls in the whole API layer
+    from .views import AudioJobViewSet
+
+    counter = _QueryCounter()
+    job = AudioJob.objects.create(
+        status='pending', agent='Benchmark Agent', customer='Benchmark Customer',
+        duration=f"{int(seconds) // 60:02d}:{int(seconds) % 60:02d}"
+    )
+    started = time.perf_counter()
+    with connection.execute_wrapper(counter):
+        try:
+            AudioJobViewSet().process_audio(job, path, remove_file=False)
+        except Exception:
+            pass  # Recorded on the job; counted as an error below
+        finished = time.perf_counter()
+        job.refresh_from_db(fields=['status', 'degraded_stages'])
+    return {
+        'stages': clock.stages(job.id, started, finished),
+        'queries': counter.queries,
+        'writes': counter.writes,
+        'status': job.status,
+        'degraded': bool(job.degraded_stages),
+        'transcripts': job.transcripts.count(),
+    }
+
+
+def _run_job_in_thread(clock, path, seconds):
+    try:
+        return _run_job(clock, path, seconds)
+    finally:
+        connections.close_all()
+
+
+def _azure_requests(before, after):
+    return sum(
+        counts['requests'] - before.get(route, {}).get('requests', 0)
+        for route, counts in after.items()
+    )
+
+
+def _summarize(seconds, runs, wall, azure_requests):
+    jobs = len(runs)
+    stages = {}
+    for stage in STAGES:
+        values = [run['stages'][stage] * 1000 for run in runs if stage in run['stages']]
+        if values:
+            stages[stage] = {
+                'p50_ms': round(percentile(values, 50), 2),
+                'p95_ms': round(percentile(values, 95), 2),
+                'p99_ms': round(percentile(values, 99), 2),
+                'mean_ms': round(sum(values) / len(values), 2),
+            }
+    return {
+        'call_seconds': seconds,
+        'jobs': jobs,
+        'errors': sum(1 for run in runs if run['status'] != 'complete'),
+        'degraded': sum(1 for run in runs if run['degraded']),
+        'wall_seconds': round(wall, 3),
+        'jobs_per_minute': round(jobs / wall * 60, 2) if wall else None,
+        'stages': stages,
+        'queries_per_job': round(sum(run['queries'] for run in runs) / jobs, 1),
+        'writes_per_job': round(sum(run['writes'] for run in runs) / jobs, 1),
+        'transcripts_per_job': round(sum(run['transcripts'] for run in runs) / jobs, 1),
+        'azure_requests_per_job': round(azure_requests / jobs, 1),
+    }
+
+
+def run_pipeline_benchmark(fake, call_seconds=(60, 300, 900), calls=5, concurrency=1, poll_interval=0.01,
+                           progress=None):
+    """Benchmark process_audio against a started fake Azure server
+
+    ``fake`` is a running ``FakeAzureServer`` or ``FakeAzureProcess``.
+    With ``concurrency`` 1 jobs run on the calling thread, so they share its
+    database connection (and transaction, under a TestCase).
+    ``progress`` is called with each call length's summary as it finishes.
+    Returns the results document.
+    """
+    clock = _StageClock()
+    job_progress.connect(clock, dispatch_uid='analyzer.pipeline_benchmark.clock')
+    scenarios = []
+    try:
+        with override_settings(**fake.settings_overrides(poll_interval=poll_interval)), \
+                tempfile.TemporaryDirectory(prefix='pipeline-benchmark-') as directory:
+            for seconds in call_seconds:
+                path = write_synthetic_call(os.path.join(directory, f"call-{seconds}s.wav"), seconds)
+                before = fake.stats()
+                started = time.perf_counter()
+                if concurrency <= 1:
+                    runs = [_run_job(clock, path, seconds) for _ in range(calls)]
+                else:
+                    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='benchmark') as pool:
+                        runs = list(pool.map(lambda _: _run_job_in_thread(clock, path, seconds), range(calls)))
+                wall = time.perf_counter() - started
+                summary = _summarize(seconds, runs, wall, _azure_requests(before, fake.stats()))
+                scenarios.append(summary)
+                if progress:
+                    progress(summary)
+    finally:
+        job_progress.disconnect(dispatch_uid='analyzer.pipeline_benchmark.clock')
+
+    return {
+        'benchmark': 'pipeline',
+        'version': RESULTS_VERSION,
+        'commit': git_commit(),
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'options': {
+            'call_seconds': list(call_seconds), 'calls': calls,
+            'concurrency': concurrency, 'poll_interval': poll_interval,
+        },
+        'scenarios': scenarios,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def save_results(results, path):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+
+
+def load_results(path):
+    with open(path) as f:
+        results = json.load(f)
+    if results.get('benchmark') != 'pipeline':
+        raise ValueError(f"{path} is not a pipeline benchmark result")
+    return results
+
+
+# (label, path into a scenario, True if higher is better)
+COMPARED_METRICS = (
+    ('jobs/min', ('jobs_per_minute',), True),
+    *((f"{stage} p95 ms", ('stages', stage, 'p95_ms'), False) for stage in STAGES),
+    ('queries/job', ('queries_per_job',), False),
+    ('writes/job', ('writes_per_job',), False),
+)
+# Measured once per run rather than per call length
+COMPARED_RUN_METRICS = (
+    ('peak RSS MB', ('peak_rss_mb',), False),
+)
+
+
+def _lookup(scenario, keys):
+    for key in keys:
+        if not isinstance(scenario, dict) or key not in scenario:
+            return None
+        scenario = scenario[key]
+    return scenario
+
+
+def _compare(rows, scope, previous, current, metrics):
+    for label, keys, higher_is_better in metrics:
+        old, new = _lookup(previous, keys), _lookup(current, keys)
+        if old is None or new is None:
+            continue
+        change = (new - old) / old * 100 if old else None
+        improved = None if change is None or change == 0 else (change > 0) == higher_is_better
+        rows.append((scope, label, old, new, change, improved))
+
+
+def compare_results(baseline, current):
+    """Rows of (call seconds, metric, baseline, current, change %, improved) for matching call lengths
+
+    Whole-run metrics come last with 'all' in place of the call length.
+    """
+    baseline_scenarios = {s['call_seconds']: s for s in baseline['scenarios']}
+    rows = []
+    for scenario in current['scenarios']:
+        previous = baseline_scenarios.get(scenario['call_seconds'])
+        if previous is not None:
+            _compare(rows, scenario['call_seconds'], previous, scenario, COMPARED_METRICS)
+    _compare(rows, 'all', baseline, current, COMPARED_RUN_METRICS)
+    return rows
@@ -0,0 +1,100 @@
+"""
+Push delivery of job progress.
+
+The pipeline sends ``job_progress`` / ``job_finished`` signals as it works
+(see ``analyzer.signals``). This module turns each signal into a progress
+event and fans it out to:
+
+- the Channels layer group ``job_<id>``, consumed by ``JobProgressConsumer``
+  over WebSockets (``/ws/jobs/<id>/progress/``); with a Redis channel layer
+  this works across worker processes;
+- an in-process ``ProgressBroker``, consumed by the Server-Sent Events
+  fallback at ``/api/jobs/<id>/events/`` for clients that cannot open a
+  WebSocket. The broker only sees jobs processed in the same process, so
+  the stream also re-reads the job from the database on every heartbeat.
+"""
+
+import logging
+import queue
+import threading
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ('complete', 'error')
+
+
+def job_group_name(job_id):
+    return f"job_{job_id}"
+
+
+def build_progress_event(job):
+    """Serialize the fields clients need to render a job's progress"""
+    event = {
+        'job_id': str(job.id),
+        'status': job.status,
+        'progress': int(job.progress or 0),
+        'current_step': job.current_step,
+        'message': job.status_message,
+    }
+    if job.status == 'complete':
+        event['result_url'] = f"/api/jobs/{job.id}/result/"
+    elif job.status == 'error':
+        event['error_message'] = job.error_message
+    return event
+
+
+class ProgressBroker:
+    """Thread-safe in-process pub/sub of progress events keyed by job id"""
+
+    def __init__(self, max_queue_size=100):
+        self.max_queue_size = max_queue_size
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, job_id):
+        subscriber = queue.Queue(maxsize=self.max_queue_size)
+        with self._lock:
+            self._subscribers.setdefault(str(job_id), set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, job_id, subscriber):
+        with self._lock:
+            subscribers = self._subscribers.get(str(job_id))
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._subscribers[str(job_id)]
+
+    def publish(self, job_id, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(str(job_id), ()))
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(event)
+            except queue.Full:
+                # A stalled client only loses intermediate progress steps;
+                # the next event still carries the full current state
+                logger.warning(f"Dropping progress event for slow subscriber on job {job_id}")
+
+
+broker = ProgressBroker()
+
+
+def publish_job_progress(sender, job, **kwargs):
+    """Signal receiver: fan a progress event out to WebSocket and SSE clients"""
+    event = build_progress_event(job)
+    broker.publish(job.id, event)
+
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    try:
+        async_to_sync(channel_layer.group_send)(
+            job_group_name(job.id),
+            {'type': 'job.progress', 'event': event}
+        )
+    except Exception as e:
+        # Progress push must never break the pipeline itself
+        logger.error(f"Error pushing progress for job {job.id}: {str(e)}")
@@ -0,0 +1,379 @@
+"""
+Client-side flow control and fault isolation for the Azure service calls.
+
+Every outbound request made by ``azure_services`` passes through an
+``AdaptiveConcurrencyLimiter`` keyed by endpoint name (for example
+``language.sentiment`` or ``openai.chat``). The limiter follows an AIMD
+scheme: while observed latency stays close to the endpoint's baseline the
+in-flight limit grows by roughly one request per round trip, and when
+latency climbs past the tolerance or the service starts returning errors
+(timeouts, 429s, 5xx) the limit is cut multiplicatively.
+
+Each Azure client (``speech``, ``language``, ``content_safety``, ``openai``)
+also has a ``CircuitBreaker``. While a breaker is open, calls fail
+immediately with ``CircuitOpenError`` instead of waiting for a timeout, so
+the pipeline can fall back to its default values straight away.
+
+Idempotent analysis calls can opt into hedging: if the first attempt has
+not answered by the endpoint's observed p95 latency, a duplicate is sent
+and whichever answers first wins. A ``HedgeBudget`` caps the extra load.
+
+Example usage in Django shell:
+    from analyzer.resilience import get_limiter, get_breaker, metrics_snapshot
+
+    limiter = get_limiter('language.sentiment')
+    print(limiter.limit, limiter.in_flight)
+    print(metrics_snapshot())
+    print(get_breaker('openai').state)
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ConcurrencyLimitExceeded(Exception):
+    """Raised when a request waits too long for an in-flight slot"""
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a service whose circuit breaker is open"""
+
+
+class LatencyTracker:
+    """Rolling latency and error statistics for a single endpoint"""
+
+    def __init__(self, window=256, baseline_window=1024):
+        self.samples = deque(maxlen=window)
+        self.baseline_samples = deque(maxlen=baseline_window)
+        self.outcomes = deque(maxlen=window)
+        self.total_requests = 0
+        self.total_errors = 0
+        self._lock = threading.Lock()
+
+    def record(self, latency, error=False):
+        with self._lock:
+            self.total_requests += 1
+            self.outcomes.append(bool(error))
+            if error:
+                self.total_errors += 1
+                return
+            self.samples.append(latency)
+            self.baseline_samples.append(latency)
+
+    def percentile(self, pct):
+        """Return the given percentile (0-100) of recent successful latencies"""
+        with self._lock:
+            values = sorted(self.samples)
+        return self._percentile(values, pct)
+
+    def baseline(self):
+        """Near-minimum latency over the long window, used as the no-load reference"""
+        with self._lock:
+            values = sorted(self.baseline_samples)
+        return self._percentile(values, 10)
+
+    def sample_count(self):
+        with self._lock:
+            return len(self.samples)
+
+    def error_rate(self):
+        with self._lock:
+            if not self.outcomes:
+                return 0.0
+            return sum(self.outcomes) / len(self.outcomes)
+
+    @staticmethod
+    def _percentile(values, pct):
+        if not values:
+            return None
+        index = min(len(values) - 1, max(0, int(round(pct / 100 * (len(values) - 1)))))
+        return values[index]
+
+    def snapshot(self):
+        return {
+            'requests': self.total_requests,
+            'errors': self.total_errors,
+            'error_rate': round(self.error_rate(), 4),
+            'p50_ms': _to_ms(self.percentile(50)),
+            'p95_ms': _to_ms(self.percentile(95)),
+            'p99_ms': _to_ms(self.percentile(99)),
+            'baseline_ms': _to_ms(self.baseline()),
+        }
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD concurrency limiter driven by observed latency and errors"""
+
+    def __init__(self, name, initial_limit=None, min_limit=None, max_limit=None,
+                 latency_tolerance=None, backoff_ratio=None, queue_timeout=None, clock=time.monotonic):
+        self.name = name
+        self.clock = clock
+        self.min_limit = min_limit or settings.AZURE_CONCURRENCY_MIN
+        self.max_limit = max_limit or settings.AZURE_CONCURRENCY_MAX
+        self.limit = float(initial_limit or settings.AZURE_CONCURRENCY_INITIAL)
+        self.latency_tolerance = latency_tolerance or settings.AZURE_LATENCY_TOLERANCE
+        self.backoff_ratio = backoff_ratio or settings.AZURE_CONCURRENCY_BACKOFF
+        self.queue_timeout = queue_timeout or settings.AZURE_CONCURRENCY_QUEUE_TIMEOUT
+        self.in_flight = 0
+        self.tracker = LatencyTracker()
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        """Block until an in-flight slot is free"""
+        deadline = time.monotonic() + self.queue_timeout
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise ConcurrencyLimitExceeded(
+                        f"Timed out waiting for a slot on {self.name} "
+                        f"(limit {int(self.limit)})"
+                    )
+                self._condition.wait(remaining)
+            self.in_flight += 1
+
+    def try_acquire(self):
+        """Take an in-flight slot only if one is free right now"""
+        with self._condition:
+            if self.in_flight >= int(self.limit):
+                return False
+            self.in_flight += 1
+            return True
+
+    def abandon(self):
+        """Return a slot whose request was never sent, without recording an outcome"""
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def release(self, latency, error=False):
+        """Return a slot and adjust the limit from the request outcome"""
+        self.tracker.record(latency, error=error)
+        baseline = self.tracker.baseline()
+        with self._condition:
+            utilised = self.in_flight * 2 >= self.limit
+            self.in_flight -= 1
+            previous = int(self.limit)
+            if error or (baseline and latency > baseline * self.latency_tolerance):
+                self._decrease(latency)
+            elif utilised:
+                # Only grow while the current limit is actually being used,
+                # otherwise an idle endpoint would drift to max_limit
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            if int(self.limit) != previous:
+                logger.info(f"Concurrency limit for {self.name} changed: {previous} -> {int(self.limit)}")
+            self._condition.notify_all()
+
+    def _decrease(self, latency):
+        # Back off at most once per round trip so one slow burst does not
+        # collapse the limit straight to the floor
+        now = self.clock()
+        if now - self._last_decrease < max(latency, 0.05):
+            return
+        self._last_decrease = now
+        self.limit = max(float(self.min_limit), self.limit * self.backoff_ratio)
+
+    def snapshot(self):
+        with self._condition:
+            data = {
+                'endpoint': self.name,
+                'limit': int(self.limit),
+                'in_flight': self.in_flight,
+            }
+        data.update(self.tracker.snapshot())
+        return data
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker guarding one Azure client
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    every call is rejected immediately with ``CircuitOpenError``. Once
+    ``reset_timeout`` seconds have passed it lets ``half_open_max_calls``
+    trial requests through; a success closes it again, a failure re-opens it.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name, failure_threshold=None, reset_timeout=None, half_open_max_calls=None,
+                 clock=time.monotonic):
+        self.name = name
+        self.clock = clock
+        self.failure_threshold = failure_threshold or settings.AZURE_BREAKER_FAILURE_THRESHOLD
+        self.reset_timeout = reset_timeout or settings.AZURE_BREAKER_RESET_TIMEOUT
+        self.half_open_max_calls = half_open_max_calls or settings.AZURE_BREAKER_HALF_OPEN_MAX_CALLS
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.times_opened = 0
+        self._half_open_calls = 0
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        with self._lock:
+            if self.state == self.OPEN:
+                if self.clock() - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+                self._half_open_calls = 0
+                logger.info(f"Circuit breaker for {self.name} is half-open, sending trial request")
+            if self.state == self.HALF_OPEN:
+                if self._half_open_calls >= self.half_open_max_calls:
+                    return False
+                self._half_open_calls += 1
+            return True
+
+    def before_request(self):
+        """Raise CircuitOpenError if the service should not be called right now"""
+        if not self.allow_request():
+            raise CircuitOpenError(f"Circuit breaker for {self.name} is open")
+
+    def cancel_request(self):
+        """Give back a half-open trial slot for a request that was never sent"""
+        with self._lock:
+            if self.state == self.HALF_OPEN and self._half_open_calls > 0:
+                self._half_open_calls -= 1
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info(f"Circuit breaker for {self.name} closed")
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.times_opened += 1
+                    logger.warning(
+                        f"Circuit breaker for {self.name} opened after "
+                        f"{self.consecutive_failures} consecutive failures"
+                    )
+                self.state = self.OPEN
+                self.opened_at = self.clock()
+
+    @property
+    def is_open(self):
+        with self._lock:
+            return self.state == self.OPEN and self.clock() - self.opened_at < self.reset_timeout
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'service': self.name,
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'times_opened': self.times_opened,
+            }
+
+
+class HedgeBudget:
+    """Token bucket capping how many duplicate (hedged) requests may be sent
+
+    Every primary request earns ``ratio`` tokens and every hedge spends one,
+    so hedging can add at most ``ratio`` extra load on top of normal traffic
+    (plus a small burst allowance of ``max_tokens``).
+    """
+
+    def __init__(self, name, ratio=None, max_tokens=None):
+        self.name = name
+        self.ratio = ratio if ratio is not None else settings.AZURE_HEDGE_BUDGET_RATIO
+        self.max_tokens = max_tokens or settings.AZURE_HEDGE_BUDGET_BURST
+        self.tokens = float(self.max_tokens)
+        self.hedges_sent = 0
+        self.hedge_wins = 0
+        self._lock = threading.Lock()
+
+    def record_request(self):
+        with self._lock:
+            self.tokens = min(float(self.max_tokens), self.tokens + self.ratio)
+
+    def try_spend(self):
+        with self._lock:
+            if self.tokens < 1.0:
+                return False
+            self.tokens -= 1.0
+            self.hedges_sent += 1
+            return True
+
+    def record_win(self):
+        with self._lock:
+            self.hedge_wins += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'hedges_sent': self.hedges_sent,
+                'hedge_wins': self.hedge_wins,
+            }
+
+
+_limiters = {}
+_breakers = {}
+_hedge_budgets = {}
+_registry_lock = threading.Lock()
+
+
+def get_limiter(name):
+    """Return the shared limiter for an endpoint, creating it on first use"""
+    with _registry_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            limiter = AdaptiveConcurrencyLimiter(name)
+            _limiters[name] = limiter
+        return limiter
+
+
+def get_breaker(service):
+    """Return the shared circuit breaker for an Azure client, e.g. ``openai``"""
+    with _registry_lock:
+        breaker = _breakers.get(service)
+        if breaker is None:
+            breaker = CircuitBreaker(service)
+            _breakers[service] = breaker
+        return breaker
+
+
+def get_hedge_budget(name):
+    """Return the shared hedging budget for an endpoint"""
+    with _registry_lock:
+        budget = _hedge_budgets.get(name)
+        if budget is None:
+            budget = HedgeBudget(name)
+            _hedge_budgets[name] = budget
+        return budget
+
+
+def metrics_snapshot():
+    """Current limits and latency statistics for every endpoint seen so far"""
+    with _registry_lock:
+        limiters = sorted(_limiters.values(), key=lambda l: l.name)
+        budgets = dict(_hedge_budgets)
+    snapshots = []
+    for limiter in limiters:
+        data = limiter.snapshot()
+        if limiter.name in budgets:
+            data.update(budgets[limiter.name].snapshot())
+        snapshots.append(data)
+    return snapshots
+
+
+def breaker_snapshot():
+    """Current state of every circuit breaker"""
+    with _registry_lock:
+        breakers = sorted(_breakers.values(), key=lambda b: b.name)
+    return [breaker.snapshot() for breaker in breakers]
+
+
+def _to_ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 1)
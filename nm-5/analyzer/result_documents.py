@@ -0,0 +1,97 @@
+"""
+Materialized result documents for completed jobs.
+
+Once a job is complete its transcripts, sentiments, safety rows, report and
+analytics no longer change, so the ``AudioJobSerializer`` payload is
+rendered once, gzip-compressed and stored in ``JobResultDocument``. Repeat
+requests for ``/api/jobs/<id>/result/`` are then a single indexed read,
+answered with a strong ETag and ``304 Not Modified`` when the client
+already has the current version. The gzip and identity bodies are different
+representations, so each gets its own ETag (the gzip one ends in ``-gzip``).
+"""
+
+import gzip
+import hashlib
+import logging
+from django.core.exceptions import ValidationError
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from .models import AudioJob, JobResultDocument
+from .renderers import dumps
+from .serializers import AudioJobSerializer, job_detail_prefetches
+
+logger = logging.getLogger(__name__)
+
+
+def materialize_result_document(job_id):
+    """Render, compress and store the result document for a completed job"""
+    job = AudioJob.objects.select_related(
+        'compliance_report', 'analytics'
+    ).prefetch_related(
+        *job_detail_prefetches()
+    ).get(id=job_id)
+    if job.status != 'complete':
+        raise ValueError(f"Job {job_id} is not complete")
+
+    raw = dumps(AudioJobSerializer(job).data)
+    document, _ = JobResultDocument.objects.update_or_create(
+        job=job,
+        defaults={
+            'body': gzip.compress(raw, mtime=0),
+            'etag': f'"{hashlib.sha256(raw).hexdigest()[:32]}"',
+            'raw_size': len(raw),
+        }
+    )
+    logger.info(f"Materialized result document for job {job_id} ({len(raw)} bytes)")
+    return document
+
+
+def invalidate_result_document(job_id):
+    """Drop the stored document, e.g. when a job is reprocessed"""
+    JobResultDocument.objects.filter(job_id=job_id).delete()
+
+
+def get_result_document(job_id):
+    try:
+        return JobResultDocument.objects.only('body', 'etag').get(job_id=job_id)
+    except (JobResultDocument.DoesNotExist, ValidationError):
+        return None
+
+
+def gzip_etag(etag):
+    """The ETag of the gzip-encoded body of a document whose identity ETag is ``etag``"""
+    return f'{etag[:-1]}-gzip"'
+
+
+def result_document_response(request, document):
+    """Serve a stored document, honouring If-None-Match and Accept-Encoding"""
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH', '')
+    # CompressionMiddleware weakens the ETag when it re-encodes the body
+    client_tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+    # A cache holding either encoding is up to date; echo the tag it holds
+    for etag in (document.etag, gzip_etag(document.etag)):
+        if etag in client_tags:
+            response = HttpResponseNotModified()
+            response['ETag'] = etag
+            patch_vary_headers(response, ['Accept-Encoding'])
+            return response
+
+    body = bytes(document.body)
+    if _accepts_gzip(request):
+        response = HttpResponse(body, content_type='application/json')
+        response['Content-Encoding'] = 'gzip'
+        response['ETag'] = gzip_etag(document.etag)
+    else:
+        response = HttpResponse(gzip.decompress(body), content_type='application/json')
+        response['ETag'] = document.etag
+    response['Cache-Control'] = 'private, no-cache'
+    patch_vary_headers(response, ['Accept-Encoding'])
+    return response
+
+
+def _accepts_gzip(request):
+    for coding in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        name, _, params = coding.strip().partition(';')
+        if name.strip() == 'gzip':
+            return params.replace(' ', '') not in ('q=0', 'q=0.0')
+    return False
@@ -0,0 +1,181 @@
+"""
+Incrementally maintained stats rollups.
+
+``AgentDailyStats`` and ``DailyStats`` hold additive counters per agent per
+day and per day. Every completed job records what it added in a
+``JobRollupContribution`` row; when the job finishes again (reprocessing),
+fails, or is deleted, that contribution is subtracted before the new one,
+if any, is added. All of this happens in one transaction using ``F()``
+updates, so concurrent pipeline threads never lose counts.
+
+``rebuild_rollups`` (``manage.py rebuild_rollups``) regenerates all three
+tables from scratch in bulk.
+"""
+
+import logging
+from collections import defaultdict
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+from .models import AudioJob, AgentDailyStats, DailyStats, JobRollupContribution
+
+logger = logging.getLogger(__name__)
+
+COUNTER_FIELDS = (
+    'calls', 'score_total', 'compliant_calls', 'warning_calls', 'violation_calls',
+    'violation_count', 'positive_calls', 'neutral_calls', 'negative_calls',
+    'customer_sentiment_total', 'agent_talk_time', 'customer_talk_time',
+)
+
+# Everything a contribution is computed from, readable in a single query
+SOURCE_FIELDS = (
+    'id', 'agent', 'created_at', 'score', 'compliance_status',
+    'compliance_report__violations', 'compliance_report__sentiment',
+    'analytics__customer_sentiment', 'analytics__agent_talk_time', 'analytics__customer_talk_time',
+)
+
+
+def build_contribution(row):
+    """Counters for one completed job, from a ``values(*SOURCE_FIELDS)`` row"""
+    sentiment = (row['compliance_report__sentiment'] or '').lower()
+    compliance_status = row['compliance_status']
+    return {
+        'calls': 1,
+        'score_total': row['score'] or 0,
+        'compliant_calls': int(compliance_status == 'compliant'),
+        'warning_calls': int(compliance_status == 'warning'),
+        'violation_calls': int(compliance_status == 'violation'),
+        'violation_count': len(row['compliance_report__violations'] or []),
+        'positive_calls': int(sentiment == 'positive'),
+        'neutral_calls': int(sentiment not in ('positive', 'negative')),
+        'negative_calls': int(sentiment == 'negative'),
+        'customer_sentiment_total': row['analytics__customer_sentiment'] or 0.0,
+        'agent_talk_time': row['analytics__agent_talk_time'] or 0,
+        'customer_talk_time': row['analytics__customer_talk_time'] or 0,
+    }
+
+
+def _day(created_at):
+    return timezone.localdate(created_at)
+
+
+def _apply(agent, day, counters, sign):
+    """Add (sign=1) or subtract (sign=-1) counters from the rollup rows"""
+    updates = {field: F(field) + sign * counters[field] for field in COUNTER_FIELDS}
+    for model, lookup in ((AgentDailyStats, {'agent': agent, 'day': day}), (DailyStats, {'day': day})):
+        row, _ = model.objects.get_or_create(**lookup)
+        model.objects.filter(pk=row.pk).update(**updates)
+    if sign < 0:
+        # Days that no longer have any calls should not show up as empty rows
+        AgentDailyStats.objects.filter(agent=agent, day=day, calls__lte=0).delete()
+        DailyStats.objects.filter(day=day, calls__lte=0).delete()
+
+
+def update_job_rollup(job_id):
+    """Bring the rollups in line with the job's current state"""
+    with transaction.atomic():
+        previous = JobRollupContribution.objects.select_for_update().filter(job_id=job_id).first()
+        row = AudioJob.objects.filter(id=job_id, status='complete').values(*SOURCE_FIELDS).first()
+
+        if previous is not None:
+            _apply(previous.agent, previous.day, counters_of(previous), -1)
+            previous.delete()
+        if row is not None:
+            counters = build_contribution(row)
+            day = _day(row['created_at'])
+            _apply(row['agent'], day, counters, 1)
+            JobRollupContribution.objects.create(job_id=job_id, agent=row['agent'], day=day, **counters)
+
+
+def remove_job_rollup(job_id):
+    with transaction.atomic():
+        previous = JobRollupContribution.objects.select_for_update().filter(job_id=job_id).first()
+        if previous is not None:
+            _apply(previous.agent, previous.day, counters_of(previous), -1)
+            previous.delete()
+
+
+def counters_of(obj):
+    return {field: getattr(obj, field) for field in COUNTER_FIELDS}
+
+
+def rebuild_rollups(batch_size=2000):
+    """Regenerate every rollup table from the source tables"""
+    agent_totals = defaultdict(lambda: dict.fromkeys(COUNTER_FIELDS, 0))
+    day_totals = defaultdict(lambda: dict.fromkeys(COUNTER_FIELDS, 0))
+
+    with transaction.atomic():
+        JobRollupContribution.objects.all().delete()
+        AgentDailyStats.objects.all().delete()
+        DailyStats.objects.all().delete()
+
+        contributions = []
+        rows = AudioJob.objects.filter(status='complete').values(*SOURCE_FIELDS)
+        for row in rows.iterator(chunk_size=batch_size):
+            counters = build_contribution(row)
+            day = _day(row['created_at'])
+            for totals in (agent_totals[(row['agent'], day)], day_totals[day]):
+                for field in COUNTER_FIELDS:
+                    totals[field] += counters[field]
+            contributions.append(JobRollupContribution(job_id=row['id'], agent=row['agent'], day=day, **counters))
+            if len(contributions) >= batch_size:
+                JobRollupContribution.objects.bulk_create(contributions)
+                contributions = []
+        JobRollupContribution.objects.bulk_create(contributions)
+
+        AgentDailyStats.objects.bulk_create([
+            AgentDailyStats(agent=agent, day=day, **totals)
+            for (agent, day), totals in agent_totals.items()
+        ], batch_size=batch_size)
+        DailyStats.objects.bulk_create([
+            DailyStats(day=day, **totals) for day, totals in day_totals.items()
+        ], batch_size=batch_size)
+
+    return sum(totals['calls'] for totals in day_totals.values())
+
+
+def summarize(counters):
+    """Derived metrics for a set of counters (a rollup row or a Sum over rows)"""
+    counters = {field: counters[field] or 0 for field in COUNTER_FIELDS}
+    calls = counters['calls']
+    talk_time = counters['agent_talk_time'] + counters['customer_talk_time']
+    return {
+        'calls': calls,
+        'average_score': round(counters['score_total'] / calls, 1) if calls else None,
+        'compliant_calls': counters['compliant_calls'],
+        'warning_calls': counters['warning_calls'],
+        'violation_calls': counters['violation_calls'],
+        'violation_count': counters['violation_count'],
+        'sentiment': {
+            'positive': counters['positive_calls'],
+            'neutral': counters['neutral_calls'],
+            'negative': counters['negative_calls'],
+        },
+        'average_customer_sentiment': (
+            round(counters['customer_sentiment_total'] / calls, 3) if calls else None
+        ),
+        'agent_talk_time': counters['agent_talk_time'],
+        'customer_talk_time': counters['customer_talk_time'],
+        'agent_talk_ratio': round(counters['agent_talk_time'] / talk_time, 3) if talk_time else None,
+    }
+
+
+def sum_counters(queryset, *group_by):
+    """Sum counters over a rollup queryset, optionally grouped by columns"""
+    sums = {field: Sum(field) for field in COUNTER_FIELDS}
+    if group_by:
+        return queryset.values(*group_by).annotate(**sums).order_by(*group_by)
+    return queryset.aggregate(**sums)
+
+
+def update_rollups_for_finished_job(sender, job, **kwargs):
+    """Signal receiver: fold a finished (or failed) job into the rollups"""
+    try:
+        update_job_rollup(job.id)
+    except Exception as e:
+        logger.error(f"Error updating stats rollups for job {job.id}: {str(e)}")
+
+
+def remove_rollups_for_deleted_job(sender, instance, **kwargs):
+    """pre_delete receiver: subtract a job from the rollups before it is deleted"""
+    remove_job_rollup(instance.id)
@@ -0,0 +1,9 @@
+from django.urls import path
+from .consumers import JobProgressConsumer, LiveCallIngestConsumer, LiveCallMonitorConsumer
+
+websocket_urlpatterns = [
+    path('ws/jobs/<uuid:job_id>/progress/', JobProgressConsumer.as_asgi()),
+    path('ws/live/ingest/', LiveCallIngestConsumer.as_asgi()),
+    path('ws/live/calls/', LiveCallMonitorConsumer.as_asgi()),
+    path('ws/live/calls/<uuid:job_id>/', LiveCallMonitorConsumer.as_asgi()),
+]
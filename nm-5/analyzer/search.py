@@ -0,0 +1,182 @@
+"""
+Full-text search over transcript utterances.
+
+SQLite uses an FTS5 external-content table, ``analyzer_transcript_fts``,
+kept in sync with ``analyzer_transcript`` by insert/update/delete triggers.
+PostgreSQL uses a GIN index on ``to_tsvector('english', text)``. Both are
+created by migration ``0009_transcript_fulltext``; other backends fall back
+to a (slow) ``icontains`` scan.
+
+Note: Django rebuilds SQLite tables on most ``AlterField`` operations, which
+drops triggers. A migration that alters ``Transcript`` on SQLite must call
+``install_fulltext(schema_editor)`` again afterwards.
+
+Query syntax: bare words must all appear; text in double quotes must appear
+as a phrase, e.g. ``"cancel my subscription" refund``. Nothing else is an
+operator: ``or``, ``-`` and ``NEAR`` are searched for (or ignored) as words.
+
+Snippets are HTML: transcript text is escaped and only the ``<mark>`` tags
+around matches are markup.
+"""
+
+import html
+import re
+import uuid
+from django.db import connection
+from .models import Transcript
+
+SNIPPET_START = '<mark>'
+SNIPPET_END = '</mark>'
+# The database marks matches with control characters, which cannot be confused
+# with markup once the rest of the snippet has been HTML-escaped
+MATCH_START = '\x02'
+MATCH_END = '\x03'
+
+SQLITE_FTS_SQL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS analyzer_transcript_fts USING fts5(
+        text, content='analyzer_transcript', content_rowid='id',
+        tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS analyzer_transcript_fts_ai AFTER INSERT ON analyzer_transcript BEGIN
+        INSERT INTO analyzer_transcript_fts(rowid, text) VALUES (new.id, new.text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS analyzer_transcript_fts_ad AFTER DELETE ON analyzer_transcript BEGIN
+        INSERT INTO analyzer_transcript_fts(analyzer_transcript_fts, rowid, text) VALUES ('delete', old.id, old.text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS analyzer_transcript_fts_au AFTER UPDATE OF text ON analyzer_transcript BEGIN
+        INSERT INTO analyzer_transcript_fts(analyzer_transcript_fts, rowid, text) VALUES ('delete', old.id, old.text);
+        INSERT INTO analyzer_transcript_fts(rowid, text) VALUES (new.id, new.text);
+    END
+    """,
+    # Index any rows that existed before the table was created
+    "INSERT INTO analyzer_transcript_fts(analyzer_transcript_fts) VALUES ('rebuild')",
+]
+
+SQLITE_DROP_FTS_SQL = [
+    "DROP TRIGGER IF EXISTS analyzer_transcript_fts_ai",
+    "DROP TRIGGER IF EXISTS analyzer_transcript_fts_ad",
+    "DROP TRIGGER IF EXISTS analyzer_transcript_fts_au",
+    "DROP TABLE IF EXISTS analyzer_transcript_fts",
+]
+
+POSTGRES_FTS_SQL = [
+    """
+    CREATE INDEX IF NOT EXISTS analyzer_transcript_text_fts_idx
+    ON analyzer_transcript USING GIN (to_tsvector('english', text))
+    """,
+]
+
+POSTGRES_DROP_FTS_SQL = [
+    "DROP INDEX IF EXISTS analyzer_transcript_text_fts_idx",
+]
+
+
+def install_fulltext(schema_editor):
+    vendor = schema_editor.connection.vendor
+    statements = {'sqlite': SQLITE_FTS_SQL, 'postgresql': POSTGRES_FTS_SQL}.get(vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def uninstall_fulltext(schema_editor):
+    vendor = schema_editor.connection.vendor
+    statements = {'sqlite': SQLITE_DROP_FTS_SQL, 'postgresql': POSTGRES_DROP_FTS_SQL}.get(vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def parse_query(query):
+    """Split a user query into (phrases, terms)"""
+    phrases = [p.strip() for p in re.findall(r'"([^"]*)"', query) if p.strip()]
+    remainder = re.sub(r'"[^"]*"', ' ', query).replace('"', ' ')
+    terms = re.findall(r'\w+', remainder)
+    return phrases, terms
+
+
+def search_transcripts(query, limit=20, offset=0):
+    """Return matching utterances, best matches first
+
+    Each result has job_id, transcript_id, speaker, start_time, text and a
+    snippet with matches wrapped in <mark>...</mark>.
+    """
+    phrases, terms = parse_query(query)
+    if not phrases and not terms:
+        return []
+    if connection.vendor == 'sqlite':
+        return _search_sqlite(phrases, terms, limit, offset)
+    if connection.vendor == 'postgresql':
+        return _search_postgres(phrases, terms, limit, offset)
+    return _search_fallback(phrases, terms, limit, offset)
+
+
+def _search_sqlite(phrases, terms, limit, offset):
+    # Quote every token so user input can never be parsed as FTS5 operators
+    match = ' '.join(
+        '"' + part.replace('"', '""') + '"' for part in phrases + terms
+    )
+    sql = """
+        SELECT t.id, t.job_id, t.speaker, t.start_time, t.text,
+               snippet(analyzer_transcript_fts, 0, %s, %s, '…', 16)
+        FROM analyzer_transcript_fts
+        JOIN analyzer_transcript t ON t.id = analyzer_transcript_fts.rowid
+        WHERE analyzer_transcript_fts MATCH %s
+        ORDER BY analyzer_transcript_fts.rank
+        LIMIT %s OFFSET %s
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [MATCH_START, MATCH_END, match, limit, offset])
+        return [_row_to_result(row) for row in cursor.fetchall()]
+
+
+def _search_postgres(phrases, terms, limit, offset):
+    # plainto_tsquery/phraseto_tsquery never parse operators, unlike
+    # websearch_to_tsquery, where a bare "or" or a leading "-" changes the query
+    parts = ["phraseto_tsquery('english', %s)"] * len(phrases)
+    if terms:
+        parts.append("plainto_tsquery('english', %s)")
+    sql = f"""
+        SELECT t.id, t.job_id, t.speaker, t.start_time, t.text,
+               ts_headline('english', t.text, q, %s)
+        FROM analyzer_transcript t, ({' && '.join(parts)}) q
+        WHERE to_tsvector('english', t.text) @@ q
+        ORDER BY ts_rank(to_tsvector('english', t.text), q) DESC
+        LIMIT %s OFFSET %s
+    """
+    options = f'StartSel="{MATCH_START}", StopSel="{MATCH_END}", MaxWords=32, MinWords=8'
+    params = [options, *phrases] + ([' '.join(terms)] if terms else []) + [limit, offset]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [_row_to_result(row) for row in cursor.fetchall()]
+
+
+def _search_fallback(phrases, terms, limit, offset):
+    queryset = Transcript.objects.all()
+    for part in phrases + terms:
+        queryset = queryset.filter(text__icontains=part)
+    rows = queryset.values_list('id', 'job_id', 'speaker', 'start_time', 'text')[offset:offset + limit]
+    return [_row_to_result(row + (row[4],)) for row in rows]
+
+
+def _row_to_result(row):
+    transcript_id, job_id, speaker, start_time, text, snippet = row
+    return {
+        # SQLite stores UUIDs as bare hex; normalize to the canonical form
+        'job_id': str(uuid.UUID(str(job_id))),
+        'transcript_id': transcript_id,
+        'speaker': speaker,
+        'start_time': start_time,
+        'text': text,
+        'snippet': _render_snippet(snippet),
+    }
+
+
+def _render_snippet(snippet):
+    """HTML-escape a snippet, then turn the match markers into <mark> tags"""
+    return html.escape(snippet).replace(MATCH_START, SNIPPET_START).replace(MATCH_END, SNIPPET_END)
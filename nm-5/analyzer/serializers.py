@@ -1,8 +1,10 @@
+from django.db.models import Prefetch
 from rest_framework import serializers
 from .models import (
     AudioJob, Transcript, Sentiment, ContentSafety,
-    ComplianceReport, CallAnalytics
+    ComplianceReport, CallAnalytics, WebhookSubscription
 )
+from .archive import archived_representation
 
 class TranscriptSerializer(serializers.ModelSerializer):
     class Meta:
@@ -10,14 +12,20 @@ class TranscriptSerializer(serializers.ModelSerializer):
         fields = ['id', 'speaker', 'text', 'start_time', 'flagged', 'flag_reason']
 
 class SentimentSerializer(serializers.ModelSerializer):
+    # The text lives on the transcript row only
+    utterance = serializers.CharField(source='transcript.text', read_only=True)
+
     class Meta:
         model = Sentiment
-        fields = ['utterance', 'sentiment', 'confidence']
+        fields = ['transcript', 'utterance', 'sentiment', 'confidence']
 
 class ContentSafetySerializer(serializers.ModelSerializer):
+    # The text lives on the transcript row only
+    utterance = serializers.CharField(source='transcript.text', read_only=True)
+
     class Meta:
         model = ContentSafety
-        fields = ['utterance', 'category', 'severity']
+        fields = ['transcript', 'utterance', 'category', 'severity']
 
 class ComplianceReportSerializer(serializers.ModelSerializer):
     class Meta:
@@ -45,6 +53,55 @@ class CallAnalyticsSerializer(serializers.ModelSerializer):
             'key_phrases'
         ]
 
+# Nested relations of AudioJobSerializer, which ?expand= selects
+DETAIL_RELATIONS = ('transcripts', 'sentiments', 'content_safety', 'compliance_report', 'analytics')
+
+
+def job_detail_prefetches(fields=None):
+    """prefetch_related() arguments for rendering AudioJobSerializer in constant queries
+
+    Only relations in ``fields`` are prefetched when a selection is given.
+    """
+    prefetches = {
+        'transcripts': 'transcripts',
+        'sentiments': Prefetch('sentiments', queryset=Sentiment.objects.select_related('transcript')),
+        'content_safety': Prefetch('content_safety', queryset=ContentSafety.objects.select_related('transcript')),
+    }
+    return tuple(prefetch for name, prefetch in prefetches.items() if fields is None or name in fields)
+
+
+def parse_detail_fields(query_params):
+    """The AudioJobSerializer fields selected by ``?fields=`` and ``?expand=``
+
+    ``fields`` lists the fields to return, scalar or nested; ``expand`` adds
+    nested relations, on top of every scalar field when ``fields`` is absent.
+    Returns None (everything) when neither is given.
+    """
+    if 'fields' not in query_params and 'expand' not in query_params:
+        return None
+
+    def names(param):
+        return {
+            name.strip() for value in query_params.getlist(param)
+            for name in value.split(',') if name.strip()
+        }
+
+    all_fields = AudioJobSerializer.Meta.fields
+    selected = names('fields')
+    expand = names('expand')
+    unknown = sorted(selected - set(all_fields))
+    if unknown:
+        raise serializers.ValidationError({'fields': f"Unknown field(s): {', '.join(unknown)}"})
+    unknown = sorted(expand - set(DETAIL_RELATIONS))
+    if unknown:
+        raise serializers.ValidationError({
+            'expand': f"Unknown relation(s): {', '.join(unknown)} (choose from {', '.join(DETAIL_RELATIONS)})"
+        })
+    if 'fields' not in query_params:
+        selected = {name for name in all_fields if name not in DETAIL_RELATIONS}
+    return selected | expand
+
+
 class AudioJobSerializer(serializers.ModelSerializer):
     transcripts = TranscriptSerializer(many=True, read_only=True)
     sentiments = SentimentSerializer(many=True, read_only=True)
@@ -57,14 +114,33 @@ class AudioJobSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'audio_file', 'created_at', 'agent', 'customer', 
             'duration', 'status', 'progress', 'current_step', 
-            'status_message', 'error_message', 'score', 'compliance_status',
+            'status_message', 'error_message', 'degraded_stages', 'score', 'compliance_status',
+            'flagged_count', 'max_safety_severity', 'dominant_sentiment', 'violation_count', 'archived_at',
             'transcripts', 'sentiments', 'content_safety', 'compliance_report', 'analytics'
         ]
         read_only_fields = [
             'id', 'created_at', 'status', 'progress', 'current_step',
-            'status_message', 'error_message', 'score', 'compliance_status'
+            'status_message', 'error_message', 'degraded_stages', 'score', 'compliance_status',
+            'flagged_count', 'max_safety_severity', 'dominant_sentiment', 'violation_count', 'archived_at'
         ]
 
+    def __init__(self, *args, **kwargs):
+        # Optional sparse fieldset, see parse_detail_fields()
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        archived = [name for name in ('transcripts', 'sentiments', 'content_safety') if name in data]
+        if instance.archived_at is not None and archived:
+            # Rows were moved to cold storage; rehydrate them from the archive
+            rows = archived_representation(instance)
+            data.update({name: rows[name] for name in archived})
+        return data
+
     def get_compliance_report(self, obj):
         try:
             report = obj.compliance_report
@@ -113,10 +189,39 @@ class AudioJobSerializer(serializers.ModelSerializer):
                 'key_phrases': ["refund", "policy", "satisfaction"]
             }
 
+class WebhookSubscriptionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = WebhookSubscription
+        fields = [
+            'id', 'url', 'secret', 'events', 'active', 'batch_size',
+            'batch_interval_ms', 'last_delivery_at', 'last_error', 'created_at'
+        ]
+        read_only_fields = ['id', 'last_delivery_at', 'last_error', 'created_at']
+        extra_kwargs = {'secret': {'write_only': True, 'required': False}}
+
+    def validate_events(self, value):
+        allowed = {'complete', 'error'}
+        if not isinstance(value, list) or not value or not set(value) <= allowed:
+            raise serializers.ValidationError(f"events must be a non-empty list drawn from {sorted(allowed)}")
+        return value
+
+    def validate_batch_size(self, value):
+        if value < 1:
+            raise serializers.ValidationError("batch_size must be at least 1")
+        return value
+
+    def validate_batch_interval_ms(self, value):
+        if value < 0:
+            raise serializers.ValidationError("batch_interval_ms cannot be negative")
+        return value
+
 class AudioJobStatusSerializer(serializers.ModelSerializer):
     class Meta:
         model = AudioJob
-        fields = ['id', 'status', 'error_message']
+        fields = [
+            'id', 'status', 'progress', 'current_step',
+            'status_message', 'error_message'
+        ]
 
 class CallRecordSerializer(serializers.ModelSerializer):
     date = serializers.SerializerMethodField()
@@ -128,7 +233,8 @@ class CallRecordSerializer(serializers.ModelSerializer):
         model = AudioJob
         fields = [
             'id', 'date', 'time', 'agent', 'customer',
-            'duration', 'status', 'score'
+            'duration', 'status', 'score', 'flagged_count',
+            'max_safety_severity', 'dominant_sentiment', 'violation_count'
         ]
 
     def get_date(self, obj):
@@ -138,4 +244,44 @@ class CallRecordSerializer(serializers.ModelSerializer):
         return obj.created_at.strftime('%H:%M')
 
     def get_score(self, obj):
-        return f"{obj.score}%" if obj.score is not None else "0%" 
\ No newline at end of file
+        return f"{obj.score}%" if obj.score is not None else "0%" 
+
+
+# Columns read by serialize_call_records; used with QuerySet.values()
+CALL_RECORD_FIELDS = (
+    'id', 'created_at', 'agent', 'customer', 'duration',
+    'compliance_status', 'score', 'flagged_count',
+    'max_safety_severity', 'dominant_sentiment', 'violation_count'
+)
+
+
+def serialize_call_records(rows):
+    """Build CallRecordSerializer-compatible dicts from AudioJob.values() rows
+
+    Dates are formatted once per calendar day rather than once per row,
+    since a page of call history usually spans only a few days.
+    """
+    date_labels = {}
+    records = []
+    for row in rows:
+        created_at = row['created_at']
+        day = created_at.date()
+        date_label = date_labels.get(day)
+        if date_label is None:
+            date_label = date_labels[day] = created_at.strftime('%B %d, %Y')
+        score = row['score']
+        records.append({
+            'id': str(row['id']),
+            'date': date_label,
+            'time': f"{created_at.hour:02d}:{created_at.minute:02d}",
+            'agent': row['agent'],
+            'customer': row['customer'],
+            'duration': row['duration'],
+            'status': row['compliance_status'],
+            'score': f"{score}%" if score is not None else "0%",
+            'flagged_count': row['flagged_count'],
+            'max_safety_severity': row['max_safety_severity'],
+            'dominant_sentiment': row['dominant_sentiment'],
+            'violation_count': row['violation_count'],
+        })
+    return records
@@ -0,0 +1,9 @@
+from django.dispatch import Signal
+
+# Sent by the processing pipeline whenever a job's status, progress or
+# current step changes. Receivers get ``job`` (the AudioJob instance).
+job_progress = Signal()
+
+# Sent once when a job reaches a terminal status ('complete' or 'error').
+# Receivers get ``job`` (the AudioJob instance).
+job_finished = Signal()
@@ -0,0 +1,59 @@
+"""
+Denormalized per-job summary columns.
+
+The call history list shows, per call, how many utterances were flagged
+(by a live compliance check or a content-safety hit),
+the worst content-safety severity, the dominant utterance sentiment and the
+number of compliance violations. Rather than joining ``Transcript``,
+``Sentiment``, ``ContentSafety`` and ``ComplianceReport`` for every row,
+``process_audio`` stores them on ``AudioJob`` once when a job completes.
+"""
+
+from django.db.models import Count, Max, Q
+from .models import Transcript, Sentiment, ContentSafety, ComplianceReport
+
+SUMMARY_FIELDS = ('flagged_count', 'max_safety_severity', 'dominant_sentiment', 'violation_count')
+
+
+def dominant_sentiment(counts):
+    """Most frequent label in {sentiment: count}; ties prefer neutral, then alphabetical"""
+    if not counts:
+        return 'neutral'
+    return min(counts, key=lambda label: (-counts[label], label != 'neutral', label))
+
+
+def compliance_status_for_score(score):
+    if score >= 80:
+        return 'compliant'
+    elif score >= 60:
+        return 'warning'
+    return 'violation'
+
+
+def flagged_transcripts(transcripts):
+    """Utterances flagged outright or with any content-safety severity above zero"""
+    return transcripts.filter(Q(flagged=True) | Q(content_safety__severity__gt=0)).distinct()
+
+
+def compute_job_summary(job_id):
+    sentiment_counts = dict(
+        Sentiment.objects.filter(job_id=job_id)
+        .values_list('sentiment')
+        .annotate(n=Count('id'))
+        .order_by()
+    )
+    violations = ComplianceReport.objects.filter(job_id=job_id).values_list('violations', flat=True).first()
+    return {
+        'flagged_count': flagged_transcripts(Transcript.objects.filter(job_id=job_id)).count(),
+        'max_safety_severity': (
+            ContentSafety.objects.filter(job_id=job_id).aggregate(m=Max('severity'))['m'] or 0
+        ),
+        'dominant_sentiment': dominant_sentiment(sentiment_counts),
+        'violation_count': len(violations or []),
+    }
+
+
+def apply_job_summary(job):
+    """Compute the summary columns and set them on ``job`` (caller saves)"""
+    for field, value in compute_job_summary(job.id).items():
+        setattr(job, field, value)
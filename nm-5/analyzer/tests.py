@@ -1,3 +1,1492 @@
-from django.test import TestCase
+import gzip
+import itertools
+import json
+from django.test import LiveServerTestCase, TestCase
+from rest_framework.test import APIClient
+from .models import (
+    AudioJob, Transcript, Sentiment, ContentSafety,
+    ComplianceReport, CallAnalytics, JobResultDocument, WebhookSubscription
+)
+from .result_documents import invalidate_result_document
+from .signals import job_progress, job_finished
 
-# Create your tests here.
+
+def create_job(utterances=10):
+    """Create a completed job with one transcript, sentiment and safety row per utterance"""
+    job = AudioJob.objects.create(status='complete', agent='Jane Smith', score=85)
+    transcripts = Transcript.objects.bulk_create([
+        Transcript(job=job, speaker='agent' if i % 2 else 'customer',
+                   start_time=f"{i // 60:02d}:{i % 60:02d}", text=f"Utterance {i}")
+        for i in range(utterances)
+    ])
+    Sentiment.objects.bulk_create([
+        Sentiment(job=job, transcript=transcript, sentiment='neutral', confidence=0.5)
+        for transcript in transcripts
+    ])
+    ContentSafety.objects.bulk_create([
+        ContentSafety(job=job, transcript=transcript, category='safe', severity=0)
+        for transcript in transcripts
+    ])
+    ComplianceReport.objects.create(
+        job=job, checklist=[], risk_level='Low', summary='', score=85, recommendations=[]
+    )
+    CallAnalytics.objects.create(job=job)
+    return job
+
+
+class JobDetailQueryBudgetTests(TestCase):
+    # One query for the job with its one-to-one relations, one prefetch per
+    # reverse relation (transcripts, sentiments, content safety)
+    QUERY_BUDGET = 4
+    # The result action first looks for a materialized document
+    RESULT_QUERY_BUDGET = QUERY_BUDGET + 1
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_result_query_count_is_constant(self):
+        # Jobs still in progress are serialized live rather than materialized
+        for utterances in (10, 1000):
+            job = create_job(utterances)
+            AudioJob.objects.filter(id=job.id).update(status='processing')
+            with self.assertNumQueries(self.RESULT_QUERY_BUDGET):
+                response = self.client.get(f'/api/jobs/{job.id}/result/')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.data['transcripts']), utterances)
+
+    def test_retrieve_query_count_is_constant(self):
+        job = create_job(1000)
+        with self.assertNumQueries(self.QUERY_BUDGET):
+            response = self.client.get(f'/api/jobs/{job.id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['compliance_report']['score'], 85)
+
+    def test_missing_one_to_one_relations_use_defaults(self):
+        job = AudioJob.objects.create(status='processing')
+        with self.assertNumQueries(self.RESULT_QUERY_BUDGET):
+            response = self.client.get(f'/api/jobs/{job.id}/result/')
+        self.assertEqual(response.data['compliance_report']['risk_level'], 'unknown')
+
+
+class JobListTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_list_matches_call_record_serializer(self):
+        from .serializers import CallRecordSerializer
+        job = create_job(2)
+        response = self.client.get('/api/jobs/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'], [CallRecordSerializer(job).data])
+
+    def test_cursor_pages_cover_every_job_once(self):
+        created = {str(AudioJob.objects.create().id) for _ in range(7)}
+        seen = []
+        url = '/api/jobs/?page_size=3'
+        while url:
+            with self.assertNumQueries(1):
+                response = self.client.get(url)
+            seen.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(len(seen), 7)
+        self.assertEqual(set(seen), created)
+
+
+class ResultDocumentTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_completed_result_is_materialized_once(self):
+        job = create_job(50)
+        first = self.client.get(f'/api/jobs/{job.id}/result/')
+        self.assertEqual(first.status_code, 200)
+        self.assertTrue(first['ETag'])
+
+        # The job lookup (permissions, lookup hooks) and the stored document
+        with self.assertNumQueries(2):
+            second = self.client.get(f'/api/jobs/{job.id}/result/')
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(len(json.loads(second.content)['transcripts']), 50)
+
+    def test_stored_document_matches_live_rendering(self):
+        job = create_job(3)
+        AudioJob.objects.filter(id=job.id).update(audio_file='uploads/call.wav', status='processing')
+        live = json.loads(self.client.get(f'/api/jobs/{job.id}/result/').content)
+        AudioJob.objects.filter(id=job.id).update(status='complete')
+        stored = json.loads(self.client.get(f'/api/jobs/{job.id}/result/').content)
+        self.assertTrue(JobResultDocument.objects.filter(job=job).exists())
+        self.assertEqual(live['audio_file'], '/media/uploads/call.wav')
+        live['status'] = 'complete'
+        self.assertEqual(stored, live)
+
+    def test_update_and_delete_invalidate_document(self):
+        job = create_job(2)
+        self.client.get(f'/api/jobs/{job.id}/result/')
+        response = self.client.patch(f'/api/jobs/{job.id}/', {'agent': 'Sam Lee'}, format='multipart')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(JobResultDocument.objects.filter(job=job).exists())
+        self.assertEqual(json.loads(self.client.get(f'/api/jobs/{job.id}/result/').content)['agent'], 'Sam Lee')
+
+        self.assertEqual(self.client.delete(f'/api/jobs/{job.id}/').status_code, 204)
+        self.assertEqual(self.client.get(f'/api/jobs/{job.id}/result/').status_code, 404)
+
+    def test_if_none_match_returns_304(self):
+        job = create_job(5)
+        etag = self.client.get(f'/api/jobs/{job.id}/result/')['ETag']
+        response = self.client.get(f'/api/jobs/{job.id}/result/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_each_encoding_has_its_own_etag(self):
+        job = create_job(5)
+        url = f'/api/jobs/{job.id}/result/'
+        identity = self.client.get(url, HTTP_ACCEPT_ENCODING='identity')
+        gzipped = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertNotEqual(identity['ETag'], gzipped['ETag'])
+        self.assertTrue(gzipped['ETag'].endswith('-gzip"'))
+        for response, encoding in ((identity, 'identity'), (gzipped, 'gzip')):
+            self.assertIn('Accept-Encoding', response['Vary'])
+            revalidated = self.client.get(url, HTTP_ACCEPT_ENCODING=encoding, HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(revalidated.status_code, 304)
+            self.assertEqual(revalidated['ETag'], response['ETag'])
+
+    def test_gzip_body_served_when_accepted(self):
+        job = create_job(5)
+        plain = self.client.get(f'/api/jobs/{job.id}/result/')
+        response = self.client.get(f'/api/jobs/{job.id}/result/', HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+
+    def test_invalidate_removes_document(self):
+        job = create_job(5)
+        self.client.get(f'/api/jobs/{job.id}/result/')
+        invalidate_result_document(job.id)
+        self.assertFalse(JobResultDocument.objects.filter(job=job).exists())
+
+
+class JobProgressPushTests(TestCase):
+    def test_sse_stream_ends_after_terminal_event(self):
+        job = create_job(1)
+        response = self.client.get(f'/api/jobs/{job.id}/events/')
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        body = b''.join(response.streaming_content).decode()
+        self.assertIn('"status": "complete"', body)
+        self.assertIn(f'"result_url": "/api/jobs/{job.id}/result/"', body)
+
+    def test_sse_stream_sees_jobs_finished_by_another_process(self):
+        from django.test import override_settings
+        job = AudioJob.objects.create(status='processing', progress=40)
+        with override_settings(PROGRESS_SSE_HEARTBEAT=0.01):
+            response = self.client.get(f'/api/jobs/{job.id}/events/')
+            chunks = iter(response.streaming_content)
+            self.assertIn(b'"status": "processing"', next(chunks))
+            self.assertEqual(next(chunks), b': keep-alive\n\n')
+            # No job_progress signal reaches this process's broker
+            AudioJob.objects.filter(id=job.id).update(status='error', error_message='boom')
+            self.assertIn(b'"status": "error"', next(chunks))
+            self.assertEqual(list(chunks), [])
+
+    async def test_websocket_receives_pipeline_progress(self):
+        from channels.testing import WebsocketCommunicator
+        from asgiref.sync import sync_to_async
+        from call_clarity_backend.asgi import application
+
+        job = await AudioJob.objects.acreate(status='pending')
+        communicator = WebsocketCommunicator(application, f'/ws/jobs/{job.id}/progress/')
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        self.assertEqual((await communicator.receive_json_from())['status'], 'pending')
+
+        job.status = 'processing'
+        job.progress = 40
+        job.current_step = 'Analysis'
+        await sync_to_async(job_progress.send)(sender=AudioJob, job=job)
+        event = await communicator.receive_json_from()
+        self.assertEqual((event['progress'], event['current_step']), (40, 'Analysis'))
+        await communicator.disconnect()
+
+
+class WebhookTests(TestCase):
+    def test_registration_returns_generated_secret_once(self):
+        client = APIClient()
+        response = client.post('/api/webhooks/', {'url': 'https://crm.example.com/hook'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data['secret']), 64)
+        listed = client.get(f"/api/webhooks/{response.data['id']}/")
+        self.assertNotIn('secret', listed.data)
+
+    def dispatcher(self, *responses):
+        from unittest import mock
+        from django.test import override_settings
+        from .webhooks import WebhookDispatcher
+
+        with override_settings(WEBHOOK_BACKOFF_BASE=0.01, WEBHOOK_MAX_ATTEMPTS=3):
+            dispatcher = WebhookDispatcher()
+        dispatcher.session = mock.Mock()
+        dispatcher.session.post.side_effect = [mock.Mock(status_code=code) for code in responses]
+        # Sender threads cannot write through the test case's open transaction
+        dispatcher._record = mock.Mock()
+        return dispatcher
+
+    def wait_for_posts(self, dispatcher, count):
+        import time
+        deadline = time.monotonic() + 5
+        while dispatcher.session.post.call_count < count and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.05)  # let anything unexpected arrive too
+        return [json.loads(call.kwargs['data'])['events'] for call in dispatcher.session.post.call_args_list]
+
+    def test_new_subscriptions_batch_by_default(self):
+        subscription = WebhookSubscription.objects.create(url='https://crm.example.com/hook', secret='s3cret')
+        self.assertGreater(subscription.batch_size, 1)
+        self.assertGreater(subscription.batch_interval_ms, 0)
+
+    def test_full_batch_is_signed_and_delivered_in_one_post(self):
+        from .webhooks import build_job_event, sign_payload
+
+        subscription = WebhookSubscription.objects.create(
+            url='https://crm.example.com/hook', secret='s3cret', batch_size=3, batch_interval_ms=60000
+        )
+        dispatcher = self.dispatcher(200)
+        for _ in range(3):
+            dispatcher.enqueue(subscription, build_job_event(create_job(1)))
+
+        posts = self.wait_for_posts(dispatcher, 1)
+        self.assertEqual([len(events) for events in posts], [3])
+        kwargs = dispatcher.session.post.call_args.kwargs
+        timestamp = kwargs['headers']['X-CallClarity-Timestamp']
+        self.assertEqual(
+            kwargs['headers']['X-CallClarity-Signature'],
+            f"sha256={sign_payload('s3cret', timestamp, kwargs['data'])}"
+        )
+
+    def test_partial_batch_is_sent_when_the_interval_expires(self):
+        from .webhooks import build_job_event
+
+        subscription = WebhookSubscription.objects.create(
+            url='https://crm.example.com/hook', secret='s3cret', batch_size=50, batch_interval_ms=50
+        )
+        dispatcher = self.dispatcher(200)
+        dispatcher.enqueue(subscription, build_job_event(create_job(1)))
+        dispatcher.enqueue(subscription, build_job_event(create_job(1)))
+        self.assertEqual([len(events) for events in self.wait_for_posts(dispatcher, 1)], [2])
+
+    def test_failed_delivery_is_retried_with_backoff(self):
+        from .webhooks import build_job_event
+
+        subscription = WebhookSubscription.objects.create(
+            url='https://crm.example.com/hook', secret='s3cret', batch_size=1
+        )
+        dispatcher = self.dispatcher(503, 429, 200)
+        event = build_job_event(create_job(1))
+        dispatcher.enqueue(subscription, event)
+        posts = self.wait_for_posts(dispatcher, 3)
+        self.assertEqual(posts, [[event]] * 3)
+        dispatcher._record.assert_called_once_with(subscription, None)
+
+        rejected = self.dispatcher(400, 200)
+        self.assertFalse(rejected.deliver(subscription, [event]))  # 4xx is not retried
+        self.assertEqual(rejected.session.post.call_count, 1)
+
+
+class JobListFilterTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        for agent, status, score in [
+            ('Jane Smith', 'compliant', 92), ('Jane Smith', 'violation', 40),
+            ('Tom Lee', 'warning', 65), ('Tom Lee', 'compliant', 88),
+        ]:
+            AudioJob.objects.create(agent=agent, compliance_status=status, score=score)
+
+    def get_rows(self, query):
+        response = self.client.get(f'/api/jobs/?{query}')
+        self.assertEqual(response.status_code, 200)
+        return response.data['results']
+
+    def test_filters_combine(self):
+        rows = self.get_rows('agent=Jane%20Smith&compliance_status=compliant')
+        self.assertEqual([(r['agent'], r['status']) for r in rows], [('Jane Smith', 'compliant')])
+        self.assertEqual(len(self.get_rows('score_min=60&score_max=90')), 2)
+
+    def test_date_range_is_inclusive_of_end_day(self):
+        from django.utils import timezone
+        today = timezone.now().date().isoformat()
+        self.assertEqual(len(self.get_rows(f'date_from={today}&date_to={today}')), 4)
+        self.assertEqual(len(self.get_rows('date_to=2000-01-01')), 0)
+
+    def test_ordering_by_score(self):
+        rows = self.get_rows('ordering=-score')
+        self.assertEqual([r['score'] for r in rows], ['92%', '88%', '65%', '40%'])
+
+    def test_pages_over_tied_sort_values_cover_every_job_once(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        now = timezone.now()
+        # Ties on score, and on created_at as well, across page boundaries
+        for i in range(20):
+            AudioJob.objects.create(agent='Tie Agent', score=70, created_at=now - timedelta(seconds=i // 3))
+        for ordering in ('-score', 'score', 'agent', '-agent', 'created_at'):
+            seen = []
+            url = f'/api/jobs/?ordering={ordering}&page_size=3'
+            while url:
+                response = self.client.get(url)
+                seen.extend(row['id'] for row in response.data['results'])
+                url = response.data['next']
+            self.assertEqual(len(seen), 24, ordering)
+            self.assertEqual(len(set(seen)), 24, ordering)
+
+    def test_score_ordering_reads_an_index(self):
+        from django.db import connection
+        from .pagination import JobCursorPagination
+        from rest_framework.request import Request
+        from rest_framework.test import APIRequestFactory
+        from .views import AudioJobViewSet
+
+        request = Request(APIRequestFactory().get('/api/jobs/', {'ordering': '-score'}))
+        view = AudioJobViewSet(request=request, action='list', format_kwarg=None)
+        ordering = JobCursorPagination().get_ordering(request, AudioJob.objects.all(), view)
+        self.assertEqual(ordering, ('-score', '-created_at', '-id'))
+        if connection.vendor == 'sqlite':
+            plan = AudioJob.objects.order_by(*ordering)[:3].explain()
+            self.assertIn('job_score_desc_created_idx', plan)
+            self.assertNotIn('TEMP B-TREE', plan)
+
+
+class TranscriptSearchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.job = AudioJob.objects.create(agent='Jane Smith')
+        Transcript.objects.bulk_create([
+            Transcript(job=self.job, speaker='customer', start_time='00:05',
+                       text='I would like to cancel my subscription today'),
+            Transcript(job=self.job, speaker='agent', start_time='00:09',
+                       text='Before you cancel, may I ask why your subscription is a problem?'),
+            Transcript(job=self.job, speaker='customer', start_time='00:15', text='The price went up'),
+        ])
+
+    def search(self, query):
+        response = self.client.get('/api/search/', {'q': query})
+        self.assertEqual(response.status_code, 200)
+        return response.data['results']
+
+    def test_phrase_match_with_snippet(self):
+        results = self.search('"cancel my subscription"')
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]['job_id'], str(self.job.id))
+        self.assertEqual(results[0]['speaker'], 'customer')
+        self.assertEqual(results[0]['start_time'], '00:05')
+        self.assertIn('<mark>cancel my subscription</mark>', results[0]['snippet'])
+
+    def test_terms_and_index_tracks_updates(self):
+        self.assertEqual(len(self.search('cancel subscription')), 2)
+        Transcript.objects.filter(start_time='00:15').update(text='I want to cancel, the subscription price went up')
+        self.assertEqual(len(self.search('cancel subscription')), 3)
+        Transcript.objects.filter(start_time='00:05').delete()
+        self.assertEqual(len(self.search('cancel subscription')), 2)
+
+    def test_operators_in_query_are_literal(self):
+        self.assertEqual(self.search('price OR NEAR( "'), [])
+        response = self.client.get('/api/search/')
+        self.assertEqual(response.status_code, 400)
+
+    def test_snippet_escapes_transcript_html(self):
+        Transcript.objects.create(
+            job=self.job, speaker='customer', start_time='00:20',
+            text='<img src=x onerror=alert(1)> refund & "cancel" now'
+        )
+        [result] = self.search('refund')
+        self.assertNotIn('<img', result['snippet'])
+        self.assertIn('&lt;img src=x onerror=alert(1)&gt;', result['snippet'])
+        self.assertIn('<mark>refund</mark> &amp; &quot;cancel&quot;', result['snippet'])
+        self.assertTrue(result['text'].startswith('<img'))  # the raw text field is plain text
+
+    def test_postgres_query_never_parses_user_operators(self):
+        from unittest import mock
+        from . import search
+
+        cursor = mock.MagicMock()
+        cursor.__enter__.return_value.fetchall.return_value = [
+            (1, self.job.id, 'agent', '00:01', 'a <b>', '<b> \x02price\x03 or -up')
+        ]
+        with mock.patch.object(search.connection, 'cursor', return_value=cursor):
+            [result] = search._search_postgres(['went up'], ['price', 'or', '-up'], 20, 0)
+        sql, params = cursor.__enter__.return_value.execute.call_args.args
+        self.assertNotIn('websearch_to_tsquery', sql)
+        self.assertIn("phraseto_tsquery('english', %s) && plainto_tsquery('english', %s)", sql)
+        self.assertEqual(params[1:], ['went up', 'price or -up', 20, 0])
+        self.assertEqual(result['snippet'], '&lt;b&gt; <mark>price</mark> or -up')
+
+
+class VectorIndexTests(TestCase):
+    def setUp(self):
+        import numpy as np
+        import tempfile
+        from .vector_index import VectorIndex
+        self.np = np
+        self.tmp = tempfile.TemporaryDirectory()
+        self.index = VectorIndex(self.tmp.name)
+        rng = np.random.default_rng(1)
+        self.jobs = [AudioJob.objects.create(agent=f"Agent {i}", status='complete') for i in range(40)]
+        # Four topics; each job's vectors sit near its topic direction
+        self.topics = rng.normal(size=(4, 16))
+        for i, job in enumerate(self.jobs):
+            vectors = self.topics[i % 4] + rng.normal(scale=0.1, size=(3, 16))
+            self.index.add(job.id, ['summary', 'utterance', 'utterance'], [None, i * 2 + 1, i * 2 + 2], vectors)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def same_topic(self, job):
+        return {str(j.id) for i, j in enumerate(self.jobs) if i % 4 == self.jobs.index(job) % 4} - {str(job.id)}
+
+    def test_similar_jobs_share_a_topic(self):
+        results = self.index.similar_jobs(self.jobs[0].id, k=5)
+        self.assertEqual(len(results), 5)
+        self.assertTrue({r['job_id'] for r in results} <= self.same_topic(self.jobs[0]))
+        self.assertEqual(results, sorted(results, key=lambda r: -r['similarity']))
+
+    def test_ivf_search_and_tombstones(self):
+        self.assertEqual(self.index.train_ivf(n_lists=4), 4)
+        job = self.jobs[1]
+        results = self.index.search(self.topics[1], k=3, kind='utterance')
+        self.assertTrue({r['job_id'] for r in results} <= self.same_topic(job) | {str(job.id)})
+        self.assertTrue(all(r['transcript_id'] for r in results))
+
+        for result in results:
+            self.index.remove_job(result['job_id'])
+        removed = {r['job_id'] for r in results}
+        self.assertFalse(removed & {r['job_id'] for r in self.index.search(self.topics[1], k=10)})
+        self.assertEqual(self.index.snapshot()['ivf_lists'], 4)
+
+    def test_appends_from_several_processes_are_all_kept(self):
+        import multiprocessing
+        import uuid
+        from .vector_index import VectorIndex
+
+        def append(seed):
+            # A separate instance per process, sharing only the files on disk
+            index, rng = VectorIndex(self.tmp.name), self.np.random.default_rng(seed)
+            for _ in range(20):
+                index.add(uuid.uuid4(), ['utterance'] * 5, range(1, 6), rng.normal(size=(5, 16)))
+
+        context = multiprocessing.get_context('fork')
+        workers = [context.Process(target=append, args=(seed,)) for seed in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.assertTrue(all(worker.exitcode == 0 for worker in workers))
+
+        snapshot = self.index.snapshot()
+        self.assertEqual(snapshot['rows'], 40 * 3 + 4 * 20 * 5)
+        self.assertEqual(snapshot['alive'], snapshot['rows'])
+        self.assertEqual(len(self.index.indexed_job_ids()), 40 + 4 * 20)
+
+    def test_readers_never_write_ivf_lists(self):
+        import os
+        import uuid
+        from .vector_index import VectorIndex
+        lists_path = os.path.join(self.tmp.name, 'lists.bin')
+        # Loaded before the partitions exist, so its appends carry no list ids
+        unaware = VectorIndex(self.tmp.name)
+        len(unaware)
+        self.index.train_ivf(n_lists=4)
+        unaware.add(uuid.uuid4(), ['summary'] * 2, [None] * 2, self.topics[:2])
+        self.assertEqual(os.path.getsize(lists_path), 120 * 4)
+
+        # Reads assign the missing rows in memory but leave the file to writers
+        self.assertEqual(len(self.index), 122)
+        self.index.search(self.topics[0], k=3)
+        self.assertEqual(os.path.getsize(lists_path), 120 * 4)
+
+        self.index.add(uuid.uuid4(), ['summary'], [None], self.topics[2:3])
+        stored = self.np.fromfile(lists_path, dtype=self.np.int32)
+        self.assertEqual(len(stored), 123)
+        self.assertEqual(list(stored[120:]), list(self.index._assign_lists(self.index._vectors[120:123])))
+
+    def test_job_ids_ending_in_nul_bytes_round_trip(self):
+        import uuid
+        job_id = uuid.UUID(bytes=b'\x01' * 14 + b'\x00\x00')
+        self.index.add(job_id, ['summary'], [None], self.topics[:1] * -1)
+        self.assertIn(job_id, self.index.indexed_job_ids())
+        self.assertEqual(self.index.search(self.topics[0] * -1, k=1)[0]['job_id'], str(job_id))
+
+    def test_similar_endpoint(self):
+        from unittest import mock
+        with mock.patch('analyzer.views.get_vector_index', return_value=self.index):
+            response = APIClient().get(f'/api/jobs/{self.jobs[2].id}/similar/?k=3')
+            missing = AudioJob.objects.create()
+            not_indexed = APIClient().get(f'/api/jobs/{missing.id}/similar/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertEqual(response.data['results'][0]['agent'][:6], 'Agent ')
+        self.assertEqual(not_indexed.status_code, 404)
+
+
+class StatsRollupTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.jobs = [create_job(utterances=2) for _ in range(3)]
+        self.jobs[2].agent = 'Tom Lee'
+        self.jobs[2].score = 40
+        self.jobs[2].compliance_status = 'violation'
+        self.jobs[2].save()
+        CallAnalytics.objects.filter(job=self.jobs[0]).update(agent_talk_time=60, customer_talk_time=40)
+        for job in self.jobs:
+            job_finished.send(sender=AudioJob, job=job)
+
+    def agents(self):
+        response = self.client.get('/api/stats/agents/')
+        self.assertEqual(response.status_code, 200)
+        return {row['agent']: row for row in response.data['agents']}
+
+    def test_rollups_follow_completion_reprocessing_and_deletion(self):
+        agents = self.agents()
+        self.assertEqual(agents['Jane Smith']['calls'], 2)
+        self.assertEqual(agents['Jane Smith']['average_score'], 85)
+        self.assertEqual(agents['Jane Smith']['agent_talk_ratio'], 0.6)
+        self.assertEqual(agents['Tom Lee']['violation_calls'], 1)
+
+        # Reprocessing replaces the job's previous contribution
+        self.jobs[0].score = 65
+        self.jobs[0].save()
+        job_finished.send(sender=AudioJob, job=self.jobs[0])
+        self.assertEqual(self.agents()['Jane Smith']['average_score'], 75)
+
+        self.jobs[2].delete()
+        self.assertNotIn('Tom Lee', self.agents())
+        totals = self.client.get('/api/stats/').data['totals']
+        self.assertEqual(totals['calls'], 2)
+
+    def test_rebuild_matches_incremental_rollups(self):
+        from .models import AgentDailyStats, DailyStats
+        from .rollups import rebuild_rollups
+        fields = ('agent', 'day', 'calls', 'score_total', 'violation_calls', 'agent_talk_time')
+        before = sorted(AgentDailyStats.objects.values_list(*fields))
+        days_before = list(DailyStats.objects.values_list('day', 'calls', 'score_total'))
+        self.assertEqual(rebuild_rollups(batch_size=2), 3)
+        self.assertEqual(sorted(AgentDailyStats.objects.values_list(*fields)), before)
+        self.assertEqual(list(DailyStats.objects.values_list('day', 'calls', 'score_total')), days_before)
+        self.assertEqual(self.client.get('/api/stats/?date_from=nope').status_code, 400)
+
+
+class JobSummaryColumnTests(TestCase):
+    def test_summary_columns_reach_the_list(self):
+        from .summaries import apply_job_summary
+        job = create_job(utterances=4)
+        Transcript.objects.filter(job=job, text='Utterance 1').update(flagged=True)
+        ContentSafety.objects.filter(job=job, transcript__text='Utterance 2').update(category='Hate', severity=4)
+        Sentiment.objects.filter(job=job, transcript__text__in=['Utterance 0', 'Utterance 3']).update(sentiment='negative')
+        Sentiment.objects.filter(job=job, transcript__text='Utterance 1').update(sentiment='positive')
+        ComplianceReport.objects.filter(job=job).update(violations=[{'type': 'PCI'}, {'type': 'GDPR'}])
+
+        apply_job_summary(job)
+        job.save()
+
+        with self.assertNumQueries(1):
+            row = APIClient().get('/api/jobs/').data['results'][0]
+        self.assertEqual(
+            (row['flagged_count'], row['max_safety_severity'], row['dominant_sentiment'], row['violation_count']),
+            (2, 4, 'negative', 2)
+        )
+
+    def test_dominant_sentiment_ties_prefer_neutral(self):
+        from .summaries import dominant_sentiment
+        self.assertEqual(dominant_sentiment({'positive': 2, 'neutral': 2}), 'neutral')
+        self.assertEqual(dominant_sentiment({'positive': 2, 'negative': 2}), 'negative')
+        self.assertEqual(dominant_sentiment({}), 'neutral')
+
+
+class BulkUploadTests(TestCase):
+    def setUp(self):
+        import tempfile
+        from unittest import mock
+        self.media = tempfile.TemporaryDirectory()
+        self.settings_override = self.settings(MEDIA_ROOT=self.media.name)
+        self.settings_override.enable()
+        patcher = mock.patch('analyzer.views.processing_executor')
+        self.executor = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        self.client = APIClient()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.media.cleanup()
+
+    def make_archive(self, kind, members):
+        import io
+        import tarfile
+        import zipfile
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        buffer = io.BytesIO()
+        if kind == 'zip':
+            with zipfile.ZipFile(buffer, 'w') as zf:
+                for name, data in members:
+                    zf.writestr(name, data)
+        else:
+            with tarfile.open(fileobj=buffer, mode='w:gz') as tf:
+                for name, data in members:
+                    info = tarfile.TarInfo(name)
+                    info.size = len(data)
+                    tf.addfile(info, io.BytesIO(data))
+        return SimpleUploadedFile(f'calls.{kind}', buffer.getvalue())
+
+    def test_archive_creates_one_batch_of_jobs(self):
+        import os
+        archive = self.make_archive('tar.gz', [
+            ('day1/a.wav', b'RIFF1'), ('day2/a.wav', b'RIFF2'),
+            ('../../evil.mp3', b'ID3'), ('notes.txt', b'skip me'),
+        ])
+        with self.assertNumQueries(3):  # batch insert, one bulk_create, total update
+            response = self.client.post('/api/jobs/bulk/', {'archive': archive, 'agent': 'Jane Smith'})
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['total'], 3)
+        self.assertEqual(self.executor.submit.call_count, 3)
+
+        jobs = AudioJob.objects.filter(batch_id=response.data['batch_id'])
+        names = sorted(os.path.basename(job.audio_file.name) for job in jobs)
+        self.assertEqual(names, ['a.wav', 'a_1.wav', 'evil.mp3'])
+        for job in jobs:
+            self.assertTrue(job.audio_file.path.startswith(self.media.name))
+            self.assertTrue(os.path.exists(job.audio_file.path))
+        self.assertEqual({job.agent for job in jobs}, {'Jane Smith'})
+
+        AudioJob.objects.filter(id=jobs[0].id).update(status='complete', progress=100)
+        progress = self.client.get(response.data['status_url']).data
+        self.assertEqual((progress['total'], progress['complete'], progress['pending']), (3, 1, 2))
+        self.assertFalse(progress['finished'])
+
+    def test_multiple_files_and_rejections(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        files = [SimpleUploadedFile(f'call{i}.mp3', b'ID3') for i in range(4)]
+        response = self.client.post('/api/jobs/bulk/', {'files': files})
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['total'], 4)
+
+        empty = self.make_archive('zip', [('readme.txt', b'x')])
+        response = self.client.post('/api/jobs/bulk/', {'archive': empty})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(AudioJob.objects.count(), 4)
+
+    def assertNothingKept(self):
+        import os
+        from .models import UploadBatch
+        self.assertFalse(UploadBatch.objects.exists())
+        self.assertFalse(AudioJob.objects.exists())
+        batches = os.path.join(self.media.name, 'uploads', 'batches')
+        self.assertEqual(os.listdir(batches) if os.path.exists(batches) else [], [])
+
+    def test_extracted_size_limit(self):
+        # Zip members compress to almost nothing; the limit counts extracted bytes
+        archive = self.make_archive('zip', [('a.wav', bytes(600)), ('b.wav', bytes(600))])
+        with self.settings(BULK_UPLOAD_MAX_BYTES=1000):
+            response = self.client.post('/api/jobs/bulk/', {'archive': archive})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('1000 bytes', response.data['error'])
+        self.assertNothingKept()
+
+    def test_storage_errors_remove_the_batch(self):
+        import errno
+        from unittest import mock
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        files = [SimpleUploadedFile(f'call{i}.wav', b'RIFF') for i in range(3)]
+        copy = mock.patch('analyzer.ingest._BatchWriter._copy', autospec=True, side_effect=[
+            None, OSError(errno.ENOSPC, 'No space left on device')
+        ])
+        with copy:
+            response = self.client.post('/api/jobs/bulk/', {'files': files})
+        self.assertEqual(response.status_code, 500)
+        self.assertNothingKept()
+        self.executor.submit.assert_not_called()
+
+
+class ImportCallsTests(TestCase):
+    def setUp(self):
+        import tempfile
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def call(self, i, **extra):
+        return {
+            'id': f'legacy-{i}', 'date': 'May 3, 2024', 'time': '14:30', 'agent': f'Agent {i % 2}',
+            'status': 'violation' if i == 0 else 'compliant', 'score': 50 + i,
+            'transcript': [
+                {'speaker': 'agent', 'text': f'Hello {i}', 'time': '00:00'},
+                {'speaker': 'customer', 'text': 'Hi', 'time': '00:04', 'flagged': True},
+            ],
+            'complianceItems': [{'category': 'PCI', 'status': 'violation' if i == 0 else 'compliant'}],
+            **extra,
+        }
+
+    def write(self, name, text):
+        import os
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'w') as f:
+            f.write(text)
+        return path
+
+    def test_streams_wrapped_json_array(self):
+        from .importer import import_calls, iter_json_array
+        import io
+        calls = [self.call(i) for i in range(5)]
+        text = json.dumps({'callHistory': calls}, indent=2)
+        # Tiny chunks force records to straddle read boundaries
+        self.assertEqual(list(iter_json_array(io.StringIO(text), chunk_size=7)), calls)
+
+        stats = import_calls(self.write('calls.json', text), batch_size=2)
+        self.assertEqual(stats['calls_read'], 5)
+        self.assertEqual(AudioJob.objects.count(), 5)
+        self.assertEqual(Transcript.objects.count(), 10)
+        job = AudioJob.objects.get(agent='Agent 0', score=50)
+        # created_at comes from the source, not the import time
+        self.assertEqual((job.created_at.year, job.created_at.month, job.created_at.hour), (2024, 5, 14))
+        self.assertEqual((job.flagged_count, job.violation_count), (1, 1))
+
+    def test_ndjson_resume_and_replay_skip_existing_jobs(self):
+        from .importer import import_calls, ImportFormatError, Checkpoint
+        lines = [json.dumps(self.call(i)) for i in range(4)] + ['{not json']
+        path = self.write('calls.ndjson', '\n'.join(lines))
+        with self.assertRaises(ImportFormatError):
+            import_calls(path, batch_size=2)
+        self.assertEqual(AudioJob.objects.count(), 4)
+        self.assertEqual(Checkpoint(f'{path}.import-checkpoint').load(), 4)
+
+        path = self.write('calls.ndjson', '\n'.join(lines[:4] + [json.dumps(self.call(4))]))
+        stats = import_calls(path, batch_size=2, resume=True)
+        self.assertEqual((stats['calls_skipped'], AudioJob.objects.count()), (4, 5))
+        # A full replay without a checkpoint writes nothing new
+        self.assertEqual(import_calls(path)['rows_written'], 0)
+        self.assertEqual(Transcript.objects.count(), 10)
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.jane = create_job(utterances=3)
+        self.tom = AudioJob.objects.create(agent='Tom Lee', status='complete', score=40)
+        Transcript.objects.create(job=self.tom, speaker='agent', start_time='00:01', text='Hi, "quoted", text')
+
+    def fetch(self, query):
+        response = self.client.get(f'/api/export/?{query}')
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content)
+
+    def test_ndjson_jobs_with_filters(self):
+        lines = self.fetch('dataset=jobs&format=ndjson&agent=Tom%20Lee').decode().splitlines()
+        self.assertEqual(len(lines), 1)
+        row = json.loads(lines[0])
+        self.assertEqual((row['id'], row['agent'], row['score']), (str(self.tom.id), 'Tom Lee', 40))
+
+    def test_gzipped_csv_transcripts(self):
+        import csv
+        import io
+        body = gzip.decompress(self.fetch('dataset=transcripts&format=csv&gzip=1'))
+        rows = list(csv.DictReader(io.StringIO(body.decode())))
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[-1]['text'], 'Hi, "quoted", text')
+        self.assertEqual(rows[-1]['agent'], 'Tom Lee')
+
+    def test_parquet_row_groups(self):
+        from .exports import export_stream, pyarrow
+        if pyarrow is None:
+            self.skipTest('pyarrow is not installed')
+        import io
+        import pyarrow.parquet as pq
+        body = b''.join(export_stream('transcripts', 'parquet', chunk_size=2))
+        parquet = pq.ParquetFile(io.BytesIO(body))
+        self.assertEqual(parquet.metadata.num_rows, 4)
+        self.assertEqual(parquet.metadata.num_row_groups, 2)
+        self.assertEqual(parquet.read().column('speaker').to_pylist()[-1], 'agent')
+
+    def test_rejects_unknown_format(self):
+        response = self.client.get('/api/export/?format=xlsx')
+        self.assertEqual(response.status_code, 400)
+
+
+class ArchiveTests(TestCase):
+    def setUp(self):
+        self.job = create_job(utterances=6)
+        # A second analysis row for the same utterance
+        transcript = Transcript.objects.filter(job=self.job).order_by('id').last()
+        Sentiment.objects.create(job=self.job, transcript=transcript, sentiment='negative', confidence=0.9)
+
+    def test_archived_job_reads_the_same(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from .archive import archive_old_jobs
+        AudioJob.objects.filter(id=self.job.id).update(created_at=timezone.now() - timedelta(days=400))
+        before = self.client.get(f'/api/jobs/{self.job.id}/').json()
+
+        stats = archive_old_jobs(older_than_days=365)
+        self.assertEqual((stats['jobs'], stats['rows']), (1, 19))
+        self.assertFalse(Transcript.objects.filter(job=self.job).exists())
+        self.assertFalse(Sentiment.objects.filter(job=self.job).exists())
+
+        after = self.client.get(f'/api/jobs/{self.job.id}/').json()
+        self.assertIsNotNone(after.pop('archived_at'))
+        before.pop('archived_at')
+        self.assertEqual(after, before)
+
+    def test_restore_moves_rows_back(self):
+        from .archive import archive_job, restore_job
+        transcripts = list(Transcript.objects.filter(job=self.job).values_list('id', 'text').order_by('id'))
+        archive_job(self.job.id)
+        self.assertIsNone(archive_job(self.job.id))
+
+        self.assertTrue(restore_job(self.job.id))
+        self.job.refresh_from_db()
+        self.assertIsNone(self.job.archived_at)
+        self.assertEqual(list(Transcript.objects.filter(job=self.job).values_list('id', 'text').order_by('id')), transcripts)
+        self.assertEqual(Sentiment.objects.filter(job=self.job).count(), 7)
+        self.assertEqual(ContentSafety.objects.filter(job=self.job).count(), 6)
+
+    def test_version_1_archives_still_read_and_restore(self):
+        from django.utils import timezone
+        from .archive import archived_representation, compress, restore_job
+        from .models import JobArchive
+        transcripts = list(Transcript.objects.filter(job=self.job).order_by('id'))
+        # Version 1 named each analysis row's utterance; a null index meant no transcript matched
+        payload = {
+            'version': 1,
+            'transcripts': {
+                'columns': ['id', 'speaker', 'start_time', 'text', 'flagged', 'flag_reason', 'created_at'],
+                'rows': [[t.id, t.speaker, t.start_time, t.text, False, None, None] for t in transcripts],
+            },
+            'sentiments': {
+                'columns': ['transcript', 'utterance', 'sentiment', 'confidence', 'created_at'],
+                'rows': [[0, None, 'positive', 0.8, None], [None, 'Edited away', 'negative', 0.6, None]],
+            },
+            'content_safety': {
+                'columns': ['transcript', 'utterance', 'category', 'severity', 'created_at'],
+                'rows': [[1, None, 'Hate', 2, None]],
+            },
+        }
+        Sentiment.objects.filter(job=self.job).delete()
+        ContentSafety.objects.filter(job=self.job).delete()
+        Transcript.objects.filter(job=self.job).delete()
+        JobArchive.objects.create(
+            job=self.job, codec='gzip', body=compress(json.dumps(payload).encode(), 'gzip'), raw_size=0, row_count=0
+        )
+        AudioJob.objects.filter(id=self.job.id).update(archived_at=timezone.now())
+        self.job.refresh_from_db()
+
+        rendered = archived_representation(self.job)
+        self.assertEqual(len(rendered['transcripts']), 6)
+        self.assertEqual(rendered['sentiments'], [
+            {'transcript': transcripts[0].id, 'utterance': 'Utterance 0', 'sentiment': 'positive', 'confidence': 0.8}
+        ])
+        self.assertEqual(rendered['content_safety'][0]['transcript'], transcripts[1].id)
+        self.assertEqual(self.client.get(f'/api/jobs/{self.job.id}/').status_code, 200)
+
+        self.assertTrue(restore_job(self.job.id))
+        self.assertEqual(Transcript.objects.filter(job=self.job).count(), 6)
+        self.assertEqual(list(Sentiment.objects.filter(job=self.job).values_list('transcript_id', 'sentiment')),
+                         [(transcripts[0].id, 'positive')])
+        self.assertEqual(ContentSafety.objects.get(job=self.job).transcript_id, transcripts[1].id)
+
+
+class RenderingAndCompressionTests(TestCase):
+    def test_fast_renderer_matches_drf(self):
+        import uuid
+        from datetime import datetime, timezone as dt_timezone
+        from decimal import Decimal
+        from rest_framework.renderers import JSONRenderer
+        from .renderers import FastJSONRenderer
+        data = {
+            'id': uuid.uuid4(), 'created_at': datetime(2025, 5, 3, 14, 30, 1, 250000, tzinfo=dt_timezone.utc),
+            'score': Decimal('92.5'), 'text': 'Café ✓', 'nested': [{'flagged': True, 'severity': None}],
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_negotiation(self):
+        from .compression import negotiate_encoding, brotli
+        self.assertEqual(negotiate_encoding('gzip, deflate'), 'gzip')
+        self.assertIsNone(negotiate_encoding('gzip;q=0, identity'))
+        self.assertIsNone(negotiate_encoding(''))
+        self.assertEqual(negotiate_encoding('gzip, br'), 'br' if brotli else 'gzip')
+
+    def test_large_responses_are_compressed_small_ones_are_not(self):
+        job = create_job(utterances=200)
+        response = self.client.get(f'/api/jobs/{job.id}/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(json.loads(gzip.decompress(response.content))['id'], str(job.id))
+
+        response = self.client.get(f'/api/jobs/{job.id}/status/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_stored_result_document_is_not_compressed_twice(self):
+        job = create_job(utterances=200)
+        self.client.get(f'/api/jobs/{job.id}/result/')
+        response = self.client.get(f'/api/jobs/{job.id}/result/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(json.loads(gzip.decompress(response.content))['id'], str(job.id))
+
+
+class JobDetailSelectionTests(TestCase):
+    def setUp(self):
+        self.job = create_job(utterances=5)
+
+    def test_expand_returns_summary_columns_and_requested_relations(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/api/jobs/{self.job.id}/?expand=compliance_report')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['compliance_report']['score'], 85)
+        self.assertIn('violation_count', response.data)
+        self.assertNotIn('transcripts', response.data)
+        self.assertNotIn('analytics', response.data)
+
+    def test_fields_on_result(self):
+        response = self.client.get(f'/api/jobs/{self.job.id}/result/?fields=id,score,transcripts')
+        self.assertEqual(set(response.data), {'id', 'score', 'transcripts'})
+        self.assertEqual(len(response.data['transcripts']), 5)
+
+    def test_unknown_fields_are_rejected(self):
+        response = self.client.get(f'/api/jobs/{self.job.id}/?fields=id,secret')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(f'/api/jobs/{self.job.id}/?expand=score')
+        self.assertEqual(response.status_code, 400)
+
+    def test_sub_resources_are_cursor_paginated(self):
+        texts = []
+        url = f'/api/jobs/{self.job.id}/transcripts/?page_size=2'
+        while url:
+            page = self.client.get(url).json()
+            texts += [row['text'] for row in page['results']]
+            url = page['next']
+        self.assertEqual(texts, [f'Utterance {i}' for i in range(5)])
+
+        page = self.client.get(f'/api/jobs/{self.job.id}/content-safety/').json()
+        self.assertEqual(page['results'][0]['utterance'], 'Utterance 0')
+        self.assertEqual(len(self.client.get(f'/api/jobs/{self.job.id}/sentiments/').json()['results']), 5)
+
+    def test_sub_resources_of_archived_jobs(self):
+        from .archive import archive_job
+        archive_job(self.job.id)
+        page = self.client.get(f'/api/jobs/{self.job.id}/sentiments/').json()
+        self.assertEqual(len(page['results']), 5)
+        self.assertIsNone(page['next'])
+
+
+class LiveCallTests(TestCase):
+    @staticmethod
+    def call_audio(utterances, sample_rate=16000):
+        """PCM with a 1.2 s tone per utterance, each followed by half a second of silence"""
+        import numpy as np
+        tone = (3000 * np.sin(np.arange(int(1.2 * sample_rate)) * 0.3)).astype('<i2').tobytes()
+        silence = bytes(sample_rate)  # 0.5 s of 16-bit zeros
+        return (tone + silence) * utterances
+
+    def test_compliance_monitor(self):
+        from .live import LiveComplianceMonitor
+        monitor = LiveComplianceMonitor()
+        changes, reason = monitor.check(
+            {'speaker': 'agent', 'text': 'This call is recorded. I guarantee a refund.', 'offset': 2, 'duration': 3}
+        )
+        self.assertEqual(
+            [(c['rule'], c['status']) for c in changes],
+            [('recording_disclosure', 'passed'), ('prohibited_promise', 'violation')]
+        )
+        self.assertEqual(reason, 'Agent makes a guarantee or no-risk promise')
+        changes, _ = monitor.check({'speaker': 'customer', 'text': 'Okay', 'offset': 200, 'duration': 1})
+        self.assertEqual([(c['rule'], c['status']) for c in changes], [('identity_verification', 'missed')])
+        self.assertEqual(monitor.score(), 30)
+
+    async def test_unavailable_recognizer_is_reported(self):
+        import sys
+        from unittest import mock
+        from channels.testing import WebsocketCommunicator
+        from django.test import override_settings
+        from call_clarity_backend.asgi import application
+
+        # Without the Azure Speech SDK the default recognizer cannot be built;
+        # the second path names a class that does not exist; the last server
+        # has a working recognizer but no Azure Language settings
+        unset_language = ValueError('AZURE_LANGUAGE_ENDPOINT is not set')
+        for recognizer, language in (
+            ('analyzer.live.AzureStreamingRecognizer', None),
+            ('analyzer.live.MissingRecognizer', None),
+            ('analyzer.live.FakeStreamingRecognizer', unset_language),
+        ):
+            with override_settings(LIVE_RECOGNIZER=recognizer), \
+                    mock.patch.dict(sys.modules, {'azure.cognitiveservices.speech': None}), \
+                    mock.patch('analyzer.live.AzureLanguageService', side_effect=language), \
+                    mock.patch('analyzer.live.AzureContentSafetyService'), \
+                    mock.patch('analyzer.live.AzureOpenAIService'):
+                caller = WebsocketCommunicator(application, '/ws/live/ingest/')
+                self.assertTrue((await caller.connect())[0])
+                await caller.send_json_to({'type': 'start', 'agent': 'Jane Smith'})
+                self.assertEqual(await caller.receive_json_from(), {
+                    'type': 'error', 'error': 'Live transcription is not available on this server'
+                })
+                self.assertEqual((await caller.receive_output())['code'], 4400)
+        self.assertFalse(await AudioJob.objects.aexists())
+
+    def test_failed_start_does_not_leave_a_processing_job(self):
+        from unittest import mock
+        from .live import LiveCallSession
+
+        def broken_receiver(sender, job, **kwargs):
+            raise RuntimeError('receiver failed')
+
+        recognizer_class = mock.Mock()
+        services = {name: mock.Mock() for name in ('language_service', 'content_safety_service', 'openai_service')}
+        job_progress.connect(broken_receiver, dispatch_uid='test.broken_receiver')
+        self.addCleanup(job_progress.disconnect, dispatch_uid='test.broken_receiver')
+        with mock.patch('analyzer.live.import_string', return_value=recognizer_class), \
+                self.assertRaises(RuntimeError):
+            LiveCallSession.start('Jane Smith', None, 16000, **services)
+        recognizer_class.return_value.close.assert_called_once_with()
+        self.assertEqual(list(AudioJob.objects.values_list('status', flat=True)), ['error'])
+        self.assertFalse(AudioJob.objects.filter(status='processing').exists())
+
+    async def test_live_call_is_analyzed_incrementally(self):
+        from unittest import mock
+        from channels.testing import WebsocketCommunicator
+        from django.test import override_settings
+        from call_clarity_backend.asgi import application
+
+        language = mock.Mock()
+        language.analyze_sentiment.return_value = {'overall': 'positive', 'confidence_scores': {'positive': 0.9}}
+        safety = mock.Mock()
+        safety.analyze_text.return_value = {'Hate': {'severity': 0}}
+        openai = mock.Mock()
+        openai.audit_call_compliance.side_effect = RuntimeError('offline')
+
+        with override_settings(LIVE_RECOGNIZER='analyzer.live.FakeStreamingRecognizer'), \
+                mock.patch('analyzer.live.AzureLanguageService', return_value=language), \
+                mock.patch('analyzer.live.AzureContentSafetyService', return_value=safety), \
+                mock.patch('analyzer.live.AzureOpenAIService', return_value=openai):
+            supervisor = WebsocketCommunicator(application, '/ws/live/calls/')
+            self.assertTrue((await supervisor.connect())[0])
+            caller = WebsocketCommunicator(application, '/ws/live/ingest/')
+            self.assertTrue((await caller.connect())[0])
+
+            await caller.send_json_to({'type': 'start', 'agent': 'Jane Smith', 'sample_rate': 16000})
+            started = await caller.receive_json_from()
+            self.assertEqual(started['type'], 'started')
+
+            audio = self.call_audio(3)
+            for start in range(0, len(audio), 3200):
+                await caller.send_to(bytes_data=audio[start:start + 3200])
+            await caller.send_json_to({'type': 'stop'})
+
+            messages = []
+            while not messages or messages[-1]['type'] != 'complete':
+                messages.append(await caller.receive_json_from(timeout=5))
+            await caller.wait()
+            self.assertEqual((await supervisor.receive_json_from())['job_id'], started['job_id'])
+            await supervisor.disconnect()
+
+        kinds = [m['type'] for m in messages]
+        self.assertIn('partial', kinds)
+        utterances = [m for m in messages if m['type'] == 'utterance']
+        self.assertEqual([u['speaker'] for u in utterances], ['agent', 'customer', 'agent'])
+        self.assertEqual(utterances[0]['compliance'][0]['status'], 'passed')
+        self.assertEqual(utterances[2]['compliance'][0]['rule'], 'identity_verification')
+
+        job = await AudioJob.objects.aget(id=started['job_id'])
+        self.assertEqual((job.status, job.agent, job.duration), ('complete', 'Jane Smith', '00:04'))
+        self.assertEqual(job.degraded_stages, ['compliance'])
+        self.assertEqual(job.score, 100)
+        self.assertEqual(await Transcript.objects.filter(job=job).acount(), 3)
+        self.assertEqual(await Sentiment.objects.filter(job=job, sentiment='positive').acount(), 3)
+
+
+class FakeAzureTests(TestCase):
+    def setUp(self):
+        from django.test import override_settings
+        from .fake_azure import FakeAzureServer
+        self.server = FakeAzureServer({'transcription_seconds': 0.1, 'seed': 1}).start()
+        self.addCleanup(self.server.stop)
+        overrides = override_settings(**self.server.settings_overrides(poll_interval=0.02))
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def test_pipeline_runs_against_the_fake(self):
+        import tempfile
+        import wave
+        from .views import AudioJobViewSet
+
+        with tempfile.NamedTemporaryFile(suffix='.wav') as audio:
+            with wave.open(audio.name, 'wb') as w:
+                w.setnchannels(1)
+                w.setsampwidth(2)
+                w.setframerate(16000)
+                w.writeframes(bytes(32000))
+            job = AudioJob.objects.create(status='pending', agent='Jane Smith')
+            AudioJobViewSet().process_audio(job, audio.name, remove_file=False)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.degraded_stages), ('complete', []))
+        self.assertIn(job.compliance_report.risk_level, ('Low', 'Medium', 'High'))
+        self.assertTrue(job.transcripts.get().text.startswith('Thank you for calling'))
+        stats = self.server.stats()
+        for route in ('storage.blob', 'speech.results', 'language.sentiment', 'content_safety.analyze', 'openai.chat'):
+            self.assertGreater(stats[route]['requests'], 0, route)
+
+    def test_analysis_failures_before_the_breaker_trips_mark_the_job_degraded(self):
+        import tempfile
+        from .fake_azure import RouteBehaviour
+        from .pipeline_benchmark import write_synthetic_call
+        from .resilience import get_breaker
+        from .views import AudioJobViewSet
+
+        def fail_analysis(sender, job, **kwargs):
+            # The clients' connection tests have passed by now
+            if job.current_step == 'Analysis':
+                self.server.profile.routes['language.sentiment'] = RouteBehaviour(error_rate=1.0)
+                self.server.profile.routes['content_safety.analyze'] = RouteBehaviour(throttle_rate=1.0)
+
+        job_progress.connect(fail_analysis, dispatch_uid='test.fail_analysis')
+        self.addCleanup(job_progress.disconnect, dispatch_uid='test.fail_analysis')
+        with tempfile.NamedTemporaryFile(suffix='.wav') as audio:
+            write_synthetic_call(audio.name, 1)
+            job = AudioJob.objects.create(status='pending', agent='Jane Smith')
+            AudioJobViewSet().process_audio(job, audio.name, remove_file=False)
+
+        job.refresh_from_db()
+        self.assertFalse(get_breaker('language').is_open)
+        self.assertEqual((job.status, job.degraded_stages), ('complete', ['content_safety', 'sentiment']))
+        self.assertEqual(job.sentiments.get().sentiment, 'neutral')
+        self.assertEqual(job.content_safety.get().category, 'safe')
+
+    def test_content_safety_hits_flag_utterances(self):
+        import tempfile
+        from unittest import mock
+        from .pipeline_benchmark import write_synthetic_call
+        from .views import AudioJobViewSet
+
+        with mock.patch.dict('analyzer.fake_azure.SAFETY_WORDS', {'Hate': ('problem',)}), \
+                tempfile.NamedTemporaryFile(suffix='.wav') as audio:
+            write_synthetic_call(audio.name, 12)
+            job = AudioJob.objects.create(status='pending', agent='Jane Smith')
+            AudioJobViewSet().process_audio(job, audio.name, remove_file=False)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.flagged_count, job.max_safety_severity), ('complete', 1, 2))
+        flagged = job.transcripts.get(flagged=True)
+        self.assertIn('problem', flagged.text)
+        self.assertEqual(flagged.flag_reason, 'Content safety: Hate (severity 2)')
+        row = APIClient().get('/api/jobs/').data['results'][0]
+        self.assertEqual(row['flagged_count'], 1)
+
+    def test_throttling_errors_and_latency_injection(self):
+        import requests
+        from .fake_azure import FakeAzureServer, LatencyModel
+
+        profile = {
+            'routes': {
+                'content_safety.analyze': {'throttle_rate': 1.0},
+                'openai.chat': {'error_rate': 1.0},
+            },
+            'retry_after': 3,
+        }
+        with FakeAzureServer(profile) as server:
+            headers = {'Ocp-Apim-Subscription-Key': 'key'}
+            response = requests.post(f"{server.url}/contentsafety/text:analyze", json={'text': 'hi'}, headers=headers)
+            self.assertEqual((response.status_code, response.headers['Retry-After']), (429, '3'))
+            response = requests.post(
+                f"{server.url}/openai/deployments/gpt-4/chat/completions", json={'messages': []}, headers=headers
+            )
+            self.assertIn(response.status_code, (500, 503))
+            response = requests.post(f"{server.url}/text/analytics/v3.1/sentiment", json={'documents': []})
+            self.assertEqual(response.status_code, 401)
+            self.assertEqual(server.stats()['content_safety.analyze']['throttled'], 1)
+
+        import random
+        rng = random.Random(3)
+        samples = sorted(LatencyModel('lognormal:0.1,0.5').sample(rng) for _ in range(2000))
+        self.assertAlmostEqual(samples[1000], 0.1, delta=0.01)
+        self.assertEqual(LatencyModel('fixed:0.25').sample(rng), 0.25)
+        with self.assertRaises(ValueError):
+            LatencyModel('uniform:1')
+
+
+class PipelineBenchmarkTests(TestCase):
+    def test_benchmark_reports_stages_and_db_work_per_call_length(self):
+        from .fake_azure import FakeAzureServer
+        from .pipeline_benchmark import STAGES, compare_results, run_pipeline_benchmark
+
+        with FakeAzureServer({'combined_phrases': False, 'transcription_seconds': 0}) as server:
+            results = run_pipeline_benchmark(server, call_seconds=(12, 30), calls=2)
+
+        self.assertEqual([s['call_seconds'] for s in results['scenarios']], [12, 30])
+        short, long = results['scenarios']
+        self.assertEqual((short['jobs'], short['errors']), (2, 0))
+        # One fake phrase per six seconds of audio, each analyzed separately
+        self.assertEqual((short['transcripts_per_job'], long['transcripts_per_job']), (2, 5))
+        self.assertEqual(set(long['stages']), set(STAGES))
+        self.assertGreater(long['writes_per_job'], short['writes_per_job'])
+        self.assertGreater(long['azure_requests_per_job'], short['azure_requests_per_job'])
+        self.assertGreater(long['jobs_per_minute'], 0)
+        # ru_maxrss is a lifetime peak, so it is only meaningful for the run as a whole
+        self.assertNotIn('peak_rss_mb', long)
+        self.assertGreater(results['peak_rss_mb'], 0)
+        json.dumps(results)
+
+        rows = compare_results(results, results)
+        self.assertTrue(rows)
+        self.assertTrue(all(change in (0, None) and improved is None for *_, change, improved in rows))
+        self.assertEqual([(scope, label) for scope, label, *_ in rows if label == 'peak RSS MB'], [('all', 'peak RSS MB')])
+
+
+class LoadTestTests(LiveServerTestCase):
+    def test_closed_loop_reports_each_endpoint(self):
+        from .loadtest import HISTOGRAM_BUCKETS_MS, run_load_test
+
+        create_job(5)
+        create_job(5)
+        mix = {'jobs.list': 1, 'jobs.status': 1, 'jobs.result': 1, 'stats': 1}
+        result = run_load_test(self.live_server_url, duration=1, users=2, think_time=0, mix=mix, seed=1)
+
+        self.assertEqual(set(result['endpoints']), set(mix))
+        self.assertEqual(result['total']['errors'], 0)
+        self.assertGreater(result['total']['requests_per_second'], 0)
+        for stats in result['endpoints'].values():
+            self.assertEqual(sum(stats['histogram_ms'].values()), stats['requests'])
+            self.assertEqual(len(stats['histogram_ms']), len(HISTOGRAM_BUCKETS_MS) + 1)
+            self.assertLessEqual(stats['p50_ms'], stats['p99_ms'])
+        # Repeat result fetches revalidate with the ETag they were given
+        self.assertIn('304', result['endpoints']['jobs.result']['status_codes'])
+
+    def test_fallback_list_requests_are_recorded_as_list(self):
+        import requests
+        from .loadtest import LoadScenario
+
+        scenario = LoadScenario(self.live_server_url, mix={'jobs.status': 1, 'jobs.result': 1})
+        with requests.Session() as session:
+            # No job ids known yet, so both kinds fall back to listing jobs
+            scenario.perform(session, 'jobs.status')
+            scenario.perform(session, 'jobs.result')
+            self.assertEqual(set(scenario.report(1)), {'jobs.list'})
+            self.assertEqual(scenario.report(1)['jobs.list']['requests'], 2)
+
+            job = create_job(1)
+            scenario.warm_up(session)
+            scenario.perform(session, 'jobs.status')
+        report = scenario.report(1)
+        self.assertEqual((report['jobs.list']['requests'], report['jobs.status']['requests']), (2, 1))
+        self.assertEqual(scenario.known_jobs, [str(job.id)])
+
+    def test_transport_errors_are_counted(self):
+        from .loadtest import LoadScenario, parse_mix, run_open_loop
+
+        scenario = LoadScenario('http://127.0.0.1:9', mix={'stats': 1}, timeout=1)
+        run_open_loop(scenario, rate=20, duration=0.5, concurrency=4)
+        summary = scenario.report(0.5)['stats']
+        self.assertEqual(summary['errors'], summary['requests'])
+        self.assertEqual(summary['error_rate'], 1.0)
+
+        self.assertEqual(parse_mix('jobs.list=3, stats=1'), {'jobs.list': 3.0, 'stats': 1.0})
+        for spec in ('jobs.list', 'nope=1', 'stats=0'):
+            with self.assertRaises(ValueError):
+                parse_mix(spec)
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class ResilienceTests(TestCase):
+    def test_limiter_grows_additively_and_cuts_multiplicatively(self):
+        from .resilience import AdaptiveConcurrencyLimiter, ConcurrencyLimitExceeded
+
+        clock = FakeClock()
+        limiter = AdaptiveConcurrencyLimiter(
+            'test.endpoint', initial_limit=4, min_limit=1, max_limit=5,
+            latency_tolerance=2, backoff_ratio=0.5, queue_timeout=1, clock=clock
+        )
+        limiter.acquire()
+        limiter.release(0.1)
+        self.assertEqual(limiter.limit, 4)  # one request in flight does not use a limit of 4
+
+        for _ in range(2):
+            limiter.acquire()
+        limiter.release(0.1)
+        limiter.release(0.1)
+        self.assertAlmostEqual(limiter.limit, 4.25)  # +1/limit per completed request while utilised
+
+        limiter.acquire()
+        limiter.release(1.0)  # ten times the baseline
+        self.assertAlmostEqual(limiter.limit, 2.125)
+        limiter.acquire()
+        limiter.release(1.0, error=True)
+        self.assertAlmostEqual(limiter.limit, 2.125)  # at most one cut per round trip
+        clock.advance(1.0)
+        limiter.acquire()
+        limiter.release(0.1, error=True)
+        self.assertAlmostEqual(limiter.limit, 1.0625)
+        clock.advance(1.0)
+        limiter.acquire()
+        limiter.release(0.1, error=True)
+        self.assertEqual(limiter.limit, 1)  # floor
+        self.assertEqual(limiter.in_flight, 0)
+
+        limiter.acquire()
+        limiter.queue_timeout = 0.01
+        with self.assertRaises(ConcurrencyLimitExceeded):
+            limiter.acquire()
+
+    def test_latency_tracker_statistics(self):
+        from .resilience import LatencyTracker
+
+        tracker = LatencyTracker(window=100)
+        for i in range(1, 101):
+            tracker.record(i / 1000)
+        tracker.record(5.0, error=True)
+        self.assertEqual(tracker.percentile(50), 0.051)
+        self.assertEqual(tracker.percentile(95), 0.095)
+        self.assertEqual(tracker.baseline(), 0.011)
+        self.assertEqual(tracker.sample_count(), 100)
+        self.assertAlmostEqual(tracker.error_rate(), 0.01)
+        self.assertEqual(tracker.snapshot()['errors'], 1)
+
+    def test_breaker_opens_half_opens_and_closes(self):
+        from .resilience import CircuitBreaker, CircuitOpenError
+
+        clock = FakeClock()
+        breaker = CircuitBreaker('test', failure_threshold=3, reset_timeout=10, half_open_max_calls=1, clock=clock)
+        for _ in range(2):
+            breaker.before_request()
+            breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        breaker.record_success()
+        self.assertEqual(breaker.consecutive_failures, 0)
+
+        for _ in range(3):
+            breaker.before_request()
+            breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertTrue(breaker.is_open)
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_request()
+
+        clock.advance(10)
+        self.assertFalse(breaker.is_open)
+        self.assertTrue(breaker.allow_request())
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertFalse(breaker.allow_request())  # only one trial at a time
+        breaker.cancel_request()  # the trial was never sent
+        self.assertTrue(breaker.allow_request())
+        breaker.record_failure()
+        self.assertEqual((breaker.state, breaker.times_opened), (CircuitBreaker.OPEN, 2))
+
+        clock.advance(9)
+        self.assertFalse(breaker.allow_request())
+        clock.advance(1)
+        self.assertTrue(breaker.allow_request())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        self.assertTrue(breaker.allow_request())
+        self.assertTrue(breaker.allow_request())
+
+    def test_hedge_budget_caps_hedges_at_ratio(self):
+        from .resilience import HedgeBudget
+
+        budget = HedgeBudget('test', ratio=0.25, max_tokens=2)
+        self.assertTrue(budget.try_spend())
+        self.assertTrue(budget.try_spend())
+        self.assertFalse(budget.try_spend())  # burst used up
+
+        spent = 0
+        for _ in range(1000):
+            budget.record_request()
+            spent += budget.try_spend()
+        self.assertEqual(spent, 250)
+        for _ in range(1000):
+            budget.record_request()
+        self.assertEqual(budget.tokens, 2)  # idle periods bank at most the burst
+        self.assertEqual(budget.snapshot()['hedges_sent'], 252)
+
+
+class HedgingTests(TestCase):
+    endpoints = itertools.count()
+
+    def setUp(self):
+        from unittest import mock
+        from django.test import override_settings
+        from .resilience import get_hedge_budget, get_limiter
+
+        overrides = override_settings(AZURE_HEDGING_ENABLED=True, AZURE_HEDGE_MIN_SAMPLES=5)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        # A fresh endpoint per test keeps the shared registries independent
+        self.endpoint = f"hedgetest{next(self.endpoints)}.analyze"
+        self.limiter = get_limiter(self.endpoint)
+        self.limiter.limit = 4.0
+        for _ in range(20):
+            self.limiter.tracker.record(0.05)
+        self.budget = get_hedge_budget(self.endpoint)
+        self.responses = []
+        self.delays = []
+        patcher = mock.patch('analyzer.azure_services.requests.request', side_effect=self.respond)
+        self.request = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def respond(self, method, url, **kwargs):
+        import time
+        from unittest import mock
+        index = len(self.responses)
+        response = mock.Mock(status_code=200, index=index)
+        self.responses.append(response)
+        time.sleep(self.delays[index] if index < len(self.delays) else 0)
+        return response
+
+    def send(self):
+        from .azure_services import _send_request
+        return _send_request(self.endpoint, 'POST', 'http://fake/analyze', hedge=True)
+
+    def wait_for(self, condition):
+        import time
+        deadline = time.monotonic() + 2
+        while not condition() and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_fast_primary_is_not_hedged(self):
+        self.assertEqual(self.send().index, 0)
+        self.assertEqual(self.request.call_count, 1)
+        self.assertEqual(self.budget.hedges_sent, 0)
+
+    def test_slow_primary_is_hedged_and_the_loser_closed(self):
+        self.delays = [0.5, 0]
+        response = self.send()
+        self.assertEqual(response.index, 1)
+        self.assertEqual((self.budget.hedges_sent, self.budget.hedge_wins), (1, 1))
+        self.wait_for(lambda: self.responses[0].close.called)
+        self.responses[0].close.assert_called_once()
+        response.close.assert_not_called()
+        self.wait_for(lambda: self.limiter.in_flight == 0)
+        self.assertEqual(self.limiter.in_flight, 0)
+
+    def test_exhausted_budget_sends_no_hedge(self):
+        self.budget.ratio = 0
+        self.budget.tokens = 0
+        self.delays = [0.2]
+        self.assertEqual(self.send().index, 0)
+        self.assertEqual((self.request.call_count, self.budget.hedges_sent), (1, 0))
+        self.assertEqual(self.limiter.in_flight, 0)
+
+    def test_time_queued_on_the_limiter_does_not_trigger_a_hedge(self):
+        import threading
+        self.limiter.limit = 1.0
+        self.limiter.acquire()
+        threading.Timer(0.3, self.limiter.abandon).start()
+        self.assertEqual(self.send().index, 0)
+        self.assertEqual((self.request.call_count, self.budget.hedges_sent), (1, 0))
+
+    def test_saturated_limiter_sends_no_hedge_and_keeps_the_budget(self):
+        self.limiter.limit = 2.0
+        self.limiter.acquire()
+        self.delays = [0.2]
+        tokens = self.budget.tokens
+        self.assertEqual(self.send().index, 0)
+        self.assertEqual((self.request.call_count, self.budget.hedges_sent), (1, 0))
+        self.assertGreaterEqual(self.budget.tokens, tokens)
+        self.assertEqual(self.limiter.in_flight, 1)
@@ -1,10 +1,23 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import AudioJobViewSet
+from .views import (
+    AudioJobViewSet, WebhookSubscriptionViewSet, azure_metrics, job_progress_stream, search,
+    semantic_search, stats_overview, batch_status, export_data, stats_agents, stats_agents_daily
+)
 
 router = DefaultRouter()
 router.register(r'jobs', AudioJobViewSet, basename='job')
+router.register(r'webhooks', WebhookSubscriptionViewSet, basename='webhook')
 
 urlpatterns = [
+    path('metrics/azure/', azure_metrics, name='azure-metrics'),
+    path('batches/<uuid:pk>/', batch_status, name='batch-status'),
+    path('export/', export_data, name='export'),
+    path('stats/', stats_overview, name='stats'),
+    path('stats/agents/', stats_agents, name='stats-agents'),
+    path('stats/agents/daily/', stats_agents_daily, name='stats-agents-daily'),
+    path('search/', search, name='search'),
+    path('search/semantic/', semantic_search, name='semantic-search'),
+    path('jobs/<uuid:pk>/events/', job_progress_stream, name='job-events'),
     path('', include(router.urls)),
 ] 
\ No newline at end of file
@@ -0,0 +1,411 @@
+"""
+Semantic vector index for "similar calls" and free-text semantic search.
+
+Each completed job contributes one ``summary`` vector (the compliance
+summary) and one ``utterance`` vector per transcript row, embedded in
+batches through ``AzureOpenAIService.embed_texts``. Vectors are stored
+L2-normalised so cosine similarity is a plain dot product.
+
+On-disk layout under ``VECTOR_INDEX_DIR`` (all append-only):
+
+    meta.json      {"dim": ..., "count": ...}; ``count`` is authoritative,
+                   so a partially written append is simply ignored
+    vectors.f32    float32 matrix, ``count`` x ``dim``, memory-mapped
+    rows.bin       one ROW_DTYPE record per vector (job, kind, transcript, alive)
+    centroids.npy  IVF centroids, once trained
+    lists.bin      int32 IVF list id per row, once trained
+
+Writers in different processes (web workers, ``build_vector_index``)
+serialise on an ``fcntl.flock`` of ``index.lock`` in the same directory, so
+two appends never truncate each other's rows.
+
+Re-indexing a job tombstones its old rows (``alive = False``); ``reset``
+followed by a full rebuild reclaims the space. Search is brute-force,
+chunked top-k over the memory map until IVF partitions are trained
+(``train_ivf``), after which only the ``VECTOR_IVF_NPROBE`` closest lists
+are scanned.
+"""
+
+import json
+import logging
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import numpy as np
+from django.conf import settings
+from django.db import connection
+from .models import AudioJob, ComplianceReport
+from .azure_services import AzureOpenAIService
+
+try:
+    import fcntl
+except ImportError:  # no inter-process lock on Windows; one writer process only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+KIND_SUMMARY = 0
+KIND_UTTERANCE = 1
+KINDS = {'summary': KIND_SUMMARY, 'utterance': KIND_UTTERANCE}
+KIND_NAMES = {value: name for name, value in KINDS.items()}
+
+ROW_DTYPE = np.dtype([
+    ('job', 'S16'),
+    ('kind', 'u1'),
+    ('alive', '?'),
+    ('transcript', '<i8'),
+])
+
+SEARCH_CHUNK_ROWS = 65536
+
+
+def normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _job_key(job_id):
+    return uuid.UUID(str(job_id)).bytes
+
+
+def _job_id(key):
+    # numpy drops trailing NUL bytes from 'S' fields, so pad the key back out
+    return uuid.UUID(bytes=bytes(key).ljust(16, b'\0'))
+
+
+class VectorIndex:
+    """Append-only, memory-mapped float32 vector store with top-k cosine search"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._loaded_count = None
+        self._vectors = None
+        self._rows = None
+        self._lists = None
+        self._centroids = None
+        self._meta = {'dim': None, 'count': 0}
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    @contextmanager
+    def _write_lock(self):
+        """Exclusive against other threads and, via flock, other processes"""
+        with self._lock:
+            os.makedirs(self.path, exist_ok=True)
+            with open(self._file('index.lock'), 'a') as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_meta(self):
+        try:
+            with open(self._file('meta.json')) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {'dim': None, 'count': 0}
+
+    def _write_meta(self):
+        tmp = self._file('meta.json.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(self._meta, f)
+        os.replace(tmp, self._file('meta.json'))
+
+    def _load(self):
+        """(Re)open the memory maps if another writer has appended rows"""
+        self._meta = self._read_meta()
+        count, dim = self._meta['count'], self._meta['dim']
+        if count == self._loaded_count:
+            return
+        self._loaded_count = count
+        if not count:
+            self._vectors = np.zeros((0, dim or 0), dtype=np.float32)
+            self._rows = np.zeros(0, dtype=ROW_DTYPE)
+        else:
+            self._vectors = np.memmap(self._file('vectors.f32'), dtype=np.float32, mode='r', shape=(count, dim))
+            self._rows = np.memmap(self._file('rows.bin'), dtype=ROW_DTYPE, mode='r+', shape=(count,))
+        self._centroids = None
+        self._lists = None
+        if os.path.exists(self._file('centroids.npy')):
+            self._centroids = np.load(self._file('centroids.npy'))
+            lists = np.fromfile(self._file('lists.bin'), dtype=np.int32)[:count]
+            if len(lists) < count:
+                # Rows appended by a writer that did not know about the
+                # partitions. Readers do not hold the write lock, so they only
+                # assign these in memory; the next add() persists them
+                lists = np.concatenate([lists, self._assign_lists(self._vectors[len(lists):count])])
+            self._lists = lists
+
+    def __len__(self):
+        with self._lock:
+            self._load()
+            return int(self._rows['alive'].sum()) if len(self._rows) else 0
+
+    def add(self, job_id, kinds, transcript_ids, vectors):
+        """Append vectors for one job (kinds are 'summary'/'utterance')"""
+        vectors = normalize(vectors)
+        if not len(vectors):
+            return
+        rows = np.zeros(len(vectors), dtype=ROW_DTYPE)
+        rows['job'] = _job_key(job_id)
+        rows['kind'] = [KINDS[kind] for kind in kinds]
+        rows['alive'] = True
+        rows['transcript'] = [transcript_id or 0 for transcript_id in transcript_ids]
+
+        with self._write_lock():
+            self._load()
+            dim = self._meta['dim']
+            if dim is None:
+                dim = self._meta['dim'] = int(vectors.shape[1])
+            elif vectors.shape[1] != dim:
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match index dimension {dim}")
+
+            count = self._meta['count']
+            # Truncate any partial append left behind by a crashed writer
+            for name, width in (('vectors.f32', dim * 4), ('rows.bin', ROW_DTYPE.itemsize)):
+                with open(self._file(name), 'ab') as f:
+                    f.truncate(count * width)
+                    f.write(vectors.tobytes() if name == 'vectors.f32' else rows.tobytes())
+            if self._centroids is not None:
+                with open(self._file('lists.bin'), 'ab') as f:
+                    # Drop a partial append, then fill in rows whose lists
+                    # were only assigned in memory (see _load)
+                    stored = min(os.path.getsize(self._file('lists.bin')) // 4, count)
+                    f.truncate(stored * 4)
+                    self._lists[stored:count].tofile(f)
+                    self._assign_lists(vectors).tofile(f)
+
+            self._meta['count'] = count + len(vectors)
+            self._write_meta()
+            self._load()
+
+    def remove_job(self, job_id):
+        """Tombstone every row belonging to a job"""
+        with self._write_lock():
+            self._load()
+            if not len(self._rows):
+                return 0
+            matches = (self._rows['job'] == _job_key(job_id)) & self._rows['alive']
+            removed = int(matches.sum())
+            if removed:
+                self._rows['alive'][matches] = False
+                self._rows.flush()
+            return removed
+
+    def reset(self):
+        with self._write_lock():
+            for name in ('meta.json', 'vectors.f32', 'rows.bin', 'centroids.npy', 'lists.bin'):
+                try:
+                    os.remove(self._file(name))
+                except FileNotFoundError:
+                    pass
+            self._loaded_count = None
+            self._load()
+
+    def indexed_job_ids(self):
+        with self._lock:
+            self._load()
+            if not len(self._rows):
+                return set()
+            keys = np.unique(self._rows['job'][self._rows['alive']])
+            return {_job_id(key) for key in keys}
+
+    def job_vector(self, job_id):
+        """The job's summary vector, or the mean of its utterances if it has none"""
+        with self._lock:
+            self._load()
+            if not len(self._rows):
+                return None
+            matches = (self._rows['job'] == _job_key(job_id)) & self._rows['alive']
+            summary = np.flatnonzero(matches & (self._rows['kind'] == KIND_SUMMARY))
+            if len(summary):
+                return np.array(self._vectors[summary[-1]])
+            utterances = np.flatnonzero(matches)
+            if not len(utterances):
+                return None
+            return normalize(self._vectors[utterances].mean(axis=0))
+
+    def search(self, query_vector, k=10, kind=None, exclude_job=None):
+        """Top-k rows by cosine similarity, best first
+
+        Returns a list of dicts with job_id, kind, transcript_id and similarity.
+        """
+        query = normalize(query_vector).reshape(-1)
+        with self._lock:
+            self._load()
+            vectors, rows = self._vectors, self._rows
+            if not len(rows):
+                return []
+            if len(query) != vectors.shape[1]:
+                raise ValueError(f"Query dimension {len(query)} does not match index dimension {vectors.shape[1]}")
+
+            if self._centroids is not None:
+                probe = np.argsort(-(self._centroids @ query))[:settings.VECTOR_IVF_NPROBE]
+                candidates = np.flatnonzero(np.isin(self._lists, probe))
+            else:
+                candidates = None
+
+            best_scores = np.empty(0, dtype=np.float32)
+            best_rows = np.empty(0, dtype=np.int64)
+            total = len(rows) if candidates is None else len(candidates)
+            for start in range(0, total, SEARCH_CHUNK_ROWS):
+                if candidates is None:
+                    stop = min(start + SEARCH_CHUNK_ROWS, total)
+                    index = np.arange(start, stop)
+                    chunk, meta = vectors[start:stop], rows[start:stop]
+                else:
+                    index = candidates[start:start + SEARCH_CHUNK_ROWS]
+                    chunk, meta = vectors[index], rows[index]
+                keep = meta['alive'].copy()
+                if kind is not None:
+                    keep &= meta['kind'] == KINDS[kind]
+                if exclude_job is not None:
+                    keep &= meta['job'] != _job_key(exclude_job)
+                if not keep.any():
+                    continue
+                scores = np.asarray(chunk) @ query
+                if not keep.all():
+                    index, scores = index[keep], scores[keep]
+
+                best_scores = np.concatenate([best_scores, scores])
+                best_rows = np.concatenate([best_rows, index])
+                if len(best_scores) > k:
+                    top = np.argpartition(-best_scores, k)[:k]
+                    best_scores, best_rows = best_scores[top], best_rows[top]
+
+            order = np.argsort(-best_scores)[:k]
+            return [
+                {
+                    'job_id': str(_job_id(rows[row]['job'])),
+                    'kind': KIND_NAMES[int(rows[row]['kind'])],
+                    'transcript_id': int(rows[row]['transcript']) or None,
+                    'similarity': round(float(best_scores[i]), 4),
+                }
+                for i, row in ((i, best_rows[i]) for i in order)
+            ]
+
+    def similar_jobs(self, job_id, k=10):
+        """Other jobs whose summaries are closest to this job's"""
+        vector = self.job_vector(job_id)
+        if vector is None:
+            return None
+        return self.search(vector, k=k, kind='summary', exclude_job=job_id)
+
+    def train_ivf(self, n_lists=None, iterations=10, sample_size=100000, seed=0):
+        """Partition the index into coarse clusters (spherical k-means)"""
+        with self._write_lock():
+            self._load()
+            alive = np.flatnonzero(self._rows['alive']) if len(self._rows) else np.empty(0, dtype=np.int64)
+            if not len(alive):
+                return 0
+            n_lists = n_lists or max(1, int(np.sqrt(len(alive))))
+            rng = np.random.default_rng(seed)
+            sample = np.asarray(self._vectors[np.sort(rng.choice(alive, min(sample_size, len(alive)), replace=False))])
+            n_lists = min(n_lists, len(sample))
+            centroids = sample[rng.choice(len(sample), n_lists, replace=False)]
+            for _ in range(iterations):
+                assignment = np.argmax(sample @ centroids.T, axis=1)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, assignment, sample)
+                empty = np.bincount(assignment, minlength=n_lists) == 0
+                sums[empty] = centroids[empty]
+                centroids = normalize(sums)
+
+            self._centroids = centroids.astype(np.float32)
+            lists = np.concatenate([
+                self._assign_lists(self._vectors[start:start + SEARCH_CHUNK_ROWS])
+                for start in range(0, len(self._rows), SEARCH_CHUNK_ROWS)
+            ])
+            lists.tofile(self._file('lists.bin'))
+            np.save(self._file('centroids.npy'), self._centroids)
+            self._loaded_count = None
+            self._load()
+            return n_lists
+
+    def _assign_lists(self, vectors):
+        return np.argmax(np.asarray(vectors) @ self._centroids.T, axis=1).astype(np.int32)
+
+    def snapshot(self):
+        with self._lock:
+            self._load()
+            return {
+                'rows': int(self._meta['count']),
+                'alive': int(self._rows['alive'].sum()) if len(self._rows) else 0,
+                'dim': self._meta['dim'],
+                'ivf_lists': 0 if self._centroids is None else len(self._centroids),
+            }
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_vector_index():
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = VectorIndex(settings.VECTOR_INDEX_DIR)
+        return _index
+
+
+def index_job(job, openai_service=None, index=None):
+    """Embed a job's summary and utterances and (re)place them in the index"""
+    index = index or get_vector_index()
+    openai_service = openai_service or AzureOpenAIService()
+
+    kinds, transcript_ids, texts = [], [], []
+    summary = ComplianceReport.objects.filter(job=job).values_list('summary', flat=True).first()
+    if summary:
+        kinds.append('summary')
+        transcript_ids.append(None)
+        texts.append(summary)
+    for transcript_id, text in job.transcripts.order_by('id').values_list('id', 'text'):
+        kinds.append('utterance')
+        transcript_ids.append(transcript_id)
+        texts.append(text)
+
+    index.remove_job(job.id)
+    if not texts:
+        return 0
+    vectors = openai_service.embed_texts(texts)
+    index.add(job.id, kinds, transcript_ids, vectors)
+    if (index.snapshot()['ivf_lists'] == 0
+            and settings.VECTOR_IVF_THRESHOLD
+            and len(index) >= settings.VECTOR_IVF_THRESHOLD):
+        logger.info(f"Vector index reached {len(index)} rows, training IVF partitions")
+        index.train_ivf()
+    return len(texts)
+
+
+_indexer = None
+
+
+def index_finished_job(sender, job, **kwargs):
+    """Signal receiver: embed completed jobs in the background when enabled"""
+    global _indexer
+    if not settings.VECTOR_INDEX_ENABLED or job.status != 'complete':
+        return
+    with _index_lock:
+        if _indexer is None:
+            # One worker keeps appends ordered and embedding load modest
+            _indexer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='vector-index')
+    _indexer.submit(_index_job_safely, job.id)
+
+
+def _index_job_safely(job_id):
+    try:
+        indexed = index_job(AudioJob.objects.get(id=job_id))
+        logger.info(f"Indexed {indexed} vectors for job {job_id}")
+    except Exception as e:
+        logger.error(f"Error indexing job {job_id}: {str(e)}")
+    finally:
+        connection.close()
@@ -2,26 +2,60 @@ from django.shortcuts import render
 import os
 import json
 import logging
+import queue
+import secrets
+import tarfile
 import threading
+import time
+import uuid
+import zipfile
 from datetime import datetime
 from rest_framework import viewsets, status
-from rest_framework.decorators import action
+from rest_framework.decorators import action, api_view
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
 from rest_framework.parsers import MultiPartParser
+from rest_framework.filters import OrderingFilter
+from django_filters.rest_framework import DjangoFilterBackend
 from django.conf import settings
+from django.db import connections
+from django.db.models import prefetch_related_objects
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.utils.dateparse import parse_date
 from .models import (
     AudioJob, Transcript, Sentiment, ContentSafety,
-    ComplianceReport, CallAnalytics
+    ComplianceReport, CallAnalytics, WebhookSubscription, AgentDailyStats, DailyStats,
+    UploadBatch
 )
 from .serializers import (
     AudioJobSerializer, AudioJobStatusSerializer,
-    CallRecordSerializer
+    CallRecordSerializer, CALL_RECORD_FIELDS, serialize_call_records,
+    WebhookSubscriptionSerializer, TranscriptSerializer, SentimentSerializer, ContentSafetySerializer,
+    job_detail_prefetches, parse_detail_fields
+)
+from .pagination import JobCursorPagination, JobRowCursorPagination
+from .filters import AudioJobFilter
+from .result_documents import (
+    get_result_document, materialize_result_document,
+    invalidate_result_document, result_document_response
 )
 from .azure_services import (
     AzureSpeechService, AzureLanguageService,
     AzureContentSafetyService, AzureOpenAIService
 )
 from .azure_storage import AzureStorageService
+from .resilience import metrics_snapshot, breaker_snapshot
+from .signals import job_progress, job_finished
+from .archive import archived_representation, discard_archive
+from .exports import ExportError, FORMATS, export_stream, export_filename
+from .ingest import (
+    BulkUploadError, extract_uploads, create_batch_jobs, processing_executor, batch_progress
+)
+from .rollups import counters_of, summarize, sum_counters
+from .search import search_transcripts
+from .summaries import apply_job_summary, compliance_status_for_score
+from .vector_index import get_vector_index
+from .progress import broker as progress_broker, build_progress_event, TERMINAL_STATUSES
 
 logger = logging.getLogger(__name__)
 
@@ -29,16 +63,62 @@ class AudioJobViewSet(viewsets.ModelViewSet):
     queryset = AudioJob.objects.all().order_by('-created_at')  # Order by newest first
     serializer_class = AudioJobSerializer
     parser_classes = [MultiPartParser]
+    pagination_class = JobCursorPagination
+    filter_backends = [DjangoFilterBackend, OrderingFilter]
+    filterset_class = AudioJobFilter
+    ordering_fields = ['created_at', 'score', 'agent']
+    ordering = JobCursorPagination.ordering
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ('retrieve', 'result'):
+            queryset = queryset.select_related('compliance_report', 'analytics')
+        if self.action == 'retrieve':
+            # AudioJobSerializer walks every nested relation; load them up front
+            # so a job costs the same number of queries however long the call was.
+            # result() prefetches only when it has no stored document to serve.
+            queryset = queryset.prefetch_related(*job_detail_prefetches(self.detail_fields()))
+        return queryset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action == 'result':
+            # Stored result documents are rendered by the pipeline, outside any
+            # request; render live results the same way so both bodies match
+            # (audio_file is the MEDIA_URL path rather than an absolute URL)
+            context.pop('request', None)
+        return context
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        invalidate_result_document(serializer.instance.id)
+
+    def perform_destroy(self, instance):
+        invalidate_result_document(instance.id)
+        super().perform_destroy(instance)
 
     def get_serializer_class(self):
         if self.action == 'list':
             return CallRecordSerializer
         return AudioJobSerializer
 
+    def get_serializer(self, *args, **kwargs):
+        if self.action in ('retrieve', 'result'):
+            kwargs.setdefault('fields', self.detail_fields())
+        return super().get_serializer(*args, **kwargs)
+
+    def detail_fields(self):
+        """Sparse fieldset from ?fields=/?expand=, or None for the full job"""
+        if not hasattr(self, '_detail_fields'):
+            self._detail_fields = parse_detail_fields(self.request.query_params)
+        return self._detail_fields
+
     def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        # The list only needs a handful of columns; skip model instances and
+        # per-row serializer fields entirely
+        queryset = self.filter_queryset(self.get_queryset()).values(*CALL_RECORD_FIELDS)
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(serialize_call_records(page))
 
     def create(self, request):
         logger.info("Received file upload request")
@@ -85,7 +165,7 @@ class AudioJobViewSet(viewsets.ModelViewSet):
             
             # Start processing in background
             logger.info(f"Starting background processing for job {job.id}")
-            thread = threading.Thread(target=self.process_audio, args=(job, temp_path))
+            thread = threading.Thread(target=self._process_in_background, args=(job, temp_path))
             thread.daemon = True  # Make thread daemon so it doesn't block app shutdown
             thread.start()
 
@@ -100,6 +180,54 @@ class AudioJobViewSet(viewsets.ModelViewSet):
                 os.remove(temp_path)
             raise e
 
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """Ingest many recordings (several `files` or one `archive`) as one batch"""
+        files = request.FILES.getlist('files')
+        archive = request.FILES.get('archive')
+        if not files and archive is None:
+            return Response(
+                {'error': 'Provide one or more "files" or an "archive"'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        batch = UploadBatch.objects.create(source=archive.name if archive else '')
+        try:
+            extracted = extract_uploads(batch.id, files=files, archive=archive)
+        except (BulkUploadError, tarfile.TarError, zipfile.BadZipFile) as e:
+            logger.error(f"Rejected bulk upload: {str(e)}")
+            batch.delete()
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except OSError as e:
+            # Disk full, permissions: extract_uploads has already removed what it wrote
+            logger.error(f"Error storing bulk upload {batch.id}: {str(e)}")
+            batch.delete()
+            return Response(
+                {'error': 'Could not store the uploaded recordings'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+        jobs = create_batch_jobs(
+            batch,
+            extracted,
+            agent=request.data.get('agent', 'Unknown Agent'),
+            customer=request.data.get('customer', 'Unknown Customer')
+        )
+        batch.total_jobs = len(jobs)
+        batch.save(update_fields=['total_jobs'])
+
+        executor = processing_executor()
+        for job, path in jobs:
+            executor.submit(self._process_in_background, job, path, False)
+        logger.info(f"Queued batch {batch.id} with {len(jobs)} jobs")
+
+        return Response({
+            'batch_id': str(batch.id),
+            'total': len(jobs),
+            'job_ids': [str(job.id) for job, _ in jobs],
+            'status_url': f"/api/batches/{batch.id}/",
+        }, status=status.HTTP_202_ACCEPTED)
+
     def update_job_status(self, job, status, progress=0, current_step='', message=''):
         """Update job status in the database"""
         job.status = status
@@ -108,9 +236,28 @@ class AudioJobViewSet(viewsets.ModelViewSet):
         job.status_message = message
         job.save()
         logger.info(f"Job {job.id} status updated: {status} - {message}")
+        job_progress.send(sender=AudioJob, job=job)
 
-    def process_audio(self, job, temp_path):
+    def _process_in_background(self, job, temp_path, remove_file=True):
+        """Thread entry point: run the pipeline, then release this thread's DB connection"""
+        try:
+            self.process_audio(job, temp_path, remove_file=remove_file)
+        except Exception:
+            pass  # Already logged and recorded on the job by process_audio
+        finally:
+            # With persistent connections (CONN_MAX_AGE) a finished worker
+            # thread would otherwise hold its connection open indefinitely
+            connections.close_all()
+
+    def process_audio(self, job, temp_path, remove_file=True):
+        # Stages that fell back to default values because the Azure call
+        # failed or its circuit breaker was open
+        degraded_stages = set()
         try:
+            # A reprocessed job must not keep serving its previous results
+            invalidate_result_document(job.id)
+            discard_archive(job)
+
             # Initialize services
             speech_service = AzureSpeechService()
             language_service = AzureLanguageService()
@@ -150,7 +297,7 @@ class AudioJobViewSet(viewsets.ModelViewSet):
                 logger.info(f"Creating transcript for utterance: {text[:50]}...")
                 speaker = p.get('speaker', 'unknown')
                 start_time = p.get('offset', '00:00')
-                Transcript.objects.create(
+                transcript = Transcript.objects.create(
                     job=job,
                     speaker=speaker,
                     start_time=start_time,
@@ -172,16 +319,17 @@ class AudioJobViewSet(viewsets.ModelViewSet):
                     sent = language_service.analyze_sentiment(text)
                     Sentiment.objects.create(
                         job=job,
-                        utterance=text,
+                        transcript=transcript,
                         sentiment=sent['overall'],
                         confidence=float(sent['confidence_scores'].get('positive', 0.0))
                     )
                 except Exception as e:
-                    logger.error(f"Error in analyze_sentiment: {str(e)}")
+                    logger.warning(f"Sentiment unavailable for segment {idx}, storing neutral default: {str(e)}")
+                    degraded_stages.add('sentiment')
                     # Create default sentiment
                     Sentiment.objects.create(
                         job=job,
-                        utterance=text,
+                        transcript=transcript,
                         sentiment='neutral',
                         confidence=0.7
                     )
@@ -189,20 +337,27 @@ class AudioJobViewSet(viewsets.ModelViewSet):
                 try:
                     # Analyze content safety
                     safe = content_safety_service.analyze_text(text)
+                    hits = []
                     for category, info in safe.items():
                         if info['severity'] > 0:
                             ContentSafety.objects.create(
                                 job=job,
-                                utterance=text,
+                                transcript=transcript,
                                 category=category,
                                 severity=info['severity']
                             )
+                            hits.append(f"{category} (severity {info['severity']})")
+                    if hits:
+                        transcript.flagged = True
+                        transcript.flag_reason = f"Content safety: {', '.join(hits)}"
+                        transcript.save(update_fields=['flagged', 'flag_reason'])
                 except Exception as e:
-                    logger.error(f"Error in analyze_text: {str(e)}")
+                    logger.warning(f"Content safety unavailable for segment {idx}, storing safe default: {str(e)}")
+                    degraded_stages.add('content_safety')
                     # Create default content safety
                     ContentSafety.objects.create(
                         job=job,
-                        utterance=text,
+                        transcript=transcript,
                         category='safe',
                         severity=0
                     )
@@ -225,6 +380,7 @@ class AudioJobViewSet(viewsets.ModelViewSet):
                 comp = openai_service.audit_call_compliance(full_text)
             except Exception as e:
                 logger.error(f"Error in audit_call_compliance: {str(e)}")
+                degraded_stages.add('compliance')
                 comp = {
                     'checklist': [],
                     'risk_level': 'unknown',
@@ -249,15 +405,6 @@ class AudioJobViewSet(viewsets.ModelViewSet):
                 sentiment=comp.get('sentiment', 'neutral')
             )
 
-            # Update job with compliance status and score
-            job.score = comp.get('score', 0)
-            job.compliance_status = self._determine_compliance_status(comp.get('score', 0))
-            job.status = 'complete'
-            job.progress = 100
-            job.current_step = 'Complete'
-            job.status_message = 'Processing completed successfully'
-            job.save()
-
             # Create analytics with sample data format
             transcripts = job.transcripts.all().order_by('start_time')
             CallAnalytics.objects.create(
@@ -271,6 +418,30 @@ class AudioJobViewSet(viewsets.ModelViewSet):
                 key_phrases=["refund", "policy", "satisfaction"]
             )
 
+            # Update job with compliance status and score
+            job.score = comp.get('score', 0)
+            job.compliance_status = self._determine_compliance_status(comp.get('score', 0))
+            job.status = 'complete'
+            job.progress = 100
+            job.current_step = 'Complete'
+            job.degraded_stages = sorted(degraded_stages)
+            apply_job_summary(job)
+            if degraded_stages:
+                job.status_message = f"Processing completed in degraded mode ({', '.join(job.degraded_stages)})"
+            else:
+                job.status_message = 'Processing completed successfully'
+            job.save()
+
+            # Completed results never change again; render them once so
+            # repeat views of the result endpoint are a single read
+            try:
+                materialize_result_document(job.id)
+            except Exception as e:
+                logger.error(f"Error materializing result document for job {job.id}: {str(e)}")
+
+            job_progress.send(sender=AudioJob, job=job)
+            job_finished.send(sender=AudioJob, job=job)
+
             logger.info(f"Job {job.id} processing completed successfully")
             return True
 
@@ -278,19 +449,18 @@ class AudioJobViewSet(viewsets.ModelViewSet):
             logger.error(f"Error processing job {job.id}: {str(e)}")
             job.status = 'error'
             job.error_message = str(e)
+            job.degraded_stages = sorted(degraded_stages)
             job.save()
+            job_progress.send(sender=AudioJob, job=job)
+            job_finished.send(sender=AudioJob, job=job)
             raise e
         finally:
-            # Clean up temp file
-            if os.path.exists(temp_path):
+            # Clean up temp file (bulk uploads process the stored file in place)
+            if remove_file and os.path.exists(temp_path):
                 os.remove(temp_path)
 
     def _determine_compliance_status(self, score):
-        if score >= 80:
-            return 'compliant'
-        elif score >= 60:
-            return 'warning'
-        return 'violation'
+        return compliance_status_for_score(score)
 
     def _calculate_agent_talk_time(self, transcripts):
         """Calculate total agent talk time in seconds"""
@@ -311,8 +481,7 @@ class AudioJobViewSet(viewsets.ModelViewSet):
     def _calculate_agent_tone(self, transcripts):
         """Calculate average agent tone (0-1 scale)"""
         agent_sentiments = Sentiment.objects.filter(
-            job=transcripts.first().job,
-            utterance__in=[t.text for t in transcripts.filter(speaker='agent')]
+            transcript__in=transcripts.filter(speaker='agent')
         )
         if not agent_sentiments:
             return 0.7  # Default neutral tone
@@ -321,8 +490,7 @@ class AudioJobViewSet(viewsets.ModelViewSet):
     def _calculate_customer_sentiment(self, transcripts):
         """Calculate average customer sentiment (0-1 scale)"""
         customer_sentiments = Sentiment.objects.filter(
-            job=transcripts.first().job,
-            utterance__in=[t.text for t in transcripts.filter(speaker='customer')]
+            transcript__in=transcripts.filter(speaker='customer')
         )
         if not customer_sentiments:
             return 0.7  # Default neutral sentiment
@@ -371,6 +539,295 @@ class AudioJobViewSet(viewsets.ModelViewSet):
 
     @action(detail=True, methods=['get'])
     def result(self, request, pk=None):
+        # Look the job up first so permissions and lookup hooks apply to stored documents too
         job = self.get_object()
-        serializer = self.get_serializer(job)
-        return Response(serializer.data)
+        # A sparse fieldset is cheaper to serialize live than to cut out of the stored document
+        document = get_result_document(job.id) if self.detail_fields() is None else None
+        if document is None:
+            if job.status != 'complete' or self.detail_fields() is not None:
+                prefetch_related_objects([job], *job_detail_prefetches(self.detail_fields()))
+                return Response(self.get_serializer(job).data)
+            # Completed before documents existed, or edited since; materialize on first view
+            document = materialize_result_document(job.id)
+        return result_document_response(request, document)
+
+    @action(detail=True, methods=['get'])
+    def transcripts(self, request, pk=None):
+        """The job's transcript rows, cursor-paginated in call order"""
+        return self._job_rows('transcripts', Transcript.objects.all(), TranscriptSerializer)
+
+    @action(detail=True, methods=['get'])
+    def sentiments(self, request, pk=None):
+        return self._job_rows(
+            'sentiments', Sentiment.objects.select_related('transcript'), SentimentSerializer
+        )
+
+    @action(detail=True, methods=['get'], url_path='content-safety')
+    def content_safety(self, request, pk=None):
+        return self._job_rows(
+            'content_safety', ContentSafety.objects.select_related('transcript'), ContentSafetySerializer
+        )
+
+    def _job_rows(self, relation, queryset, serializer_class):
+        job = self.get_object()
+        if job.archived_at is not None:
+            # Archived rows come out of one compressed blob; send them in a single page
+            return Response({'next': None, 'previous': None, 'results': archived_representation(job)[relation]})
+        paginator = JobRowCursorPagination()
+        page = paginator.paginate_queryset(queryset.filter(job=job), self.request, view=self)
+        return paginator.get_paginated_response(serializer_class(page, many=True).data)
+
+    @action(detail=True, methods=['get'])
+    def similar(self, request, pk=None):
+        """Calls whose summaries are semantically closest to this one"""
+        job = self.get_object()
+        k = _bounded_int_param(request, 'k', 10, 100)
+        if k is None:
+            return Response({'error': 'k must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        matches = get_vector_index().similar_jobs(job.id, k=k)
+        if matches is None:
+            return Response({'error': 'Job has not been indexed yet'}, status=status.HTTP_404_NOT_FOUND)
+
+        jobs = AudioJob.objects.in_bulk([match['job_id'] for match in matches])
+        results = []
+        for match in matches:
+            other = jobs.get(uuid.UUID(match['job_id']))
+            if other is None:
+                continue  # Deleted since it was indexed
+            results.append({
+                'job_id': match['job_id'],
+                'similarity': match['similarity'],
+                'agent': other.agent,
+                'customer': other.customer,
+                'score': other.score,
+                'compliance_status': other.compliance_status,
+                'created_at': other.created_at,
+            })
+        return Response({'job_id': str(job.id), 'results': results})
+
+
+class WebhookSubscriptionViewSet(viewsets.ModelViewSet):
+    queryset = WebhookSubscription.objects.all().order_by('-created_at')
+    serializer_class = WebhookSubscriptionSerializer
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        secret = serializer.validated_data.get('secret') or secrets.token_hex(32)
+        subscription = serializer.save(secret=secret)
+        data = dict(self.get_serializer(subscription).data)
+        # The signing secret is only ever returned once, at registration
+        data['secret'] = secret
+        return Response(data, status=status.HTTP_201_CREATED)
+
+
+@api_view(['GET'])
+def azure_metrics(request):
+    """Current concurrency limits, latency stats and circuit breaker states"""
+    return Response({
+        'endpoints': metrics_snapshot(),
+        'breakers': breaker_snapshot(),
+    })
+
+
+@api_view(['GET'])
+def search(request):
+    """Full-text search over transcript utterances"""
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        return Response({'error': 'Query parameter "q" is required'}, status=status.HTTP_400_BAD_REQUEST)
+    limit = _bounded_int_param(request, 'limit', 20, 100)
+    offset = _bounded_int_param(request, 'offset', 0, None, minimum=0)
+    if limit is None or offset is None:
+        return Response({'error': 'limit and offset must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+
+    started = time.perf_counter()
+    results = search_transcripts(query, limit=limit, offset=offset)
+    return Response({
+        'query': query,
+        'results': results,
+        'limit': limit,
+        'offset': offset,
+        'took_ms': round((time.perf_counter() - started) * 1000, 2),
+    })
+
+
+@api_view(['GET'])
+def semantic_search(request):
+    """Free-text semantic search over the vector index"""
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        return Response({'error': 'Query parameter "q" is required'}, status=status.HTTP_400_BAD_REQUEST)
+    kind = request.query_params.get('kind', 'utterance')
+    if kind not in ('utterance', 'summary'):
+        return Response({'error': 'kind must be "utterance" or "summary"'}, status=status.HTTP_400_BAD_REQUEST)
+    k = _bounded_int_param(request, 'k', 10, 100)
+    if k is None:
+        return Response({'error': 'k must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+    started = time.perf_counter()
+    try:
+        vector = AzureOpenAIService().embed_texts([query])[0]
+    except Exception as e:
+        logger.error(f"Error embedding search query: {str(e)}")
+        return Response({'error': 'Embedding service unavailable'}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    matches = get_vector_index().search(vector, k=k, kind=kind)
+
+    transcripts = Transcript.objects.in_bulk(
+        [match['transcript_id'] for match in matches if match['transcript_id']]
+    )
+    results = []
+    for match in matches:
+        result = {'job_id': match['job_id'], 'similarity': match['similarity']}
+        transcript = transcripts.get(match['transcript_id'])
+        if transcript is not None:
+            result.update({
+                'transcript_id': transcript.id,
+                'speaker': transcript.speaker,
+                'start_time': transcript.start_time,
+                'text': transcript.text,
+            })
+        elif kind == 'utterance':
+            continue  # Deleted since it was indexed
+        results.append(result)
+    return Response({
+        'query': query,
+        'results': results,
+        'took_ms': round((time.perf_counter() - started) * 1000, 2),
+    })
+
+
+@api_view(['GET'])
+def stats_overview(request):
+    """Call totals and a per-day series over a date range, read from DailyStats"""
+    days = _filter_stats_days(request, DailyStats.objects.all())
+    return Response({
+        'totals': summarize(sum_counters(days)),
+        'days': [{'day': row.day, **summarize(counters_of(row))} for row in days.order_by('day')],
+    })
+
+
+@api_view(['GET'])
+def stats_agents(request):
+    """Per-agent totals over a date range, read from AgentDailyStats"""
+    rows = _filter_stats_days(request, AgentDailyStats.objects.all())
+    if request.query_params.get('agent'):
+        rows = rows.filter(agent=request.query_params['agent'])
+    return Response({
+        'agents': [{'agent': row['agent'], **summarize(row)} for row in sum_counters(rows, 'agent')],
+    })
+
+
+@api_view(['GET'])
+def stats_agents_daily(request):
+    """Per-agent, per-day rows over a date range, read from AgentDailyStats"""
+    rows = _filter_stats_days(request, AgentDailyStats.objects.all())
+    if request.query_params.get('agent'):
+        rows = rows.filter(agent=request.query_params['agent'])
+    return Response({
+        'rows': [
+            {'agent': row.agent, 'day': row.day, **summarize(counters_of(row))}
+            for row in rows.order_by('day', 'agent')
+        ],
+    })
+
+
+def _filter_stats_days(request, queryset):
+    """Apply the inclusive date_from / date_to (YYYY-MM-DD) query parameters"""
+    for param, lookup in (('date_from', 'day__gte'), ('date_to', 'day__lte')):
+        value = request.query_params.get(param)
+        if not value:
+            continue
+        try:
+            day = parse_date(value)
+        except ValueError:
+            day = None
+        if day is None:
+            raise ValidationError({param: 'Expected a date in YYYY-MM-DD format'})
+        queryset = queryset.filter(**{lookup: day})
+    return queryset
+
+
+@api_view(['GET'])
+def batch_status(request, pk):
+    """Aggregate progress of a bulk upload batch"""
+    try:
+        batch = UploadBatch.objects.get(id=pk)
+    except UploadBatch.DoesNotExist:
+        raise Http404("Batch not found")
+    return Response(batch_progress(batch))
+
+
+def _bounded_int_param(request, name, default, maximum, minimum=1):
+    """Parse an integer query parameter, clamped to [minimum, maximum]; None if invalid"""
+    try:
+        value = max(int(request.query_params.get(name, default)), minimum)
+    except (TypeError, ValueError):
+        return None
+    return value if maximum is None else min(value, maximum)
+
+
+def export_data(request):
+    """Stream jobs or transcripts as NDJSON, CSV or Parquet
+
+    A plain Django view: DRF would treat ``?format=`` as content negotiation.
+    """
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+    params = request.GET
+    dataset = params.get('dataset', 'jobs')
+    fmt = params.get('format', 'ndjson')
+    compress = params.get('gzip', '').lower() in ('1', 'true', 'yes')
+    try:
+        stream = export_stream(dataset, fmt, filters=params, compress=compress)
+    except ExportError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    response = StreamingHttpResponse(
+        stream,
+        content_type='application/gzip' if compress else FORMATS[fmt][0]
+    )
+    response['Content-Disposition'] = f'attachment; filename="{export_filename(dataset, fmt, compress)}"'
+    return response
+
+
+def job_progress_stream(request, pk):
+    """Server-Sent Events fallback for clients that cannot use the WebSocket"""
+    # Subscribe before reading the current state so no step is missed in between
+    subscriber = progress_broker.subscribe(pk)
+    try:
+        job = AudioJob.objects.get(id=pk)
+    except AudioJob.DoesNotExist:
+        progress_broker.unsubscribe(pk, subscriber)
+        raise Http404("Job not found")
+
+    def event_stream():
+        try:
+            event = build_progress_event(job)
+            yield _format_sse(event)
+            while event['status'] not in TERMINAL_STATUSES:
+                try:
+                    event = subscriber.get(timeout=settings.PROGRESS_SSE_HEARTBEAT)
+                except queue.Empty:
+                    # Jobs processed in another worker process never reach this
+                    # process's broker; the database always has their state
+                    latest = AudioJob.objects.filter(id=pk).first()
+                    if latest is None:
+                        return
+                    latest = build_progress_event(latest)
+                    if latest == event:
+                        yield ": keep-alive\n\n"
+                        continue
+                    event = latest
+                yield _format_sse(event)
+        finally:
+            progress_broker.unsubscribe(pk, subscriber)
+
+    response = StreamingHttpResponse(event_stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Disable proxy buffering (nginx)
+    return response
+
+
+def _format_sse(event):
+    return f"event: progress\ndata: {json.dumps(event)}\n\n"
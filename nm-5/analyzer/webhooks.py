@@ -0,0 +1,189 @@
+"""
+Outbound completion webhooks.
+
+When a job reaches ``complete`` or ``error`` the ``job_finished`` signal
+queues one event per matching ``WebhookSubscription``. A background
+``WebhookDispatcher`` groups events per subscriber (up to ``batch_size``
+events, or whatever arrived within ``batch_interval_ms``) and POSTs them
+through a pooled HTTP session, retrying failed deliveries with exponential
+backoff.
+
+Every POST body has the form ``{"events": [...]}`` and carries two headers:
+
+    X-CallClarity-Timestamp: <unix seconds>
+    X-CallClarity-Signature: sha256=<hex HMAC of "<timestamp>.<body>">
+
+Receivers should recompute the HMAC with their subscription secret and
+reject stale timestamps.
+"""
+
+import hashlib
+import hmac
+import json
+import logging
+import queue
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+from django.utils import timezone
+from .models import WebhookSubscription
+
+logger = logging.getLogger(__name__)
+
+
+def build_job_event(job):
+    return {
+        'id': str(uuid.uuid4()),
+        'type': f"job.{job.status}",
+        'occurred_at': timezone.now().isoformat(),
+        'job': {
+            'id': str(job.id),
+            'status': job.status,
+            'agent': job.agent,
+            'customer': job.customer,
+            'score': job.score,
+            'compliance_status': job.compliance_status,
+            'error_message': job.error_message,
+            'result_url': f"/api/jobs/{job.id}/result/",
+        },
+    }
+
+
+def sign_payload(secret, timestamp, body):
+    message = f"{timestamp}.".encode() + body
+    return hmac.new(secret.encode(), message, hashlib.sha256).hexdigest()
+
+
+class WebhookDispatcher:
+    """Background batching and delivery of webhook events"""
+
+    def __init__(self):
+        self.max_attempts = settings.WEBHOOK_MAX_ATTEMPTS
+        self.backoff_base = settings.WEBHOOK_BACKOFF_BASE
+        self.timeout = settings.WEBHOOK_TIMEOUT
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=settings.WEBHOOK_WORKERS,
+            pool_maxsize=settings.WEBHOOK_WORKERS
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._queue = queue.Queue()
+        self._senders = ThreadPoolExecutor(
+            max_workers=settings.WEBHOOK_WORKERS,
+            thread_name_prefix='webhook-send'
+        )
+        # subscription id -> (subscription, [events], first event time)
+        self._batches = {}
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def enqueue(self, subscription, event):
+        self._ensure_started()
+        self._queue.put((subscription, event))
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='webhook-dispatcher', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                subscription, event = self._queue.get(timeout=self._next_flush_delay())
+                _, events, started = self._batches.get(
+                    subscription.id, (subscription, [], time.monotonic())
+                )
+                events.append(event)
+                self._batches[subscription.id] = (subscription, events, started)
+            except queue.Empty:
+                pass
+            except Exception as e:
+                logger.error(f"Error in webhook dispatcher: {str(e)}")
+            self._flush_due()
+
+    def _next_flush_delay(self):
+        if not self._batches:
+            return 1.0
+        now = time.monotonic()
+        delays = [
+            max(0.0, started + subscription.batch_interval_ms / 1000 - now)
+            for subscription, _, started in self._batches.values()
+        ]
+        return min(delays)
+
+    def _flush_due(self):
+        now = time.monotonic()
+        for subscription_id in list(self._batches):
+            subscription, events, started = self._batches[subscription_id]
+            full = len(events) >= max(1, subscription.batch_size)
+            expired = now - started >= subscription.batch_interval_ms / 1000
+            if full or expired:
+                del self._batches[subscription_id]
+                self._senders.submit(self.deliver, subscription, events)
+
+    def deliver(self, subscription, events):
+        """POST a batch to the subscriber, retrying with exponential backoff"""
+        body = json.dumps({'events': events}).encode()
+        last_error = None
+        for attempt in range(1, self.max_attempts + 1):
+            timestamp = str(int(time.time()))
+            headers = {
+                'Content-Type': 'application/json',
+                'X-CallClarity-Timestamp': timestamp,
+                'X-CallClarity-Signature': f"sha256={sign_payload(subscription.secret, timestamp, body)}",
+            }
+            try:
+                response = self.session.post(subscription.url, data=body, headers=headers, timeout=self.timeout)
+                if response.status_code < 300:
+                    self._record(subscription, None)
+                    logger.info(f"Delivered {len(events)} webhook event(s) to {subscription.url}")
+                    return True
+                last_error = f"HTTP {response.status_code}"
+                if 400 <= response.status_code < 500 and response.status_code not in (408, 429):
+                    break  # The subscriber rejected the payload; retrying will not help
+            except requests.exceptions.RequestException as e:
+                last_error = str(e)
+            if attempt < self.max_attempts:
+                delay = self.backoff_base * (2 ** (attempt - 1))
+                time.sleep(delay + random.uniform(0, delay / 2))
+
+        logger.error(f"Webhook delivery to {subscription.url} failed: {last_error}")
+        self._record(subscription, last_error)
+        return False
+
+    def _record(self, subscription, error):
+        try:
+            WebhookSubscription.objects.filter(id=subscription.id).update(
+                last_delivery_at=timezone.now(),
+                last_error=error
+            )
+        except Exception as e:
+            logger.error(f"Error recording webhook delivery: {str(e)}")
+
+
+dispatcher = WebhookDispatcher()
+
+
+def queue_job_webhooks(sender, job, **kwargs):
+    """Signal receiver: queue an event for every subscriber of this status"""
+    try:
+        subscriptions = [
+            subscription
+            for subscription in WebhookSubscription.objects.filter(active=True)
+            if job.status in subscription.events
+        ]
+    except Exception as e:
+        logger.error(f"Error loading webhook subscriptions: {str(e)}")
+        return
+    if not subscriptions:
+        return
+    event = build_job_event(job)
+    for subscription in subscriptions:
+        dispatcher.enqueue(subscription, event)
@@ -11,6 +11,10 @@ export interface CallRecord {
   duration: string;
   status: "compliant" | "warning" | "violation";
   score: number;
+  flagged_count?: number;
+  max_safety_severity?: number;
+  dominant_sentiment?: string;
+  violation_count?: number;
 }
 
 export interface TranscriptSegment {
@@ -57,12 +61,22 @@ export interface DetailedCallData {
 
 export const getCallHistory = async (): Promise<CallRecord[]> => {
   try {
-    const response = await fetch(`${API_BASE_URL}/jobs/`);
-    if (!response.ok) {
-      throw new Error('Failed to fetch call history');
+    // The list endpoint is cursor-paginated; follow `next` until the last page
+    const calls: CallRecord[] = [];
+    let url: string | null = `${API_BASE_URL}/jobs/?page_size=200`;
+    while (url) {
+      const response = await fetch(url);
+      if (!response.ok) {
+        throw new Error('Failed to fetch call history');
+      }
+      const data = await response.json();
+      if (Array.isArray(data)) {
+        return data;
+      }
+      calls.push(...data.results);
+      url = data.next;
     }
-    const data = await response.json();
-    return data;
+    return calls;
   } catch (error) {
     console.error('Error fetching call history:', error);
     // Fallback to mock data if API fails
@@ -121,6 +135,36 @@ export const getCallById = async (id: string): Promise<DetailedCallData | undefi
   }
 };
 
+export interface CallComplianceSummary {
+  id: string;
+  score: number;
+  status: "compliant" | "warning" | "violation";
+  riskLevel: string;
+  summary: string;
+  violationCount: number;
+}
+
+// Hover cards only need the compliance summary, not the whole call
+export const getCallComplianceSummary = async (id: string): Promise<CallComplianceSummary> => {
+  const response = await fetch(
+    `${API_BASE_URL}/jobs/${id}/?fields=id,score,compliance_status,violation_count,compliance_report`
+  );
+  if (!response.ok) {
+    throw new Error('Failed to fetch call summary');
+  }
+  const data = await response.json();
+  // Calls still being processed (or that failed) have no compliance report yet
+  const report = data.compliance_report;
+  return {
+    id: data.id,
+    score: data.score,
+    status: data.compliance_status,
+    riskLevel: report?.risk_level ?? 'unknown',
+    summary: report?.summary ?? 'Compliance analysis pending',
+    violationCount: data.violation_count ?? 0,
+  };
+};
+
 export const uploadCall = async (file: File, metadata: {
   agent: string;
   customer: string;
@@ -0,0 +1,67 @@
+"""
+Database configuration and connection tuning.
+
+``database_settings()`` builds ``DATABASES`` from the environment:
+
+    DB_ENGINE=sqlite (default) | postgresql
+    DB_CONN_MAX_AGE=600            persistent connection lifetime in seconds
+    SQLITE_PATH, SQLITE_BUSY_TIMEOUT_MS
+    POSTGRES_DB, POSTGRES_USER, POSTGRES_PASSWORD, POSTGRES_HOST, POSTGRES_PORT
+
+``tune_sqlite_connection`` is connected to ``connection_created`` and puts
+every SQLite connection into WAL mode with ``synchronous=NORMAL`` and a busy
+timeout, so the API can keep reading while ``process_audio`` threads write
+instead of failing with "database is locked".
+"""
+
+import os
+
+
+def database_settings(base_dir):
+    engine = os.getenv('DB_ENGINE', 'sqlite').lower()
+    conn_max_age = int(os.getenv('DB_CONN_MAX_AGE', '600'))
+
+    if engine in ('postgres', 'postgresql'):
+        return {
+            'default': {
+                'ENGINE': 'django.db.backends.postgresql',
+                'NAME': os.getenv('POSTGRES_DB', 'call_clarity'),
+                'USER': os.getenv('POSTGRES_USER', 'postgres'),
+                'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
+                'HOST': os.getenv('POSTGRES_HOST', 'localhost'),
+                'PORT': os.getenv('POSTGRES_PORT', '5432'),
+                'CONN_MAX_AGE': conn_max_age,
+                'CONN_HEALTH_CHECKS': True,
+                'OPTIONS': {
+                    'connect_timeout': int(os.getenv('POSTGRES_CONNECT_TIMEOUT', '5')),
+                },
+            }
+        }
+
+    return {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv('SQLITE_PATH', str(base_dir / 'db.sqlite3')),
+            'CONN_MAX_AGE': conn_max_age,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                # sqlite3's own lock wait, in seconds
+                'timeout': sqlite_busy_timeout_ms() / 1000,
+            },
+        }
+    }
+
+
+def sqlite_busy_timeout_ms():
+    return int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '20000'))
+
+
+def tune_sqlite_connection(sender, connection, **kwargs):
+    """connection_created receiver applying WAL-mode PRAGMAs to SQLite"""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA journal_mode=WAL;')
+        cursor.execute('PRAGMA synchronous=NORMAL;')
+        cursor.execute(f'PRAGMA busy_timeout={sqlite_busy_timeout_ms()};')
+        cursor.execute('PRAGMA temp_store=MEMORY;')
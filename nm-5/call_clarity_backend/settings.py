@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 import os
 from pathlib import Path
 from dotenv import load_dotenv
+from .database import database_settings
 
 # Load environment variables
 load_dotenv()
@@ -44,11 +45,14 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'rest_framework',
     'corsheaders',
+    'django_filters',
+    'channels',
     'analyzer',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'analyzer.compression.CompressionMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -78,17 +82,41 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'call_clarity_backend.wsgi.application'
+ASGI_APPLICATION = 'call_clarity_backend.asgi.application'
+
+# Channels layer used to push job progress to WebSocket clients. The
+# in-memory layer only reaches clients served by the same process; set
+# CHANNEL_REDIS_URL (requires channels-redis) when running several workers.
+if os.getenv('CHANNEL_REDIS_URL'):
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG': {'hosts': [os.getenv('CHANNEL_REDIS_URL')]},
+        },
+    }
+else:
+    CHANNEL_LAYERS = {
+        'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'},
+    }
+
+# Seconds between keep-alive comments on the Server-Sent Events progress stream
+PROGRESS_SSE_HEARTBEAT = int(os.getenv('PROGRESS_SSE_HEARTBEAT', '15'))
+
+# Live call streaming (/ws/live/ingest/). LIVE_RECOGNIZER is the dotted path of
+# a streaming recognizer class; analyzer.live.FakeStreamingRecognizer needs no
+# Azure credentials, AzureStreamingRecognizer needs azure-cognitiveservices-speech.
+LIVE_RECOGNIZER = os.getenv('LIVE_RECOGNIZER', 'analyzer.live.AzureStreamingRecognizer')
+LIVE_RECOGNITION_LANGUAGE = os.getenv('LIVE_RECOGNITION_LANGUAGE', 'en-US')
+LIVE_MAX_CHUNK_BYTES = int(os.getenv('LIVE_MAX_CHUNK_BYTES', 64 * 1024))
+# Seconds to wait for the recognizer's last results once a call ends
+LIVE_RECOGNIZER_FLUSH_TIMEOUT = float(os.getenv('LIVE_RECOGNIZER_FLUSH_TIMEOUT', '10'))
 
 
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
-}
+# SQLite by default; set DB_ENGINE=postgresql for production (see database.py)
+DATABASES = database_settings(BASE_DIR)
 
 
 # Password validation
@@ -131,7 +159,7 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 # Media files
 MEDIA_URL = '/media/'
-MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+MEDIA_ROOT = os.getenv('MEDIA_ROOT', os.path.join(BASE_DIR, 'media'))
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
@@ -148,17 +176,30 @@ REST_FRAMEWORK = {
         'rest_framework.parsers.MultiPartParser',
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'analyzer.renderers.FastJSONRenderer',
     ],
 }
 
+# Responses smaller than this many bytes are sent uncompressed
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+
 # File upload settings
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10485760  # 10MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10485760  # 10MB
 
+# Bulk ingestion (POST /api/jobs/bulk/)
+BULK_UPLOAD_MAX_FILES = int(os.getenv('BULK_UPLOAD_MAX_FILES', '1000'))
+# Total extracted size of one batch; archives can expand far beyond their upload size
+BULK_UPLOAD_MAX_BYTES = int(os.getenv('BULK_UPLOAD_MAX_BYTES', str(5 * 1024 ** 3)))  # 5GB
+DATA_UPLOAD_MAX_NUMBER_FILES = BULK_UPLOAD_MAX_FILES
+BULK_PROCESSING_WORKERS = int(os.getenv('BULK_PROCESSING_WORKERS', '4'))
+
 # Azure Configuration
 AZURE_SPEECH_KEY = os.getenv('AZURE_SPEECH_KEY', '')
 AZURE_SPEECH_REGION = os.getenv('AZURE_SPEECH_REGION', '')
+# Overrides https://<region>.api.cognitive.microsoft.com, e.g. to use the local fake (analyzer.fake_azure)
+AZURE_SPEECH_ENDPOINT = os.getenv('AZURE_SPEECH_ENDPOINT', '')
+AZURE_SPEECH_POLL_INTERVAL = float(os.getenv('AZURE_SPEECH_POLL_INTERVAL', '5'))  # seconds between status checks
 AZURE_LANGUAGE_ENDPOINT = os.getenv('AZURE_LANGUAGE_ENDPOINT', '')
 AZURE_LANGUAGE_KEY = os.getenv('AZURE_LANGUAGE_KEY', '')
 AZURE_CONTENT_SAFETY_ENDPOINT = os.getenv('AZURE_CONTENT_SAFETY_ENDPOINT', '')
@@ -167,12 +208,52 @@ AZURE_OPENAI_ENDPOINT = os.getenv('AZURE_OPENAI_ENDPOINT', '')
 AZURE_OPENAI_KEY = os.getenv('AZURE_OPENAI_KEY', '')
 AZURE_OPENAI_VERSION = os.getenv('AZURE_OPENAI_VERSION', '2024-02-15-preview')
 AZURE_OPENAI_DEPLOYMENT = os.getenv('AZURE_OPENAI_DEPLOYMENT', 'gpt-4')
+AZURE_OPENAI_EMBEDDING_DEPLOYMENT = os.getenv('AZURE_OPENAI_EMBEDDING_DEPLOYMENT', 'text-embedding-3-small')
 
 # Azure Storage Configuration
 AZURE_STORAGE_ACCOUNT = os.getenv('AZURE_STORAGE_ACCOUNT', 'audiotranscriberstorage')
 AZURE_STORAGE_CONTAINER = os.getenv('AZURE_STORAGE_CONTAINER', 'audio-files')
 AZURE_STORAGE_SAS_TOKEN = os.getenv('AZURE_STORAGE_SAS_TOKEN', '')
 AZURE_STORAGE_KEY = os.getenv('AZURE_STORAGE_KEY', '')
+AZURE_STORAGE_ACCOUNT_URL = os.getenv('AZURE_STORAGE_ACCOUNT_URL', '')  # defaults to https://<account>.blob.core.windows.net
+
+# Azure request flow control (adaptive concurrency per endpoint)
+AZURE_REQUEST_TIMEOUT = float(os.getenv('AZURE_REQUEST_TIMEOUT', '30'))
+AZURE_CONCURRENCY_INITIAL = int(os.getenv('AZURE_CONCURRENCY_INITIAL', '4'))
+AZURE_CONCURRENCY_MIN = int(os.getenv('AZURE_CONCURRENCY_MIN', '1'))
+AZURE_CONCURRENCY_MAX = int(os.getenv('AZURE_CONCURRENCY_MAX', '32'))
+AZURE_CONCURRENCY_BACKOFF = float(os.getenv('AZURE_CONCURRENCY_BACKOFF', '0.7'))
+AZURE_CONCURRENCY_QUEUE_TIMEOUT = float(os.getenv('AZURE_CONCURRENCY_QUEUE_TIMEOUT', '60'))
+AZURE_LATENCY_TOLERANCE = float(os.getenv('AZURE_LATENCY_TOLERANCE', '2.0'))
+
+# Circuit breakers (one per Azure client)
+AZURE_BREAKER_FAILURE_THRESHOLD = int(os.getenv('AZURE_BREAKER_FAILURE_THRESHOLD', '5'))
+AZURE_BREAKER_RESET_TIMEOUT = float(os.getenv('AZURE_BREAKER_RESET_TIMEOUT', '30'))
+AZURE_BREAKER_HALF_OPEN_MAX_CALLS = int(os.getenv('AZURE_BREAKER_HALF_OPEN_MAX_CALLS', '1'))
+
+# Request hedging for idempotent analysis calls (opt-in)
+AZURE_HEDGING_ENABLED = os.getenv('AZURE_HEDGING_ENABLED', 'False') == 'True'
+AZURE_HEDGE_BUDGET_RATIO = float(os.getenv('AZURE_HEDGE_BUDGET_RATIO', '0.05'))  # extra requests per request
+AZURE_HEDGE_BUDGET_BURST = int(os.getenv('AZURE_HEDGE_BUDGET_BURST', '10'))
+AZURE_HEDGE_MIN_SAMPLES = int(os.getenv('AZURE_HEDGE_MIN_SAMPLES', '20'))
+AZURE_HEDGE_WORKERS = int(os.getenv('AZURE_HEDGE_WORKERS', '32'))
+
+# Outbound completion webhooks
+WEBHOOK_MAX_ATTEMPTS = int(os.getenv('WEBHOOK_MAX_ATTEMPTS', '5'))
+WEBHOOK_BACKOFF_BASE = float(os.getenv('WEBHOOK_BACKOFF_BASE', '1.0'))  # seconds, doubled per retry
+WEBHOOK_TIMEOUT = float(os.getenv('WEBHOOK_TIMEOUT', '10'))
+WEBHOOK_WORKERS = int(os.getenv('WEBHOOK_WORKERS', '4'))
+
+# Semantic "similar calls" vector index
+VECTOR_INDEX_ENABLED = os.getenv('VECTOR_INDEX_ENABLED', 'False') == 'True'  # embed jobs as they complete
+VECTOR_INDEX_DIR = os.getenv('VECTOR_INDEX_DIR', os.path.join(BASE_DIR, 'vector_index'))
+EMBEDDING_BATCH_SIZE = int(os.getenv('EMBEDDING_BATCH_SIZE', '64'))
+VECTOR_IVF_THRESHOLD = int(os.getenv('VECTOR_IVF_THRESHOLD', '200000'))  # rows before IVF partitions are trained
+VECTOR_IVF_NPROBE = int(os.getenv('VECTOR_IVF_NPROBE', '8'))
+
+# Cold-storage archival of old calls (manage.py archive_calls)
+ARCHIVE_AFTER_DAYS = int(os.getenv('ARCHIVE_AFTER_DAYS', '365'))
+ARCHIVE_CODEC = os.getenv('ARCHIVE_CODEC', 'auto')  # auto (zstd if installed), zstd or gzip
 
 # Logging Configuration
 LOGGING = {